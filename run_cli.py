@@ -5,5 +5,13 @@ Run this file to start the TextTrove CLI application
 """
 
 if __name__ == "__main__":
+    import sys
+    from texttrove.client import forward
+
+    # Hand the command to a running `texttrove serve` daemon if there is one
+    code = forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
     from texttrove.cli import app
     app()
\ No newline at end of file
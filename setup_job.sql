@@ -1,5 +1,9 @@
 -- MindsDB Job Setup for TextTrove
 -- This SQL script sets up a job to monitor and ingest new documents
+--
+-- The job below is only a placeholder: a MindsDB job cannot see files on the
+-- machine holding the documents. For fresh results run `texttrove watch FOLDER`
+-- there instead; it ingests created, modified and deleted files within seconds.
 
 CREATE JOB IF NOT EXISTS texttrove_monitor_job AS (
     SELECT 'Job configuration for monitoring new documents' AS description
@@ -0,0 +1,316 @@
+"""
+Offline benchmark suite for TextTrove
+
+Runs extraction, ingestion, query fan-out and TextSpark route benchmarks
+against a synthetic corpus and the in-process MindsDB stand-in
+(texttrove.testing), and reports throughput and p50/p95/p99 latency as
+JSON so runs can be compared:
+
+    python tests/benchmark.py --output before.json
+    python tests/benchmark.py --output after.json --compare before.json
+
+Pass --mindsdb-url to benchmark a live MindsDB server instead.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import yaml
+from typer.testing import CliRunner
+
+from texttrove.batch import latency_summary
+from texttrove.testing import CorpusGenerator, make_corpus
+
+BENCHMARKS = ('extraction', 'ingestion', 'query', 'textspark')
+
+# CLI module state that must not leak between benchmark sessions
+CLI_STATE = {'server': None, 'backend': None, 'lexical_index': None, 'dedup_index': None, 'result_cache': None,
+             'summary_cache': None, 'kb_resolver': None, 'fanout_executor': None, 'summary_executor': None}
+
+
+def result(name: str, ops: int, seconds: float, latencies_ms: Optional[List[float]], **extra) -> Dict[str, Any]:
+    """One benchmark record: operation count, throughput and latency percentiles."""
+    return {
+        'name': name,
+        'ops': ops,
+        'seconds': round(seconds, 4),
+        'throughput_per_s': round(ops / seconds, 2) if seconds > 0 else None,
+        'latency_ms': {key: round(value, 3) for key, value in latency_summary(latencies_ms).items()}
+        if latencies_ms else None,
+        **extra,
+    }
+
+
+def run_concurrently(call: Callable[[int], Any], count: int, concurrency: int):
+    """Run call(0..count-1) on ``concurrency`` threads; return per-call latencies (ms) and wall time."""
+    def timed(index):
+        start = time.perf_counter()
+        call(index)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(count)))
+    return latencies, time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def cli_session(workdir: Path, config: Dict[str, Any]):
+    """Run the CLI in ``workdir`` with its own config.yaml and fresh connections and caches."""
+    from texttrove import cli
+
+    (workdir / 'config.yaml').write_text(yaml.safe_dump(config))
+    saved = {name: getattr(cli, name) for name in CLI_STATE}
+    saved_handles, saved_clients = dict(cli.kb_handles), dict(cli.llm_clients)
+    previous = os.getcwd()
+    os.chdir(workdir)
+    for name, value in CLI_STATE.items():
+        setattr(cli, name, value)
+    cli.kb_handles.clear()
+    try:
+        yield cli
+    finally:
+        os.chdir(previous)
+        for name, value in saved.items():
+            setattr(cli, name, value)
+        cli.kb_handles.clear()
+        cli.kb_handles.update(saved_handles)
+        cli.llm_clients.clear()
+        cli.llm_clients.update(saved_clients)
+
+
+def invoke(cli, args: List[str]):
+    outcome = CliRunner().invoke(cli.app, args)
+    if outcome.exit_code != 0:
+        raise RuntimeError(f"texttrove {' '.join(args)} failed:\n{outcome.output}")
+    return outcome
+
+
+def bench_extraction(files: List[Path], workers: int) -> List[Dict[str, Any]]:
+    from texttrove.pipeline import extract_files
+    from texttrove.utils import extract_text_from_file
+
+    size_mb = sum(f.stat().st_size for f in files) / (1024 * 1024)
+    # Warm up: the first PDF pays for importing the parser
+    extract_text_from_file(str(files[-1]))
+    latencies = []
+    start = time.perf_counter()
+    for path in files:
+        file_start = time.perf_counter()
+        extract_text_from_file(str(path))
+        latencies.append((time.perf_counter() - file_start) * 1000)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extracted = sum(1 for _, content, error in extract_files(files, workers=workers) if error is None and content)
+    parallel = time.perf_counter() - start
+    return [
+        result('extraction', len(files), sequential, latencies, workers=1, mb_per_s=round(size_mb / sequential, 2)),
+        result('extraction_parallel', extracted, parallel, None, workers=workers, mb_per_s=round(size_mb / parallel, 2)),
+    ]
+
+
+def bench_ingestion(cli, docs: Path, args) -> Dict[str, Any]:
+    start = time.perf_counter()
+    invoke(cli, ['ingest', str(docs), '--workers', str(args.workers), '--batch-size', str(args.batch_size), '--force'])
+    seconds = time.perf_counter() - start
+    server = cli.server
+    kb = server.knowledge_bases.get(cli.config['kb_name'])
+    inserts = getattr(server, 'stats', None)
+    rows = kb.count() if hasattr(kb, 'count') else None
+    return result('ingestion', rows or 0, seconds, inserts.snapshot().get('insert') if inserts else None,
+                  files=args.files, batch_size=args.batch_size, workers=args.workers,
+                  latency='per insert call, server side')
+
+
+def bench_query(cli, workdir: Path, queries: List[str], concurrency: int) -> Dict[str, Any]:
+    requests = workdir / 'queries.jsonl'
+    requests.write_text(''.join(json.dumps({'search': q, 'limit': 5}) + '\n' for q in queries))
+    output = workdir / f'results-{concurrency}.jsonl'
+    start = time.perf_counter()
+    invoke(cli, ['query', '--batch', str(requests), '--concurrency', str(concurrency), '--no-cache',
+                 '--output', str(output)])
+    seconds = time.perf_counter() - start
+    records = [json.loads(line) for line in output.read_text().splitlines() if line.strip()]
+    errors = sum(1 for r in records if r['status'] != 'ok')
+    return result(f'query_c{concurrency}', len(records), seconds, [r['latency_ms'] for r in records],
+                  concurrency=concurrency, errors=errors)
+
+
+def bench_textspark(workdir: Path, queries: List[str], concurrency: int, generator: CorpusGenerator) -> List[Dict[str, Any]]:
+    # TextSpark reads config.yaml from the working directory when imported
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from textspark.app import app
+        client = app.test_client
+        records = []
+        errors = []
+
+        def get(response):
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+            return response
+
+        latencies, seconds = run_concurrently(
+            lambda i: get(client().post('/', data={'search': queries[i % len(queries)]})), len(queries), concurrency)
+        records.append(result('textspark_search', len(queries), seconds, latencies, concurrency=concurrency,
+                              errors=len(errors)))
+
+        count = max(10, len(queries) // 4)
+        errors.clear()
+        latencies, seconds = run_concurrently(lambda i: get(client().get('/status')), count, concurrency)
+        records.append(result('textspark_status', count, seconds, latencies, concurrency=concurrency,
+                              errors=len(errors)))
+
+        uploads = workdir / 'uploads'
+        uploads.mkdir(exist_ok=True)
+        texts = [generator.text('research', 4096) for _ in range(count)]
+
+        def upload(i):
+            with client() as c:
+                response = get(c.post('/upload?format=json', data={
+                    'file': (io.BytesIO(texts[i].encode('utf-8')), f'upload-{i}.txt'),
+                    'category': 'benchmark'}, content_type='multipart/form-data'))
+                status_url = response.get_json()['status_url']
+                while True:
+                    state = c.get(status_url).get_json()['state']
+                    if state in ('done', 'failed'):
+                        break
+                    time.sleep(0.005)
+                if state == 'failed':
+                    errors.append(state)
+
+        errors.clear()
+        latencies, seconds = run_concurrently(upload, count, concurrency)
+        records.append(result('textspark_upload', count, seconds, latencies, concurrency=concurrency,
+                              errors=len(errors), latency='upload until the ingestion job finished'))
+        return records
+    finally:
+        os.chdir(previous)
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str):
+    """Print throughput and p95 changes against an earlier run."""
+    baseline = {r['name']: r for r in json.loads(Path(baseline_path).read_text())['results']}
+    print(f"{'benchmark':<22}{'throughput':>22}{'p95 ms':>24}", file=sys.stderr)
+    for record in results:
+        old = baseline.get(record['name'])
+        if not old:
+            continue
+
+        def change(new, before):
+            if new is None or not before:
+                return 'n/a'
+            return f"{before:.1f} -> {new:.1f} ({(new - before) / before * 100:+.0f}%)"
+
+        p95 = (record['latency_ms'] or {}).get('p95')
+        old_p95 = (old.get('latency_ms') or {}).get('p95')
+        print(f"{record['name']:<22}{change(record['throughput_per_s'], old['throughput_per_s']):>22}"
+              f"{change(p95, old_p95):>24}", file=sys.stderr)
+
+
+def run(args) -> Dict[str, Any]:
+    only = [name for name in args.only.split(',') if name] if args.only else list(BENCHMARKS)
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+    mindsdb_url = args.mindsdb_url or (
+        f"fake://bench-{os.getpid()}-{time.time_ns()}?search_ms={args.search_ms}&insert_ms={args.insert_ms}"
+        f"&row_ms={args.row_ms}&jitter={args.jitter}&workers={args.server_workers}&seed={args.seed}")
+    generator = CorpusGenerator(args.seed)
+    queries = generator.queries(args.queries)
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix='texttrove-bench-') as tmp:
+        workdir = Path(tmp)
+        docs = workdir / 'docs'
+        files = make_corpus(docs, files=args.files, size_kb=args.size_kb, formats=args.formats.split(','), seed=args.seed)
+        config = {'mindsdb_url': mindsdb_url, 'kb_name': 'texttrove_bench', 'cache_enabled': False,
+                  'chunk_size': 1000, 'chunk_overlap': 200, 'lexical_index': not args.no_lexical,
+                  'dedup': not args.no_dedup, 'pool_size': max(4, args.concurrency[-1] if args.concurrency else 4)}
+
+        if 'extraction' in only:
+            results.extend(bench_extraction(files, args.workers))
+        if {'ingestion', 'query', 'textspark'} & set(only):
+            with cli_session(workdir, config) as cli:
+                cli.load_config()
+                ingest = bench_ingestion(cli, docs, args)
+                if 'ingestion' in only:
+                    results.append(ingest)
+                if 'query' in only:
+                    for concurrency in args.concurrency:
+                        results.append(bench_query(cli, workdir, queries, concurrency))
+        if 'textspark' in only:
+            results.extend(bench_textspark(workdir, queries, max(args.concurrency), generator))
+
+    return {
+        'suite': 'texttrove-benchmark',
+        'version': 1,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': {**vars(args), 'mindsdb_url': mindsdb_url},
+        'results': results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="TextTrove offline benchmarks")
+    parser.add_argument('--only', help=f"Comma separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--output', '-o', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="Earlier JSON report to compare against (printed to stderr)")
+    parser.add_argument('--files', type=int, default=30, help="Documents in the synthetic corpus")
+    parser.add_argument('--size-kb', type=float, default=16, help="Approximate size of each document")
+    parser.add_argument('--formats', default='txt,md,pdf', help="Document formats to rotate through")
+    parser.add_argument('--queries', type=int, default=200, help="Searches per query benchmark")
+    parser.add_argument('--concurrency', type=lambda v: [int(c) for c in v.split(',')], default=[1, 8, 32],
+                        help="Comma separated fan-out levels for the query benchmark")
+    parser.add_argument('--workers', type=int, default=2, help="Extraction worker processes")
+    parser.add_argument('--batch-size', type=int, default=100, help="Rows per insert")
+    parser.add_argument('--search-ms', type=float, default=20, help="Fake server latency per search")
+    parser.add_argument('--insert-ms', type=float, default=30, help="Fake server latency per insert call")
+    parser.add_argument('--row-ms', type=float, default=0.5, help="Fake server latency per inserted row")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Latency jitter as a fraction")
+    parser.add_argument('--server-workers', type=int, default=16, help="Calls the fake server serves at once")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-lexical', action='store_true', help="Skip the BM25 index during ingest")
+    parser.add_argument('--no-dedup', action='store_true', help="Skip passage deduplication during ingest")
+    parser.add_argument('--mindsdb-url', help="Benchmark this MindsDB server instead of the fake one")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+        for record in report['results']:
+            latency = record['latency_ms'] or {}
+            columns = '  '.join(f"{p} {latency[p]:>8.1f} ms" if p in latency else f"{p} {'-':>8} ms"
+                                for p in ('p50', 'p95', 'p99'))
+            print(f"{record['name']:<22} {record['throughput_per_s'] or 0:>10.1f}/s  {columns}", file=sys.stderr)
+    else:
+        print(text)
+    if args.compare:
+        compare(report['results'], args.compare)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Shared fixtures for TextTrove tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Settings for CLI tests: an in-process vector store with deterministic embeddings
+LOCAL_CONFIG = {'backend': 'local', 'local_embedding': 'hashing', 'cache_enabled': False}
+
+# Module-level connections and caches of texttrove.cli, as they are before first use
+CLI_STATE = {
+    'server': None,
+    'config': {},
+    'backend': None,
+    'lexical_index': None,
+    'dedup_index': None,
+    'kb_handles': {},
+    'kb_resolver': None,
+    'fanout_executor': None,
+    'summary_executor': None,
+    'llm_clients': {},
+    'result_cache': None,
+    'summary_cache': None,
+    'daemon_mode': False,
+}
+
+
+@pytest.fixture
+def fresh_cli(monkeypatch):
+    """The cli module with every process-wide connection and cache reset for this test."""
+    from texttrove import cli
+
+    for name, value in CLI_STATE.items():
+        # Fresh containers, so a test never fills the dict or list another one sees
+        monkeypatch.setattr(cli, name, type(value)() if isinstance(value, (dict, list)) else value)
+    return cli
+
+
+@pytest.fixture
+def cli_workspace(tmp_path, monkeypatch, fresh_cli):
+    """
+    Run CLI commands in tmp_path with a fresh cli module.
+
+    Returns a function writing config.yaml from LOCAL_CONFIG updated with its
+    keyword arguments; it returns the cli module.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def configure(**settings):
+        (tmp_path / 'config.yaml').write_text(yaml.safe_dump({**LOCAL_CONFIG, **settings}))
+        return fresh_cli
+    return configure
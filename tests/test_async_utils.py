@@ -0,0 +1,61 @@
+"""
+Async execution layer tests for TextTrove
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.async_utils import AsyncExecutor, run_async_safely
+
+
+class SlowKB:
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def search(self, query, limit):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return [{'content': query}] * limit
+
+
+def test_searches_overlap_up_to_the_concurrency_limit():
+    kb = SlowKB(0.1)
+    executor = AsyncExecutor(max_concurrency=4)
+
+    async def fan_out():
+        return await executor.gather(*(executor.call(kb.search, query=f"q{i}", limit=1) for i in range(8)))
+
+    start = time.perf_counter()
+    results = run_async_safely(fan_out())
+    assert [r[0]['content'] for r in results] == [f"q{i}" for i in range(8)]
+    assert kb.peak == 4
+    assert time.perf_counter() - start < 0.6
+
+
+def test_timeout_cancels_the_waiting_call():
+    executor = AsyncExecutor(timeout=0.1)
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        run_async_safely(executor.call(SlowKB(1.0).search, query='q', limit=1))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_bridge_works_inside_a_running_loop():
+    async def outer():
+        return run_async_safely(AsyncExecutor().call(lambda: 'done'))
+
+    assert asyncio.run(outer()) == 'done'
@@ -0,0 +1,70 @@
+"""
+Retrieval backend tests for TextTrove
+"""
+import os
+import sys
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.backends import HashingEmbedder, LocalVectorBackend
+
+TOPICS = ['solar panels convert sunlight', 'river otters eat fish', 'compilers translate source code',
+          'volcanoes erupt molten lava', 'bakers knead bread dough', 'satellites orbit the earth']
+
+
+def test_local_backend_search_upsert_and_delete(tmp_path):
+    backend = LocalVectorBackend(tmp_path, HashingEmbedder(256))
+    kb = backend.create('kb')
+    kb.insert([{'id': f"doc-{i}", 'content': text, 'metadata': {'source': f"{i}.txt"}}
+               for i, text in enumerate(TOPICS)])
+
+    results = kb.search(query='what do otters eat', limit=2)
+    assert results[0]['id'] == 'doc-1' and results[0]['metadata'] == {'source': '1.txt'}
+    assert results[0]['relevance'] > results[1]['relevance']
+
+    # Re-inserting an id replaces the row; deleted rows never come back
+    kb.insert([{'id': 'doc-1', 'content': 'beavers build dams', 'metadata': {}}])
+    backend.delete('kb', ['doc-4'])
+    ids = [r['id'] for r in kb.search(query='otters beavers bread', limit=10)]
+    assert sorted(ids) == ['doc-0', 'doc-1', 'doc-2', 'doc-3', 'doc-5']
+    assert kb.search(query='beavers', limit=1)[0]['content'] == 'beavers build dams'
+
+    # A second handle on the same folder sees the same data
+    other = LocalVectorBackend(tmp_path, HashingEmbedder(256))
+    assert other.list() == ['kb']
+    assert other.get('kb').search(query='volcano lava', limit=1)[0]['id'] == 'doc-3'
+
+
+def test_coarse_index_finds_the_exact_neighbours(tmp_path):
+    kb = LocalVectorBackend(tmp_path, HashingEmbedder(128), nprobe=4).create('kb')
+    rows = [{'id': str(i), 'content': f"{TOPICS[i % len(TOPICS)]} variant {i} note {i * 7 % 13}", 'metadata': {}}
+            for i in range(600)]
+    kb.insert(rows)
+    exact = [r['id'] for r in kb.search(query='river otters variant 13', limit=5)]
+
+    kb.build_index(clusters=8)
+    kb.insert([{'id': 'late', 'content': 'river otters variant 13 added after indexing', 'metadata': {}}])
+    approximate = [r['id'] for r in kb.search(query='river otters variant 13', limit=5)]
+    assert exact[0] in approximate
+    assert 'late' in approximate
+
+
+def test_cli_ingest_and_query_with_local_backend(tmp_path, cli_workspace):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    for i, text in enumerate(TOPICS):
+        (docs / f"{i}.txt").write_text(text + '.')
+    cli = cli_workspace(kb_name='local_kb')
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ['ingest', 'docs', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / 'texttrove_index' / 'local_kb' / 'vectors.f32').exists()
+
+    result = runner.invoke(cli.app, ['query', 'molten lava', '--limit', '1'])
+    assert result.exit_code == 0, result.output
+    assert '3.txt' in result.output
@@ -0,0 +1,64 @@
+"""
+Batch query tests for TextTrove
+"""
+import io
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.batch import latency_summary, read_requests, run_batch
+
+
+def slow_search(kb_name, query, limit):
+    time.sleep(0.5 if query == 'slow' else 0.01 * (limit % 3))
+    return [{'content': f"{kb_name}:{query}"}] * limit
+
+
+def make_requests(lines):
+    return read_requests(io.StringIO('\n'.join(lines)), default_kb='kb', default_limit=2)
+
+
+def test_results_can_be_returned_in_input_order():
+    lines = [json.dumps({'search': f"q{i}", 'limit': (i % 3) + 1, 'id': f"r{i}"}) for i in range(30)]
+    records = list(run_batch(make_requests(lines), slow_search, concurrency=4, ordered=True))
+    assert [r['id'] for r in records] == [f"r{i}" for i in range(30)]
+    assert all(r['status'] == 'ok' for r in records)
+    assert records[4]['results'] == [{'content': 'kb:q4'}] * 2
+
+
+def test_timeouts_and_bad_lines_are_reported():
+    lines = [json.dumps({'query': 'slow'}), 'not json', json.dumps({'search': 'fast', 'kb_name': 'other'})]
+    records = {r['index']: r for r in run_batch(make_requests(lines), slow_search, concurrency=2, timeout=0.1)}
+    assert records[0]['status'] == 'timeout'
+    assert records[1]['status'] == 'error'
+    assert records[2]['status'] == 'ok'
+    assert records[2]['results'][0]['content'] == 'other:fast'
+
+
+def test_latency_summary():
+    summary = latency_summary([float(i) for i in range(1, 101)])
+    assert summary['p50'] == 51.0 and summary['max'] == 100.0
+
+
+def test_hung_searches_do_not_stall_queued_requests():
+    release = threading.Event()
+
+    def hung_search(kb_name, query, limit):
+        release.wait(5)
+        return []
+
+    lines = [json.dumps({'query': f'q{i}'}) for i in range(6)]
+    start = time.perf_counter()
+    try:
+        records = list(run_batch(make_requests(lines), hung_search, concurrency=2, timeout=0.1))
+    finally:
+        release.set()
+    # Requests queued behind the stuck workers time out rather than waiting on them
+    assert time.perf_counter() - start < 2
+    assert sorted(r['index'] for r in records) == list(range(6))
+    assert all(r['status'] == 'timeout' for r in records)
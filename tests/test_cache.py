@@ -0,0 +1,61 @@
+"""
+Query result cache tests for TextTrove
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.cache import DiskCache, MemoryCache, cached_search
+
+
+def make_search(calls):
+    def search():
+        calls.append(1)
+        return [{'content': 'hello', 'metadata': {'source': 'a.txt'}}]
+    return search
+
+
+def test_memory_cache_hits_and_invalidates():
+    cache = MemoryCache()
+    calls = []
+    for _ in range(3):
+        results = cached_search(cache, 'kb', 'hello', 5, make_search(calls))
+    assert results[0]['content'] == 'hello'
+    assert len(calls) == 1
+
+    cache.invalidate('kb')
+    cached_search(cache, 'kb', 'hello', 5, make_search(calls))
+    assert len(calls) == 2
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set('kb', 'a', 1)
+    cache.set('kb', 'b', 2)
+    cache.get('a')
+    cache.set('kb', 'c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    calls = []
+    first = DiskCache(tmp_path / "cache.db")
+    cached_search(first, 'kb', 'hello', 5, make_search(calls))
+    second = DiskCache(tmp_path / "cache.db")
+    assert cached_search(second, 'kb', 'hello', 5, make_search(calls))[0]['metadata']['source'] == 'a.txt'
+    assert len(calls) == 1
+
+    second.invalidate('kb')
+    cached_search(first, 'kb', 'hello', 5, make_search(calls))
+    assert len(calls) == 2
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", ttl=0.01)
+    cache.set('kb', 'key', [1])
+    time.sleep(0.02)
+    assert cache.get('key') is None
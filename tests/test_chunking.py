@@ -0,0 +1,47 @@
+"""
+Passage chunking tests for TextTrove
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from texttrove.chunking import chunk_rows, iter_chunks
+
+TEXT = ' '.join(f"Sentence number {i} is here." for i in range(60))
+
+
+def test_chunks_point_back_into_the_text():
+    chunks = list(iter_chunks(TEXT, chunk_size=200, overlap=50))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert TEXT[chunk.start:chunk.end] == chunk.text
+        assert len(chunk.text) <= 200
+        assert chunk.text.endswith('.')
+    assert chunks[-1].end == len(TEXT)
+    # Consecutive chunks overlap
+    assert all(b.start < a.end for a, b in zip(chunks, chunks[1:]))
+
+
+def test_segments_chunk_like_the_joined_text():
+    segments = [TEXT[i:i + 37] for i in range(0, len(TEXT), 37)]
+    assert list(iter_chunks(iter(segments), 200, 50)) == list(iter_chunks(TEXT, 200, 50))
+
+
+def test_token_windows():
+    chunks = list(iter_chunks(TEXT, chunk_size=20, overlap=5, unit='tokens'))
+    assert all(len(chunk.text.split()) <= 20 for chunk in chunks)
+
+
+def test_zero_chunk_size_keeps_whole_document():
+    rows = list(chunk_rows(TEXT, {'source': 'a.txt'}, chunk_size=0, overlap=0))
+    assert len(rows) == 1
+    assert rows[0]['metadata'] == {'source': 'a.txt', 'chunk_index': 0, 'start_offset': 0, 'end_offset': len(TEXT)}
+
+
+def test_rejects_overlap_larger_than_window():
+    with pytest.raises(ValueError):
+        list(iter_chunks(TEXT, chunk_size=10, overlap=10))
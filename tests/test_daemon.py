@@ -0,0 +1,81 @@
+"""
+Daemon forwarding tests for TextTrove
+"""
+import os
+import socket
+import stat
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove import cli, client
+from texttrove.daemon import open_server
+
+
+class FakeKB:
+    def search(self, query, limit):
+        return [{'content': f"passage about {query}", 'metadata': {'source': 'notes.txt'}}]
+
+
+class FakeKnowledgeBases:
+    def get(self, name):
+        return FakeKB()
+
+
+class FakeServer:
+    knowledge_bases = FakeKnowledgeBases()
+
+
+def test_query_is_forwarded_to_the_daemon(tmp_path, monkeypatch, capsys, fresh_cli):
+    monkeypatch.setattr(cli, 'server', FakeServer())
+    monkeypatch.setattr(cli, 'config', {'kb_name': 'kb', 'cache_enabled': False})
+    monkeypatch.setattr(cli, 'daemon_mode', True)
+
+    socket_path = str(tmp_path / "texttrove.sock")
+    daemon = open_server(socket_path)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert client.forward(['query', 'rivers', '--limit', '1'], socket_path) == 0
+        assert "passage about rivers" in capsys.readouterr().out
+        assert client.forward(['query', 'rivers', '--limit', 'x'], socket_path) == 2
+        # Commands failing with typer.Exit keep their exit code through the daemon
+        assert client.forward(['query', 'rivers', '--mode', 'bogus'], socket_path) == 1
+        assert client.forward(['query'], socket_path) == 1
+        # Values of global options are not mistaken for the command
+        assert client.command_name(['--metrics', 'out.prom', 'query', 'rivers']) == 'query'
+        assert client.command_name(['--profile-json', 'query', 'status']) == 'status'
+        metrics = tmp_path / 'metrics.prom'
+        assert client.forward(['--metrics', str(metrics), 'query', 'rivers', '--limit', '1'], socket_path) == 0
+        assert "passage about rivers" in capsys.readouterr().out and metrics.exists()
+        # Help and unknown sockets are left to the in-process CLI
+        assert client.forward(['query', '--help'], socket_path) is None
+        assert client.forward(['query', 'rivers'], str(tmp_path / "missing.sock")) is None
+    finally:
+        daemon.shutdown()
+        daemon.server_close()
+
+
+def test_socket_is_private_and_only_stale_sockets_are_replaced(tmp_path):
+    path = tmp_path / "texttrove.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+
+    server = open_server(str(path))
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    finally:
+        server.server_close()
+        path.unlink()
+
+    # Anything else at the path is someone's file, not a leftover socket
+    path.write_text("notes")
+    with pytest.raises(FileExistsError):
+        open_server(str(path))
+    assert path.read_text() == "notes"
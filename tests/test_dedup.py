@@ -0,0 +1,120 @@
+"""
+Passage deduplication tests for TextTrove
+"""
+import random
+import sys
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.chunking import iter_chunks
+from texttrove.dedup import DedupIndex, content_hash, lsh_bands
+
+WORDS = ("report revenue region budget forecast quarter sales staff office project risk audit "
+         "client contract delivery schedule team review market growth cost margin plan").split()
+
+
+def paragraph(seed, words=150):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(words)) + '.'
+
+
+def kept(index, kb_name, rows):
+    skipped = []
+    passed = list(index.filter(kb_name, rows, on_skip=lambda row, of, kind: skipped.append((row['id'], of, kind))))
+    return [row['id'] for row in passed], skipped
+
+
+def test_exact_hash_ignores_case_and_whitespace():
+    assert content_hash("Quarterly  Report\n2024") == content_hash("quarterly report 2024")
+    assert content_hash("Quarterly report 2024") != content_hash("Quarterly report 2025")
+
+
+def test_band_choice_brackets_the_threshold():
+    for threshold in (0.5, 0.7, 0.85, 0.95):
+        bands, rows = lsh_bands(128, threshold)
+        assert bands * rows == 128
+        assert (1 / bands) ** (1 / rows) <= threshold
+
+
+def test_exact_and_near_duplicates_are_skipped(tmp_path):
+    index = DedupIndex(tmp_path / "dedup.db", threshold=0.8)
+    original = paragraph(1)
+    edited = original.replace(original.split()[10], "amended", 1)
+    ids, skipped = kept(index, 'kb', [
+        {'id': 'a-0', 'content': original},
+        {'id': 'a-1', 'content': paragraph(2)},
+        {'id': 'b-0', 'content': original.upper()},
+        {'id': 'c-0', 'content': edited},
+    ])
+    assert ids == ['a-0', 'a-1']
+    assert skipped == [('b-0', 'a-0', 'exact'), ('c-0', 'a-0', 'near')]
+
+    # Knowledge bases are deduplicated separately
+    ids, _ = kept(index, 'other', [{'id': 'b-0', 'content': original}])
+    assert ids == ['b-0']
+    assert index.stats('kb') == {'kept': 2, 'skipped': 2}
+    index.close()
+
+
+def test_exact_only_and_reingest_of_kept_rows(tmp_path):
+    index = DedupIndex(tmp_path / "dedup.db", threshold=1.0)
+    original = paragraph(1)
+    edited = original.replace(original.split()[10], "amended", 1)
+    ids, _ = kept(index, 'kb', [{'id': 'a-0', 'content': original}, {'id': 'c-0', 'content': edited}])
+    assert ids == ['a-0', 'c-0']
+    # Re-ingesting the same rows (e.g. --force) keeps them
+    ids, _ = kept(index, 'kb', [{'id': 'a-0', 'content': original}, {'id': 'c-0', 'content': edited}])
+    assert ids == ['a-0', 'c-0']
+    index.close()
+
+
+def test_release_reports_orphaned_duplicates(tmp_path):
+    path = tmp_path / "dedup.db"
+    index = DedupIndex(path)
+    text = paragraph(3)
+    kept(index, 'kb', [{'id': 'a-0', 'content': text}, {'id': 'b-0', 'content': text}, {'id': 'c-0', 'content': text}])
+    index.close()
+
+    index = DedupIndex(path)
+    assert sorted(index.release('kb', ['a-0'])) == ['b-0', 'c-0']
+    ids, _ = kept(index, 'kb', [{'id': 'b-0', 'content': text}, {'id': 'c-0', 'content': text}])
+    assert ids == ['b-0']
+    assert index.release('kb', ['c-0']) == []
+    index.close()
+
+
+def test_ingest_skips_copies_and_reingests_them_when_the_original_goes(tmp_path, cli_workspace):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    report = '\n\n'.join(paragraph(seed) for seed in range(4))
+    (docs / 'report.txt').write_text(report)
+    (docs / 'report copy.txt').write_text(report)
+    (docs / 'report v2.txt').write_text(report.replace(report.split()[5], 'amended', 1))
+    (docs / 'other.txt').write_text(paragraph(99))
+    cli = cli_workspace(kb_name='dedup_kb', lexical_index=False, chunk_size=400, chunk_overlap=0)
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ['ingest', 'docs', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Passages Skipped (duplicates)' in result.output
+    report_chunks = len(list(iter_chunks(report, chunk_size=400, overlap=0)))
+    other_chunks = len(list(iter_chunks(paragraph(99), chunk_size=400, overlap=0)))
+    # One copy of the report and the other document are kept; both copies are skipped
+    assert cli.get_dedup_index().stats('dedup_kb') == {'kept': report_chunks + other_chunks, 'skipped': 2 * report_chunks}
+    kb = cli.get_backend().get('dedup_kb')
+    assert kb.count() == report_chunks + other_chunks
+
+    # Deleting the kept copy brings the duplicates back in
+    kept_sources = {row['metadata']['source'] for row in kb.search(query=report[:200], limit=50)} - {'other.txt'}
+    for source in kept_sources:
+        (docs / source).unlink()
+    result = runner.invoke(cli.app, ['ingest', 'docs', '--workers', '1', '--prune'])
+    assert result.exit_code == 0, result.output
+    assert 'Re-ingesting' in result.output
+    sources = {row['metadata']['source'] for row in kb.search(query=report[:200], limit=50)} - {'other.txt'}
+    assert sources and not sources & kept_sources
+    assert len(kb.search(query=report[:200], limit=100)) == report_chunks + other_chunks
@@ -0,0 +1,125 @@
+"""
+Multi knowledge base search fan-out tests for TextTrove
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.async_utils import AsyncExecutor
+from texttrove.fanout import KBNameResolver, fan_out, is_multi_kb, merge_results
+
+
+def test_resolver_expands_lists_and_globs():
+    listings = []
+
+    def list_kbs():
+        listings.append(1)
+        return ['dept_sales', 'dept_hr', 'archive']
+
+    resolver = KBNameResolver(list_kbs, ttl=60)
+    assert resolver.resolve('dept_*') == ['dept_hr', 'dept_sales']
+    # Plain names are kept even if unlisted; repeats are dropped
+    assert resolver.resolve(' archive, dept_*,missing,archive ') == ['archive', 'dept_hr', 'dept_sales', 'missing']
+    assert resolver.resolve(['dept_s*', 'archive']) == ['dept_sales', 'archive']
+    assert len(listings) == 1
+    with pytest.raises(ValueError):
+        resolver.resolve('nothing_*')
+
+    assert not is_multi_kb('texttrove_kb') and not is_multi_kb('texttrove_kb,')
+    assert is_multi_kb('a,b') and is_multi_kb('dept_?') and is_multi_kb(['a', 'b'])
+
+
+def test_merge_by_relevance_and_rank_fallback():
+    shards = {
+        'a': [{'content': 'a1', 'relevance': 0.9}, {'content': 'a2', 'relevance': 0.4}],
+        'b': [{'content': 'b1', 'relevance': 0.7}, {'content': 'b2', 'relevance': 0.2}],
+    }
+    merged = merge_results(shards, 3, 'relevance')
+    assert [row['content'] for row in merged] == ['a1', 'b1', 'a2']
+    assert [row['kb_name'] for row in merged] == ['a', 'b', 'a']
+    assert 'kb_name' not in shards['a'][0]
+
+    # Without the score on every row shards are interleaved by rank
+    unscored = {'a': [{'content': 'a1'}, {'content': 'a2'}], 'b': [{'content': 'b1', 'relevance': 5}]}
+    assert [row['content'] for row in merge_results(unscored, 5, 'relevance')] == ['a1', 'b1', 'a2']
+
+
+def test_scores_on_different_scales_are_merged_by_rank():
+    # Hybrid rows keep cosine relevance when found semantically but only an RRF score when lexical-only
+    hybrid = {
+        'a': [{'content': 'a-lex', 'rrf_score': 0.0164}, {'content': 'a-sem', 'relevance': 0.9, 'rrf_score': 0.0161}],
+        'b': [{'content': 'b-sem', 'relevance': 0.05, 'rrf_score': 0.0164}],
+    }
+    assert [row['content'] for row in merge_results(hybrid, 3)] == ['a-lex', 'b-sem', 'a-sem']
+    # BM25 scores depend on each KB's statistics
+    lexical = {'a': [{'content': 'a1', 'score': 1.2}, {'content': 'a2', 'score': 1.1}],
+               'b': [{'content': 'b1', 'score': 9.0}, {'content': 'b2', 'score': 8.0}]}
+    assert [row['content'] for row in merge_results(lexical, 4)] == ['a1', 'b1', 'a2', 'b2']
+
+    result = fan_out(lambda kb_name: hybrid[kb_name], ['a', 'b'], 3, score_key=None)
+    assert [row['content'] for row in result.results] == ['a-lex', 'b-sem', 'a-sem']
+
+
+def test_failed_and_slow_shards_leave_partial_results():
+    def search(kb_name):
+        if kb_name == 'broken':
+            raise ConnectionError("knowledge base unavailable")
+        if kb_name == 'slow':
+            time.sleep(1)
+        return [{'content': f'{kb_name} row', 'relevance': 0.5}]
+
+    start = time.perf_counter()
+    result = fan_out(search, ['fast', 'broken', 'slow'], 5, executor=AsyncExecutor(max_concurrency=3), timeout=0.2)
+    assert time.perf_counter() - start < 0.9
+    assert [row['kb_name'] for row in result.results] == ['fast']
+    assert result.partial and not result.failed
+    assert result.timeouts == ['slow']
+    assert result.errors == {'broken': "knowledge base unavailable", 'slow': "timed out after 0.2s"}
+    assert set(result.latency_ms) == {'fast', 'broken', 'slow'}
+
+    assert fan_out(search, ['broken'], 5).failed
+
+
+def test_timeouts_without_a_limit_are_reported():
+    def search(kb_name):
+        if kb_name == 'coalesced':
+            raise TimeoutError("waited too long for a shared search")
+        if kb_name == 'bare':
+            raise TimeoutError()
+        return [{'content': f'{kb_name} row', 'relevance': 0.5}]
+
+    result = fan_out(search, ['fast', 'coalesced', 'bare'], 5)
+    assert [row['kb_name'] for row in result.results] == ['fast']
+    assert result.timeouts == ['coalesced', 'bare']
+    assert result.errors == {'coalesced': "waited too long for a shared search", 'bare': "timed out"}
+
+
+def test_cli_query_searches_several_kbs(tmp_path, cli_workspace):
+    for kb_name, text in (('dept_sales', "quarterly revenue rose in the northern region. "),
+                          ('dept_hr', "the revenue sharing policy for staff bonuses. ")):
+        docs = tmp_path / kb_name
+        docs.mkdir()
+        (docs / f'{kb_name}.txt').write_text(text * 20)
+    cli = cli_workspace(kb_name='dept_sales', lexical_index=False, dedup=False)
+
+    runner = CliRunner()
+    for kb_name in ('dept_sales', 'dept_hr'):
+        result = runner.invoke(cli.app, ['ingest', kb_name, '--kb-name', kb_name, '--workers', '1'])
+        assert result.exit_code == 0, result.output
+
+    result = runner.invoke(cli.app, ['query', 'revenue', '--kb-name', 'dept_*', '--limit', '2'])
+    assert result.exit_code == 0, result.output
+    assert 'dept_sales' in result.output and 'dept_hr' in result.output
+
+    # A missing KB is reported and skipped; the rest still answer
+    result = runner.invoke(cli.app, ['query', 'revenue', '--kb-name', 'dept_hr,missing_kb'])
+    assert result.exit_code == 0, result.output
+    assert "missing_kb' skipped" in result.output and 'dept_hr' in result.output
+    result = runner.invoke(cli.app, ['query', 'revenue', '--kb-name', 'missing_kb,other_missing'])
+    assert result.exit_code == 1
@@ -0,0 +1,50 @@
+"""
+Background job queue tests for TextTrove
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.jobs import JobQueue, QueueFull
+
+
+def test_jobs_report_states_and_outcome():
+    jobs = JobQueue(workers=2)
+    release = threading.Event()
+
+    def work(job):
+        job.update('extracting')
+        release.wait(5)
+        job.update('inserting', rows=3)
+
+    def broken(job):
+        raise ValueError("unreadable")
+
+    ok = jobs.submit('a.pdf', work)
+    failed = jobs.submit('b.pdf', broken)
+    time.sleep(0.05)
+    assert jobs.get(ok.id).state == 'extracting'
+    release.set()
+    jobs.join()
+
+    assert ok.to_dict()['state'] == 'done' and ok.detail == {'rows': 3}
+    assert failed.state == 'failed' and failed.error == 'unreadable'
+    assert jobs.stats()['done'] == 1 and jobs.stats()['failed'] == 1
+
+
+def test_submit_is_bounded():
+    jobs = JobQueue(workers=1, max_queued=1)
+    release = threading.Event()
+    jobs.submit('running', lambda job: release.wait(5))
+    time.sleep(0.05)
+    jobs.submit('waiting', lambda job: None)
+    with pytest.raises(QueueFull):
+        jobs.submit('rejected', lambda job: None)
+    release.set()
+    jobs.join()
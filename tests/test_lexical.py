@@ -0,0 +1,91 @@
+"""
+Lexical index and hybrid search tests for TextTrove
+"""
+import sys
+import time
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.lexical import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+def test_identifiers_are_kept_whole_and_split():
+    assert tokenize("Fixed JIRA-1234 (err_conn_reset)") == [
+        'fixed', 'jira-1234', 'jira', '1234', 'err_conn_reset', 'err', 'conn', 'reset']
+
+
+def test_bm25_ranking_replacement_and_deletion(tmp_path):
+    index = LexicalIndex(tmp_path / 'lexical.db')
+    index.add('kb', [
+        {'id': 'a-0', 'content': 'Ticket JIRA-1234 reports a timeout in the upload path', 'metadata': {'source': 'a.txt'}},
+        {'id': 'b-0', 'content': 'Timeouts happen. Timeouts everywhere. Upload timeouts.', 'metadata': {}},
+        {'id': 'c-0', 'content': 'Unrelated notes about lunch', 'metadata': {}},
+    ])
+    index.add('other_kb', [{'id': 'a-0', 'content': 'JIRA-1234 in another knowledge base', 'metadata': {}}])
+
+    results = index.search('kb', 'jira-1234', 5)
+    assert [r['id'] for r in results] == ['a-0']
+    assert results[0]['metadata'] == {'source': 'a.txt'}
+    assert [r['id'] for r in index.search('kb', 'timeouts', 5)][0] == 'b-0'
+
+    index.add('kb', [{'id': 'a-0', 'content': 'Ticket closed', 'metadata': {}}])
+    assert index.search('kb', 'jira-1234', 5) == []
+    index.delete('kb', ['b-0'])
+    assert [r['id'] for r in index.search('kb', 'upload timeouts', 5)] == []
+    assert len(index.search('other_kb', 'jira-1234', 5)) == 1
+
+    start = time.perf_counter()
+    index.search('kb', 'ticket lunch notes', 5)
+    assert time.perf_counter() - start < 0.05
+    index.close()
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    semantic = [{'id': 'x'}, {'id': 'y'}, {'id': 'z'}]
+    lexical = [{'id': 'y'}, {'id': 'w'}]
+    fused = reciprocal_rank_fusion([semantic, lexical], limit=3)
+    assert [r['id'] for r in fused] == ['y', 'x', 'w']
+    assert fused[0]['rrf_score'] > fused[1]['rrf_score']
+
+
+def test_query_modes_with_local_backend(tmp_path, cli_workspace):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'incident.txt').write_text('Outage traced to error code E1337 in the billing service.')
+    (docs / 'garden.txt').write_text('Tomatoes need plenty of sun and water.')
+    cli = cli_workspace(kb_name='local_kb')
+
+    runner = CliRunner()
+    assert runner.invoke(cli.app, ['ingest', 'docs', '--workers', '1']).exit_code == 0
+    for mode in ('lexical', 'hybrid'):
+        result = runner.invoke(cli.app, ['query', 'E1337', '--mode', mode, '--limit', '1'])
+        assert result.exit_code == 0, result.output
+        assert 'incident.txt' in result.output
+    assert runner.invoke(cli.app, ['query', 'x', '--mode', 'fuzzy']).exit_code == 1
+
+
+def test_failed_inserts_leave_no_postings(tmp_path, monkeypatch, cli_workspace):
+    from texttrove.backends import LocalKnowledgeBase
+
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'incident.txt').write_text('Outage traced to error code E1337 in the billing service.')
+    (docs / 'garden.txt').write_text('Tomatoes need plenty of sun and water.')
+    cli = cli_workspace(kb_name='local_kb')
+    insert = LocalKnowledgeBase.insert
+
+    def failing_insert(self, rows):
+        if any(row['metadata']['source'] == 'incident.txt' for row in rows):
+            raise RuntimeError("insert failed")
+        insert(self, rows)
+
+    monkeypatch.setattr(LocalKnowledgeBase, 'insert', failing_insert)
+    result = CliRunner().invoke(cli.app, ['ingest', 'docs', '--workers', '1', '--batch-size', '1'])
+    assert 'Failed: incident.txt' in result.output
+    lexical = cli.get_lexical_index()
+    assert lexical.search('local_kb', 'E1337') == []
+    assert lexical.search('local_kb', 'tomatoes')
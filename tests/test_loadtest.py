@@ -0,0 +1,94 @@
+"""
+Load testing tool tests for TextTrove
+"""
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.loadtest import LatencyHistogram, LoadTest, Workload, parse_mix
+
+
+class SlowTarget:
+    """Answers every route after a fixed delay; status fails every other call."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = {'search': 0, 'status': 0, 'upload': 0}
+        self.lock = threading.Lock()
+
+    def _call(self, route):
+        with self.lock:
+            self.calls[route] += 1
+            number = self.calls[route]
+        time.sleep(self.delay)
+        return 503 if route == 'status' and number % 2 == 0 else 200
+
+    def search(self, text):
+        return self._call('search')
+
+    def status(self):
+        return self._call('status')
+
+    def upload(self, name, content):
+        assert name.endswith('.txt') and content
+        return self._call('upload')
+
+
+def test_histogram_percentiles_stay_within_the_precision():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    ordered = sorted(values)
+    for p in (50, 90, 99, 99.9):
+        exact = ordered[int(-(-p * len(ordered) // 100)) - 1]
+        assert histogram.percentile(p) == pytest.approx(exact, rel=0.01, abs=0.002)
+    assert histogram.percentile(100) == pytest.approx(max(values), abs=0.001)
+    # Memory is bounded by buckets, not samples
+    assert len(histogram.counts) < 2000
+
+    merged = LatencyHistogram()
+    merged.merge(histogram)
+    merged.record(5000)
+    assert merged.count == 20001 and merged.summary()['max'] == 5000
+
+
+def test_mix_parsing():
+    assert parse_mix("search=80, status=15,upload=5") == {'search': 80, 'status': 15, 'upload': 5}
+    assert parse_mix("status") == {'status': 1.0}
+    for bad in ("search=x", "delete=1", "search=0", ""):
+        with pytest.raises(ValueError):
+            parse_mix(bad)
+
+
+def test_closed_loop_counts_errors_per_route():
+    target = SlowTarget(0.005)
+    test = LoadTest(target, parse_mix("search=2,status=1,upload=1"), Workload(queries=20, upload_kb=1))
+    report = test.closed_loop(concurrency=4, duration=0.5).report()
+    assert report['requests'] == sum(target.calls.values())
+    assert set(report['routes']) == {'search', 'status', 'upload'}
+    assert report['routes']['search']['errors'] == 0
+    status = report['routes']['status']
+    assert status['errors'] == target.calls['status'] // 2 == status['statuses'].get('503', 0)
+    assert report['latency_ms']['p50'] >= 5
+    # Four users with 5 ms requests cannot exceed 800 requests per second
+    assert report['throughput_per_s'] <= 800
+
+
+def test_open_loop_keeps_the_arrival_rate_and_counts_queueing():
+    fast = LoadTest(SlowTarget(0.001), {'search': 1}, Workload(queries=20)).open_loop(rate=200, duration=1, concurrency=8)
+    report = fast.report()
+    assert 120 <= report['requests'] <= 280
+    assert report['latency_ms']['p50'] < 20
+
+    # One slot and 20 ms requests at 100/s: the backlog shows up as latency
+    slow = LoadTest(SlowTarget(0.02), {'search': 1}, Workload(queries=20)).open_loop(rate=100, duration=0.5, concurrency=1)
+    assert slow.report()['latency_ms']['max'] > 100
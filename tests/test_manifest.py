@@ -0,0 +1,37 @@
+"""
+Incremental ingest manifest tests for TextTrove
+"""
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.manifest import Manifest
+
+
+def test_plan_tracks_new_modified_unchanged_and_removed(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (docs / name).write_text(name)
+    manifest = Manifest(tmp_path / "manifest.db")
+
+    plan = manifest.plan("kb", sorted(docs.iterdir()), docs)
+    assert [f.name for f in plan.new] == ["a.txt", "b.txt", "c.txt"]
+    manifest.record("kb", plan.states.values(), {path: 2 for path in plan.states})
+
+    (docs / "a.txt").write_text("changed")
+    os.utime(docs / "b.txt", (1, 1))  # touched, same content
+    (docs / "c.txt").unlink()
+
+    plan = manifest.plan("kb", sorted(docs.iterdir()), docs)
+    assert [f.name for f in plan.modified] == ["a.txt"]
+    assert [f.name for f in plan.unchanged] == ["b.txt"]
+    assert [Path(p).name for p in plan.removed] == ["c.txt"]
+    assert plan.chunks[str((docs / "a.txt").resolve())] == 2
+
+    # Other knowledge bases keep their own records
+    assert [f.name for f in manifest.plan("other", sorted(docs.iterdir()), docs).new] == ["a.txt", "b.txt"]
+    manifest.close()
@@ -0,0 +1,104 @@
+"""
+Metrics registry and instrumentation tests for TextTrove
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.cache import MemoryCache, cached_search
+from texttrove.metrics import EXTRACTIONS, SEARCHES, Registry, observe
+from texttrove.pipeline import extract_files
+
+
+def test_text_exposition_format():
+    registry = Registry()
+    calls = registry.counter('calls_total', "Calls", ('route', 'outcome'))
+    latency = registry.histogram('call_seconds', "Call latency", ('route',), buckets=(0.1, 1))
+    calls.inc(route='/a"b', outcome='ok')
+    calls.inc(2, route='/a"b', outcome='ok')
+    latency.observe(0.05, route='/')
+    latency.observe(0.5, route='/')
+    latency.observe(5, route='/')
+    assert registry.render().splitlines() == [
+        '# HELP calls_total Calls',
+        '# TYPE calls_total counter',
+        'calls_total{route="/a\\"b",outcome="ok"} 3',
+        '# HELP call_seconds Call latency',
+        '# TYPE call_seconds histogram',
+        'call_seconds_bucket{route="/",le="0.1"} 1',
+        'call_seconds_bucket{route="/",le="1"} 2',
+        'call_seconds_bucket{route="/",le="+Inf"} 3',
+        'call_seconds_sum{route="/"} 5.55',
+        'call_seconds_count{route="/"} 3',
+    ]
+    # Re-registering returns the same metric; a conflicting definition is refused
+    assert registry.counter('calls_total', "Calls", ('route', 'outcome')) is calls
+    with pytest.raises(ValueError):
+        registry.gauge('calls_total', "Calls", ('route', 'outcome'))
+    with pytest.raises(ValueError):
+        calls.inc(kb='x')
+
+
+def test_observe_records_outcomes():
+    registry = Registry()
+    calls = registry.counter('ops_total', "Ops", ('op', 'outcome'))
+    seconds = registry.histogram('op_seconds', "Op latency", ('op',))
+    with observe(calls, seconds, op='a'):
+        pass
+    with pytest.raises(RuntimeError):
+        with observe(calls, seconds, op='a'):
+            raise RuntimeError("boom")
+    with observe(calls, seconds, op='a') as labels:
+        labels['outcome'] = 'hit'
+
+    def tokens():
+        with observe(calls, seconds, op='stream'):
+            yield from 'abc'
+
+    stream = tokens()
+    next(stream)
+    stream.close()
+    assert [calls.value(op='a', outcome=o) for o in ('ok', 'error', 'hit')] == [1, 1, 1]
+    assert calls.value(op='stream', outcome='cancelled') == 1
+    assert seconds.count(op='a') == 3
+
+
+def test_search_and_extraction_paths_are_instrumented(tmp_path):
+    cache = MemoryCache()
+    before = {o: SEARCHES.value(kb='metrics_kb', outcome=o) for o in ('hit', 'miss', 'uncached')}
+    for _ in range(2):
+        cached_search(cache, 'metrics_kb', 'q', 5, lambda: [{'content': 'x'}])
+    cached_search(None, 'metrics_kb', 'q', 5, lambda: [])
+    assert {o: SEARCHES.value(kb='metrics_kb', outcome=o) - before[o] for o in before} == \
+        {'hit': 1, 'miss': 1, 'uncached': 1}
+
+    for number in range(3):
+        (tmp_path / f"doc{number}.rst").write_text("some text " * 50)
+    ok = EXTRACTIONS.value(format='rst', outcome='ok')
+    # Worker processes time the extraction; the parent records it
+    assert len(list(extract_files(sorted(tmp_path.glob('*.rst')), workers=2))) == 3
+    assert EXTRACTIONS.value(format='rst', outcome='ok') == ok + 3
+
+
+def test_cli_writes_metrics_file(tmp_path, cli_workspace):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'a.txt').write_text("quarterly revenue report for the northern region. " * 20)
+    cli = cli_workspace(kb_name='metrics_cli_kb', lexical_index=False, dedup=False)
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ['--metrics', 'ingest.prom', 'ingest', 'docs', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(cli.app, ['--metrics', 'query.prom', 'query', 'revenue'])
+    assert result.exit_code == 0, result.output
+    ingest = (tmp_path / 'ingest.prom').read_text()
+    assert 'texttrove_kb_rows_inserted_total{kb="metrics_cli_kb"}' in ingest
+    assert 'texttrove_extractions_total{format="txt",outcome="ok"}' in ingest
+    query = (tmp_path / 'query.prom').read_text()
+    assert 'texttrove_searches_total{kb="metrics_cli_kb",outcome="uncached"}' in query
+    assert 'texttrove_kb_calls_total{operation="search",kb="metrics_cli_kb",outcome="ok"}' in query
@@ -0,0 +1,109 @@
+"""
+Text normalization tests for TextTrove
+"""
+import sys
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.normalize import TextNormalizer, normalize_text, stream_normalized
+from texttrove.pipeline import extract_files
+from texttrove.testing import make_pdf
+from texttrove.utils import PAGE_BREAK
+
+BODIES = [
+    "Revenue grew in the northern region while costs stayed flat.",
+    "The new warehouse opened in March and doubled shipping capacity.",
+    "Customer retention improved after the support team was expanded.",
+    "Hiring slowed in the second half as budgets were reviewed.",
+    "Cloud spending fell once idle clusters were shut down.",
+]
+
+
+def report_pages(extra: str = ''):
+    # Odd and even pages carry different running headers, every page a numbered footer
+    pages = BODIES * 2
+    return [f"{'ACME Corp Annual Report 2023' if number % 2 else 'Chapter 2: Results'}\n"
+            f"{body}{extra if number == 2 else ''}\nPage {number} of {len(pages)}"
+            for number, body in enumerate(pages, 1)]
+
+
+def test_headers_footers_and_page_numbers_are_removed():
+    pages = report_pages(extra="\nThe infor-\nmation was checked by the audit com-\nmittee.")
+    text = normalize_text(PAGE_BREAK.join(pages), join_hyphens=True)
+    assert 'ACME' not in text and 'Chapter 2' not in text and 'Page ' not in text
+    assert all(body in text for body in BODIES)
+    assert "The information was checked by the audit committee." in text
+    # Too few pages to tell boilerplate from content
+    assert normalize_text(PAGE_BREAK.join(pages[:2])).startswith('ACME Corp Annual Report 2023\n')
+    assert 'ACME' in normalize_text(PAGE_BREAK.join(report_pages()), repeated_lines=False)
+
+
+def test_unicode_whitespace_and_hyphen_cleanup():
+    text = "\ufeffThe \ufb01nal  draft\xa0is\t ready.  \r\n\r\n\r\n\r\nSee the well-\nKnown co\xadop \u200bplan, a state-\nof-the-art e-\nmail.\x07\n"
+    assert normalize_text(text, join_hyphens=True) == ("The final draft is ready.\n\n"
+                                                       "See the well-\nKnown coop plan, a state-of-the-art email.")
+    # Outside PDFs a hyphen before a line break was written that way
+    assert normalize_text(text).endswith("See the well-\nKnown coop plan, a state-\nof-the-art e-\nmail.")
+
+
+def test_indentation_is_kept():
+    markdown = ("# Setup\n\n"
+                "- install:\n"
+                "    - run   `make`\n"
+                "\tthen  test\n\n"
+                "    def main():\n"
+                "        return  well-\n"
+                "        known\n\n"
+                ".. note::\n"
+                "   Indented  directive body.  \n")
+    expected = ("# Setup\n\n"
+                "- install:\n"
+                "    - run `make`\n"
+                "\tthen test\n\n"
+                "    def main():\n"
+                "        return well-\n"
+                "        known\n\n"
+                ".. note::\n"
+                "   Indented directive body.")
+    assert normalize_text(markdown) == expected
+    assert normalize_text("    indented first line\n") == "    indented first line"
+    for size in (1, 7, 4096):
+        assert ''.join(stream_normalized(markdown[i:i + size] for i in range(0, len(markdown), size))) == expected
+
+
+def test_streamed_blocks_match_whole_text():
+    text = "".join(f"Line {i} has  a hyphen-\nated word\r\nand\t tabs.\n\n\n\n" for i in range(300)) + "  end  "
+    for join_hyphens in (False, True):
+        expected = normalize_text(text, repeated_lines=False, join_hyphens=join_hyphens)
+        for size in (1, 5, 64, 4096):
+            blocks = (text[i:i + size] for i in range(0, len(text), size))
+            assert ''.join(stream_normalized(blocks, join_hyphens)) == expected
+
+    normalizer = TextNormalizer()
+    streamed = ''.join(normalizer.stream('doc', iter([text[:500], text[500:]])))
+    assert normalizer.removed == {'doc': len(text.encode()) - len(streamed.encode())}
+
+
+def test_pdf_pages_are_kept_apart_for_normalization(tmp_path):
+    pdf = tmp_path / 'report.pdf'
+    make_pdf(pdf, report_pages())
+    [(_, content, error)] = extract_files([pdf], workers=2, split_pages=2, split_bytes=0, page_break=PAGE_BREAK)
+    assert error is None and content.count(PAGE_BREAK) == 2 * len(BODIES) - 1
+    assert 'ACME' not in normalize_text(content)
+
+
+def test_ingest_reports_bytes_removed(tmp_path, cli_workspace):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    make_pdf(docs / 'report.pdf', report_pages())
+    cli = cli_workspace(kb_name='normalize_kb', lexical_index=False, dedup=False)
+
+    result = CliRunner().invoke(cli.app, ['ingest', 'docs', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'bytes removed' in result.output and 'Bytes Removed (normalization)' in result.output
+    rows = cli.get_backend().get('normalize_kb').search(query='annual report revenue', limit=10)
+    assert rows and not any('ACME' in row['content'] for row in rows)
@@ -0,0 +1,124 @@
+"""
+Ingestion pipeline tests for TextTrove
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.chunking import chunk_options, chunk_rows, iter_chunks
+from texttrove.pipeline import BatchInserter, extract_files
+from texttrove.testing import make_pdf
+from texttrove.utils import extract_text_from_file, iter_text_blocks, iter_text_from_file
+
+
+class RecordingKB:
+    """Knowledge base stand-in that records every insert call"""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    def insert(self, rows):
+        if self.fail_on is not None and any(r['content'] == self.fail_on for r in rows):
+            raise RuntimeError("insert failed")
+        self.calls.append(rows)
+
+
+def test_batches_rows_and_reports_each_key_once():
+    kb = RecordingKB()
+    done = []
+    with BatchInserter(kb, batch_size=3, on_done=lambda key, error: done.append((key, error))) as inserter:
+        inserter.add('a', [{'content': 'a1'}, {'content': 'a2'}])
+        inserter.add('b', [{'content': 'b1'}, {'content': 'b2'}, {'content': 'b3'}])
+        inserter.add('c', [{'content': 'c1'}])
+
+    assert [len(batch) for batch in kb.calls] == [3, 3]
+    assert sorted(done) == [('a', None), ('b', None), ('c', None)]
+
+
+def test_failed_batch_fails_its_keys():
+    kb = RecordingKB(fail_on='b1')
+    done = {}
+    with BatchInserter(kb, batch_size=2, on_done=lambda key, error: done.setdefault(key, error)) as inserter:
+        inserter.add('a', [{'content': 'a1'}, {'content': 'a2'}])
+        inserter.add('b', [{'content': 'b1'}, {'content': 'b2'}])
+
+    assert done['a'] is None
+    assert isinstance(done['b'], RuntimeError)
+
+
+def test_extract_files_in_process_pool(tmp_path):
+    files = []
+    for i in range(6):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"document {i}")
+        files.append(path)
+
+    results = {path.name: content for path, content, error in extract_files(files, workers=2)}
+    assert results == {f"doc{i}.txt": f"document {i}" for i in range(6)}
+
+
+def test_pdf_streams_pages_and_splits_across_workers(tmp_path):
+    pdf = tmp_path / "big.pdf"
+    make_pdf(pdf, [f"Page {i} text" for i in range(12)])
+    full = extract_text_from_file(pdf)
+
+    assert full.splitlines() == [f"Page {i} text" for i in range(12)]
+    assert ''.join(iter_text_from_file(pdf)) == full
+    assert extract_text_from_file(pdf, max_pages=2) == "Page 0 text\nPage 1 text"
+
+    [(path, content, error)] = extract_files([pdf], workers=3, split_pages=5, split_bytes=0)
+    assert error is None
+    assert content == full
+
+
+def test_text_blocks_decode_like_text_mode(tmp_path):
+    path = tmp_path / 'mixed.txt'
+    text = ''.join(['é€😀 line\r\n', 'old mac\r', 'unix\n'] * 2000)
+    path.write_bytes(text.encode('utf-8') + b'\xff tail')
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        expected = f.read()
+    for block_size in (1, 4096, 10000):
+        # Multi-byte characters and \r\n pairs fall across block edges
+        assert ''.join(iter_text_blocks(str(path), block_size)) == expected
+    assert extract_text_from_file(str(path)) == expected
+    (tmp_path / 'empty.md').write_bytes(b'')
+    assert list(iter_text_blocks(str(tmp_path / 'empty.md'))) == []
+
+
+def test_streamed_chunking_memory_does_not_grow_with_the_file(tmp_path):
+    path = tmp_path / 'export.log'
+    line = "2024-05-01T12:00:00 INFO request served in 12ms path=/api/items status=200\n"
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(8 * 1024 * 1024 // len(line)):
+            f.write(line)
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in chunk_rows(iter_text_blocks(str(path), 64 * 1024), {}, id_prefix='export'))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert count > 8000
+    assert peak < 1024 * 1024
+
+
+def test_ingest_streams_large_text_files(tmp_path, cli_workspace):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    text = ''.join(f"Entry {n}: the quarterly report lists revenue for region {n % 7}. " for n in range(4000))
+    (docs / 'large.txt').write_text(text)
+    (docs / 'small.md').write_text("A short note about budgets.")
+    cli = cli_workspace(kb_name='stream_kb', lexical_index=False, dedup=False, stream_text_mb=0.1)
+
+    result = CliRunner().invoke(cli.app, ['ingest', 'docs', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'streaming 1 large text file' in result.output
+    assert 'Peak Memory (RSS)' in result.output
+    expected = len(list(iter_chunks(text, **chunk_options(cli.config))))
+    assert cli.get_backend().get('stream_kb').count() == expected + 1
@@ -0,0 +1,91 @@
+"""
+Connection pool tests for TextTrove
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.pool import ConnectionPool, PoolUnavailable
+
+
+class FakeServer:
+    def __init__(self, mindsdb):
+        self.mindsdb = mindsdb
+        self.knowledge_bases = self
+
+    def get(self, name):
+        self.mindsdb.lookups += 1
+        return self
+
+    def search(self, query, limit):
+        if not self.mindsdb.up:
+            raise ConnectionError("connection reset")
+        time.sleep(0.05)
+        return [query]
+
+
+class FakeMindsDB:
+    def __init__(self):
+        self.up = True
+        self.connects = 0
+        self.lookups = 0
+
+    def connect(self):
+        if not self.up:
+            raise ConnectionError("refused")
+        self.connects += 1
+        return FakeServer(self)
+
+    def probe(self, server):
+        if not self.up:
+            raise ConnectionError("probe failed")
+
+
+def test_concurrent_checkouts_use_separate_connections():
+    mindsdb = FakeMindsDB()
+    pool = ConnectionPool(mindsdb.connect, size=4, probe=mindsdb.probe)
+
+    def search():
+        with pool.knowledge_base('kb') as kb:
+            kb.search('q', 1)
+
+    threads = [threading.Thread(target=search) for _ in range(8)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - start < 0.3
+    stats = pool.stats()
+    assert stats['open'] == 4 and stats['peak_in_use'] == 4 and stats['checkouts'] == 8
+    assert mindsdb.lookups == 4
+
+
+def test_reconnects_with_backoff_after_restart():
+    mindsdb = FakeMindsDB()
+    pool = ConnectionPool(mindsdb.connect, size=1, probe=mindsdb.probe, backoff=0.2)
+    with pool.knowledge_base('kb') as kb:
+        kb.search('q', 1)
+
+    mindsdb.up = False
+    with pytest.raises(ConnectionError):
+        with pool.knowledge_base('kb') as kb:
+            kb.search('q', 1)
+    with pytest.raises(PoolUnavailable, match="Failed to connect"):
+        pool.connection().__enter__()
+    # Within the backoff window the pool does not hammer MindsDB
+    with pytest.raises(PoolUnavailable, match="retrying"):
+        pool.connection().__enter__()
+
+    mindsdb.up = True
+    time.sleep(0.25)
+    with pool.knowledge_base('kb') as kb:
+        assert kb.search('q', 1) == ['q']
+    stats = pool.stats()
+    assert stats['reconnects'] == 1 and stats['probe_failures'] == 1 and stats['in_use'] == 0
@@ -0,0 +1,71 @@
+"""
+Request coalescing tests for TextTrove
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.singleflight import SingleFlight
+
+
+def run_together(count, target):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_identical_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    def search():
+        calls.append(1)
+        time.sleep(0.2)
+        return ['result']
+
+    results = run_together(10, lambda: flights.do('key', search))
+    assert results == [['result']] * 10
+    assert len(calls) == 1
+    assert flights.stats() == {'executions': 1, 'coalesced': 9, 'timeouts': 0, 'in_flight': 0}
+
+
+def test_errors_are_shared_and_not_remembered():
+    flights = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ConnectionError("down")
+
+    results = run_together(3, lambda: flights.do('key', failing))
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert flights.do('key', lambda: 'ok') == 'ok'
+
+
+def test_waiters_give_up_after_the_timeout():
+    flights = SingleFlight(timeout=0.05)
+    leader = threading.Thread(target=flights.do, args=('key', lambda: time.sleep(0.3)))
+    leader.start()
+    time.sleep(0.02)
+    with pytest.raises(TimeoutError):
+        flights.do('key', lambda: 'unused')
+    leader.join()
+    assert flights.stats()['timeouts'] == 1
@@ -0,0 +1,60 @@
+"""
+CLI startup benchmark for TextTrove
+
+Run directly to print timings, or under pytest to guard against regressions.
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Generous ceilings: these catch an eager import of pandas/mindsdb_sdk
+# (which alone costs most of a second), not normal machine noise.
+IMPORT_BUDGET = 0.5
+FIRST_OUTPUT_BUDGET = 1.5
+HEAVY_MODULES = ('mindsdb_sdk', 'pandas', 'yaml', 'rich', 'pypdf')
+
+
+def measure_import_time() -> float:
+    """Seconds to import texttrove.cli in a fresh interpreter"""
+    code = (
+        "import sys, time; sys.path.insert(0, %r); start = time.perf_counter(); "
+        "import texttrove.cli; print(time.perf_counter() - start)" % str(ROOT)
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip())
+
+
+def measure_first_output(*args: str) -> float:
+    """Seconds from process start until the CLI writes its first byte of output"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(ROOT / "run_cli.py"), *args], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, cwd=os.environ.get("TMPDIR", "/tmp"))
+    process.stdout.read(1)
+    elapsed = time.perf_counter() - start
+    process.stdout.read()
+    process.wait()
+    return elapsed
+
+
+def test_cli_import_is_light():
+    code = (
+        "import sys; sys.path.insert(0, %r); import texttrove.cli; "
+        "print(','.join(m for m in %r if m in sys.modules))" % (str(ROOT), HEAVY_MODULES)
+    )
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+    assert loaded == ""
+
+
+def test_startup_time():
+    assert min(measure_import_time() for _ in range(3)) < IMPORT_BUDGET
+    assert min(measure_first_output("--help") for _ in range(3)) < FIRST_OUTPUT_BUDGET
+
+
+if __name__ == "__main__":
+    print(f"import texttrove.cli: {min(measure_import_time() for _ in range(5)) * 1000:.1f} ms")
+    print(f"--help first output: {min(measure_first_output('--help') for _ in range(5)) * 1000:.1f} ms")
+    print(f"query --help first output: {min(measure_first_output('query', '--help') for _ in range(5)) * 1000:.1f} ms")
@@ -0,0 +1,166 @@
+"""
+Map-reduce summarization tests for TextTrove
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.async_utils import AsyncExecutor
+from texttrove.summarizer import Summarizer, SummaryCache
+
+
+class FakeLLM:
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("provider down")
+            return f"summary {len(self.prompts)}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def passages(count, size=900):
+    return [f"Passage {i}. " + "word " * (size // 5) for i in range(count)]
+
+
+def test_single_chunk_skips_reduce():
+    llm = FakeLLM(delay=0)
+    summarizer = Summarizer(llm, "fake")
+    assert summarizer.summarize(["A short passage."], focus="passage") == "summary 1"
+    assert len(llm.prompts) == 1
+    assert 'focusing on "passage"' in llm.prompts[0]
+    assert "A short passage." in llm.prompts[0]
+
+
+def test_chunks_are_summarized_concurrently():
+    llm = FakeLLM(delay=0.1)
+    summarizer = Summarizer(llm, "fake", executor=AsyncExecutor(max_concurrency=4), chunk_chars=1000)
+    start = time.perf_counter()
+    summary = summarizer.summarize(passages(8))
+    elapsed = time.perf_counter() - start
+
+    assert summary
+    assert summarizer.stats['chunks'] == 8
+    assert summarizer.stats['llm_calls'] == 9  # 8 maps + 1 reduce
+    assert llm.peak == 4
+    # Sequential calls would take 0.9 s
+    assert elapsed < 0.6
+    assert llm.prompts[-1].count("- summary") == 8
+
+
+def test_reduce_is_hierarchical_when_summaries_do_not_fit():
+    llm = FakeLLM(delay=0)
+    summarizer = Summarizer(llm, "fake", chunk_chars=1000, reduce_chars=30)
+    summarizer.summarize(passages(6))
+    # 6 maps, then 3 reduces of two ~10 char summaries, then 2, then 1
+    assert summarizer.stats['llm_calls'] > 7
+
+
+def test_reduce_terminates_with_oversized_summaries():
+    llm = FakeLLM(delay=0)
+    summarizer = Summarizer(llm, "fake", chunk_chars=1000, reduce_chars=1)
+    assert summarizer.summarize(passages(5))
+    assert summarizer.stats['llm_calls'] == 5 + 3 + 2 + 1
+
+
+def test_cache_skips_known_chunks(tmp_path):
+    cache = SummaryCache(tmp_path / "summaries.db")
+    llm = FakeLLM(delay=0)
+    first = Summarizer(llm, "fake", cache=cache, chunk_chars=1000)
+    summary = first.summarize(passages(3), focus="q")
+    assert first.stats['llm_calls'] == 4
+
+    again = Summarizer(llm, "fake", cache=cache, chunk_chars=1000)
+    assert again.summarize(passages(3), focus="q") == summary
+    assert again.stats == {'chunks': 3, 'llm_calls': 0, 'cache_hits': 4}
+
+    # One new passage: only its map and the new reduce reach the LLM
+    more = Summarizer(llm, "fake", cache=cache, chunk_chars=1000)
+    more.summarize(passages(4), focus="q")
+    assert more.stats['llm_calls'] == 2
+    assert more.stats['cache_hits'] == 3
+
+    # A different model never sees another model's answers
+    other = Summarizer(llm, "other", cache=cache, chunk_chars=1000)
+    other.summarize(passages(3), focus="q")
+    assert other.stats['cache_hits'] == 0
+    cache.close()
+
+
+def test_failures_are_not_cached(tmp_path):
+    cache = SummaryCache(tmp_path / "summaries.db")
+    with pytest.raises(RuntimeError):
+        Summarizer(FakeLLM(delay=0, fail=True), "fake", cache=cache).summarize(["text"])
+    llm = FakeLLM(delay=0)
+    assert Summarizer(llm, "fake", cache=cache).summarize(["text"]) == "summary 1"
+    cache.close()
+
+
+def test_nothing_to_summarize():
+    llm = FakeLLM()
+    assert Summarizer(llm, "fake").summarize(["", "  "]) == ""
+    assert llm.prompts == []
+
+
+def test_stream_yields_final_answer_and_caches_it(tmp_path):
+    cache = SummaryCache(tmp_path / "summaries.db")
+    llm = FakeLLM(delay=0)
+    streamed = []
+
+    def stream(prompt):
+        streamed.append(prompt)
+        yield from ["Final ", "answer", "."]
+
+    summarizer = Summarizer(llm, "fake", cache=cache, stream=stream, chunk_chars=1000)
+    assert list(summarizer.summarize_stream(passages(3), focus="q")) == ["Final ", "answer", "."]
+    # Chunk summaries use complete; only the reduce is streamed
+    assert len(llm.prompts) == 3 and len(streamed) == 1
+    assert "- summary" in streamed[0]
+    assert 0 <= summarizer.stats['first_token_ms'] <= summarizer.stats['total_ms']
+
+    again = Summarizer(llm, "fake", cache=cache, stream=stream, chunk_chars=1000)
+    assert list(again.summarize_stream(passages(3), focus="q")) == ["Final answer."]
+    assert again.stats['llm_calls'] == 0 and len(streamed) == 1
+    assert again.summarize(passages(3), focus="q") == "Final answer."
+    cache.close()
+
+
+def test_abandoned_stream_is_not_cached(tmp_path):
+    cache = SummaryCache(tmp_path / "summaries.db")
+    summarizer = Summarizer(FakeLLM(delay=0), "fake", cache=cache, stream=lambda prompt: iter(["a", "b"]))
+    fragments = summarizer.summarize_stream(["text"])
+    assert next(fragments) == "a"
+    fragments.close()
+    assert summarizer.summarize(["text"]) == "summary 1"
+    cache.close()
+
+
+def test_stream_without_streaming_provider():
+    summarizer = Summarizer(FakeLLM(delay=0), "fake")
+    assert list(summarizer.summarize_stream(["text"])) == ["summary 1"]
+    assert list(summarizer.summarize_stream([])) == []
+
+
+def test_summarizers_share_one_thread_pool(fresh_cli):
+    first, second = fresh_cli.get_async_llm('ollama'), fresh_cli.get_async_llm('groq')
+    assert first.executor is second.executor is fresh_cli.summary_executor
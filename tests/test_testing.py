@@ -0,0 +1,87 @@
+"""
+Fake MindsDB server, synthetic corpus and benchmark tests for TextTrove
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove.testing import CorpusGenerator, Latency, connect_fake, make_corpus, reset_fake_servers
+from texttrove.utils import extract_text_from_file
+
+
+def test_fake_server_knowledge_bases_and_sql():
+    reset_fake_servers()
+    server = connect_fake("fake://unit")
+    assert connect_fake("fake://unit") is server
+    with pytest.raises(LookupError):
+        server.knowledge_bases.get('kb')
+    kb = server.knowledge_bases.create(name='kb', embedding_model={})
+    kb.insert([{'id': 'a', 'content': 'quarterly revenue report', 'metadata': {'source': 'a.txt'}},
+               {'id': 'b', 'content': 'office cleaning schedule', 'metadata': {'source': 'b.txt'}}])
+    results = kb.search('revenue report', limit=5)
+    assert results[0]['id'] == 'a' and results[0]['metadata'] == {'source': 'a.txt'}
+    assert server.query("SELECT 1").fetch()
+    server.query("DELETE FROM kb WHERE id IN ('a')")
+    assert kb.count() == 1
+    assert set(server.stats.snapshot()) >= {'insert', 'search'}
+
+
+def test_latency_is_parsed_from_the_url_and_applied():
+    latency = Latency.from_url("fake://slow?search_ms=30&workers=2")
+    assert latency.search_ms == 30 and latency.workers == 2
+    kb = connect_fake("fake://slow-unit?search_ms=30").knowledge_bases.create(name='kb')
+    start = time.perf_counter()
+    kb.search('anything')
+    assert time.perf_counter() - start >= 0.025
+
+
+def test_corpus_is_deterministic_and_extractable(tmp_path):
+    assert CorpusGenerator(3).queries(5) == CorpusGenerator(3).queries(5)
+    files = make_corpus(tmp_path / 'a', files=3, size_kb=4, seed=1)
+    again = make_corpus(tmp_path / 'b', files=3, size_kb=4, seed=1)
+    assert [f.suffix for f in files] == ['.txt', '.md', '.pdf']
+    assert [f.read_bytes() for f in files] == [f.read_bytes() for f in again]
+    for path in files:
+        text = extract_text_from_file(str(path))
+        assert len(text.split()) > 100, path
+
+
+def test_cli_ingest_and_query_against_the_fake_server(tmp_path, cli_workspace):
+    make_corpus(tmp_path / 'docs', files=3, size_kb=4, formats=('txt',))
+    cli = cli_workspace(backend='mindsdb', mindsdb_url='fake://cli-unit', kb_name='fake_kb',
+                        lexical_index=False, dedup=False)
+    reset_fake_servers()
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ['ingest', 'docs', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    kb = connect_fake('fake://cli-unit').knowledge_bases.get('fake_kb')
+    assert kb.count() > 3
+
+    result = runner.invoke(cli.app, ['query', 'revenue quarter', '--no-cache'])
+    assert result.exit_code == 0, result.output
+    assert 'Found' in result.output
+
+
+def test_benchmark_report_is_json(tmp_path, monkeypatch):
+    sys.path.append(str(Path(__file__).parent))
+    import benchmark
+
+    monkeypatch.chdir(tmp_path)
+    report = benchmark.main(['--only', 'extraction,query', '--files', '3', '--size-kb', '2', '--queries', '10',
+                             '--concurrency', '1,4', '--search-ms', '1', '--insert-ms', '1', '--row-ms', '0',
+                             '--output', str(tmp_path / 'report.json')])
+    saved = json.loads((tmp_path / 'report.json').read_text())
+    assert saved == json.loads(json.dumps(report))
+    names = [r['name'] for r in saved['results']]
+    assert names == ['extraction', 'extraction_parallel', 'query_c1', 'query_c4']
+    query = saved['results'][-1]
+    assert query['ops'] == 10 and query['errors'] == 0
+    assert set(query['latency_ms']) >= {'p50', 'p95', 'p99'}
@@ -0,0 +1,93 @@
+"""
+Folder watch tests for TextTrove
+"""
+import sys
+import threading
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from texttrove import watcher as watcher_module
+from texttrove.manifest import Manifest
+from texttrove.watcher import PollingWatcher, debounced
+
+
+class ScriptedWatcher:
+    """Replays change sets; an empty set means a quiet period"""
+
+    def __init__(self, script, stop):
+        self.script = list(script)
+        self.stop = stop
+
+    def changes(self, timeout):
+        if not self.script:
+            self.stop.set()
+            return set()
+        return self.script.pop(0)
+
+
+def test_bursts_are_coalesced_into_one_batch():
+    stop = threading.Event()
+    watcher = ScriptedWatcher([{'a'}, {'a', 'b'}, {'c'}, set(), {'d'}, set()], stop)
+    assert list(debounced(watcher, debounce=0.1, stop=stop)) == [['a', 'b', 'c'], ['d']]
+
+
+def test_polling_reports_created_modified_and_deleted_files(tmp_path):
+    (tmp_path / 'a.txt').write_text('one')
+    (tmp_path / 'b.txt').write_text('two')
+    watcher = PollingWatcher(str(tmp_path), ['.txt'], interval=0.01)
+    assert watcher.changes(timeout=0) == set()
+
+    (tmp_path / 'a.txt').write_text('one, edited')
+    (tmp_path / 'b.txt').unlink()
+    (tmp_path / 'c.txt').write_text('three')
+    (tmp_path / 'ignored.bin').write_text('?')
+    assert watcher.changes(timeout=1) == {str(tmp_path / name) for name in ('a.txt', 'b.txt', 'c.txt')}
+
+
+def test_plan_paths_only_looks_at_changed_files(tmp_path):
+    docs = [tmp_path / f"{name}.txt" for name in 'abc']
+    for doc in docs:
+        doc.write_text(doc.name)
+    manifest = Manifest(tmp_path / 'manifest.db')
+    plan = manifest.plan('kb', docs, tmp_path)
+    manifest.record('kb', plan.states.values(), {})
+
+    docs[0].write_text('changed')
+    docs[1].unlink()
+    plan = manifest.plan_paths('kb', [docs[0], docs[1]])
+    assert plan.modified == [docs[0]]
+    assert plan.removed == [str(docs[1].resolve())]
+    assert plan.new == [] and plan.unchanged == []
+    manifest.close()
+
+
+def test_files_changed_during_catch_up_are_picked_up(tmp_path, monkeypatch, cli_workspace):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'early.txt').write_text("notes written before the watch started. " * 10)
+    cli = cli_workspace(kb_name='watch_kb', lexical_index=False, dedup=False)
+
+    apply_plan = cli.apply_ingest_plan
+    plans = []
+
+    def catching_up(kb, kb_name, plan, *args, **kwargs):
+        if not plans:
+            # Saved while the catch-up ingest is still running
+            (docs / 'late.txt').write_text("notes saved during the catch-up. " * 10)
+        plans.append(plan)
+        return apply_plan(kb, kb_name, plan, *args, **kwargs)
+
+    monkeypatch.setattr(cli, 'apply_ingest_plan', catching_up)
+    monkeypatch.setattr(watcher_module, 'open_watcher',
+                        lambda folder, extensions, interval, polling: PollingWatcher(folder, extensions, 0.01))
+    # One batch of whatever the watcher saw, then stop
+    monkeypatch.setattr(watcher_module, 'debounced', lambda watcher, **kwargs: iter([sorted(watcher.changes(timeout=1))]))
+
+    result = CliRunner().invoke(cli.app, ['watch', 'docs', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert [f.name for f in plans[0].new] == ['early.txt']
+    assert [f.name for f in plans[1].new] == ['late.txt']
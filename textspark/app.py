@@ -3,17 +3,38 @@ TextSpark Web Application - Optional web interface for TextTrove
 """
 import os
 import sys
+import json
+import time
+import shutil
 import datetime
+import tempfile
+from collections import deque
+from contextlib import nullcontext
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 try:
-    from flask import Flask, request, render_template, flash, redirect, url_for
-    import mindsdb_sdk
+    from flask import Flask, Response, g, request, render_template, flash, redirect, url_for, jsonify, stream_with_context
+    from werkzeug.utils import secure_filename
     import yaml
-    from texttrove.utils import extract_text_from_file
+    from texttrove.utils import PAGE_BREAK, extract_text_from_file
+    from texttrove.normalize import TextNormalizer
+    from texttrove.chunking import chunk_options, chunk_rows
+    from texttrove.pipeline import BatchInserter
+    from texttrove.cache import CACHE_FILE, DiskCache, MemoryCache, cache_key, cached_search
+    from texttrove.async_utils import AsyncExecutor, run_async_safely
+    from texttrove.pool import ConnectionPool, PoolUnavailable
+    from texttrove.singleflight import SingleFlight
+    from texttrove.jobs import JobQueue, QueueFull
+    from texttrove.backends import connect_mindsdb, open_backend
+    from texttrove.batch import latency_summary
+    from texttrove.fanout import KBNameResolver, fan_out, is_multi_kb, split_kb_names
+    from texttrove.llm import LLMProvider
+    from texttrove.summarizer import SUMMARY_CACHE_FILE, Summarizer, SummaryCache
+    from texttrove.metrics import (CONTENT_TYPE, HTTP_REQUESTS, HTTP_SECONDS, KB_CALLS, KB_SECONDS, REGISTRY,
+                                   UPLOAD_JOBS, UPLOAD_SECONDS, UPLOADS, observe)
 except ImportError as e:
     print(f"Import error: {e}")
     print("Please install requirements: pip install -r requirements.txt")
@@ -32,30 +53,160 @@ def load_config():
 
 config = load_config()
 
-# Connect to MindsDB
-try:
-    server = mindsdb_sdk.connect(config.get('mindsdb_url', 'http://127.0.0.1:47334'))
-except Exception as e:
-    print(f"Failed to connect to MindsDB: {e}")
-    server = None
+# Search results are cached per process; uploads invalidate the KB they write to
+result_cache = MemoryCache(max_entries=config.get('cache_max_entries', 1024),
+                           ttl=config.get('cache_ttl', 300)) if config.get('cache_enabled', True) else None
+
+# MindsDB connections are pooled: each request thread checks one out, and
+# connections that died (e.g. a MindsDB restart) are reopened with backoff
+pool = ConnectionPool(lambda: connect_mindsdb(config.get('mindsdb_url', 'http://127.0.0.1:47334')),
+                      size=config.get('pool_size', 4),
+                      probe_interval=config.get('pool_probe_interval', 30),
+                      checkout_timeout=config.get('pool_checkout_timeout', 10),
+                      max_backoff=config.get('pool_max_backoff', 30))
+
+# With backend: local, knowledge bases live in an on-disk vector index instead
+local_backend = open_backend(config) if config.get('backend') == 'local' else None
+
+# Blocking MindsDB calls run through one executor: bounded, with a timeout
+executor = AsyncExecutor(max_concurrency=config.get('async_concurrency', 8),
+                         timeout=config.get('request_timeout'))
+
+# Identical searches arriving together share one MindsDB call
+searches_in_flight = SingleFlight(timeout=config.get('coalesce_timeout', 30))
+
+# Uploads are ingested in the background by a bounded pool of workers
+jobs = JobQueue(workers=config.get('upload_workers', 2), max_queued=config.get('upload_max_queued', 100))
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+# Summaries stream from the configured LLM; answers are cached in the same file as the CLI's
+llm = LLMProvider(config.get('ai_provider', 'groq'), config)
+summary_cache = SummaryCache(config.get('summary_cache_path') or Path("config.yaml").parent / SUMMARY_CACHE_FILE) \
+    if config.get('summary_cache', True) else None
+# (first token ms, total ms) of recent streamed summaries, for /status
+summary_timings = deque(maxlen=1000)
+
+def create_kb(server, kb_name):
+    return server.knowledge_bases.create(
+        name=kb_name,
+        model='sentence_transformers'
+    )
+
+def open_kb(kb_name):
+    """Check out a knowledge base handle, creating the KB if needed"""
+    if local_backend:
+        return nullcontext(local_backend.create(kb_name))
+    return pool.knowledge_base(kb_name, create=lambda server: create_kb(server, kb_name))
+
+def search_kb(kb_name, query, limit):
+    with observe(KB_CALLS, KB_SECONDS, operation='search', kb=kb_name):
+        if local_backend:
+            return local_backend.get(kb_name).search(query=query, limit=limit)
+        with pool.knowledge_base(kb_name) as kb:
+            return kb.search(query=query, limit=limit)
+
+def coalesced_search(kb_name, query, limit):
+    return searches_in_flight.do(cache_key(kb_name, query, limit),
+                                 lambda: run_async_safely(executor.call(search_kb, kb_name, query, limit)))
+
+def list_kbs():
+    if local_backend:
+        return local_backend.list()
+    with pool.connection() as server:
+        return [kb.name for kb in server.knowledge_bases.list() or []]
+
+# A kb_name with commas or globs ('dept_*') searches each matching KB concurrently
+kb_resolver = KBNameResolver(list_kbs, ttl=config.get('kb_list_ttl', 30))
+
+def shard_search(kb_name, query, limit):
+    # Already on an executor thread, so the coalesced call is search_kb itself
+    return cached_search(result_cache, kb_name, query, limit,
+                         lambda: searches_in_flight.do(cache_key(kb_name, query, limit),
+                                                       lambda: search_kb(kb_name, query, limit)))
+
+def search_kbs(kb_spec, query, limit):
+    """Search one KB, or several merged by score; returns (results, {kb_name: error}) for KBs that failed or timed out"""
+    if not is_multi_kb(kb_spec):
+        kb_name = split_kb_names(kb_spec)[0]
+        return cached_search(result_cache, kb_name, query, limit,
+                             lambda: coalesced_search(kb_name, query, limit)), {}
+    fanned = fan_out(lambda kb_name: shard_search(kb_name, query, limit), kb_resolver.resolve(kb_spec), limit,
+                     executor=executor, timeout=config.get('kb_timeout'))
+    if fanned.failed:
+        raise RuntimeError('; '.join(f"{kb_name}: {error}" for kb_name, error in fanned.errors.items()))
+    return fanned.results, fanned.errors
+
+def search_category(kb_spec, query, limit, category=''):
+    """search_kbs keeping only passages uploaded under ``category``; searches deeper so the filter still fills ``limit``"""
+    if not category:
+        return search_kbs(kb_spec, query, limit)
+    results, skipped = search_kbs(kb_spec, query, limit * 4)
+    wanted = category.casefold()
+    matching = [r for r in results if isinstance(r.get('metadata'), dict)
+                and str(r['metadata'].get('category', '')).casefold() == wanted]
+    return matching[:limit], skipped
+
+def invalidate_cache(kb_name):
+    """Drop cached searches for a KB in this process and in the CLI's disk cache"""
+    if result_cache:
+        result_cache.invalidate(kb_name)
+    cache_path = Path(config.get('cache_path') or Path("config.yaml").parent / CACHE_FILE)
+    if cache_path.exists():
+        disk_cache = DiskCache(cache_path)
+        disk_cache.invalidate(kb_name)
+        disk_cache.close()
+
+# Gauges sampled from the pool and job queue whenever /metrics is scraped
+POOL_CONNECTIONS = REGISTRY.gauge('texttrove_pool_connections', "MindsDB pool connections", ('state',))
+JOB_STATES = REGISTRY.gauge('texttrove_upload_jobs_in_state', "Upload jobs by state", ('state',))
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    # Label by URL rule, not path, so /jobs/<job_id> stays one series
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_REQUESTS.inc(route=route, method=request.method, status=str(response.status_code))
+    HTTP_SECONDS.observe(time.perf_counter() - g.get('request_start', time.perf_counter()),
+                         route=route, method=request.method)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Counters and latency histograms in the Prometheus text format"""
+    if not local_backend:
+        stats = pool.stats()
+        POOL_CONNECTIONS.set(stats['size'], state='size')
+        POOL_CONNECTIONS.set(stats['open'], state='open')
+        POOL_CONNECTIONS.set(stats['in_use'], state='in_use')
+    for state, count in jobs.stats().items():
+        if state != 'workers':
+            JOB_STATES.set(count, state=state)
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     """Main page with search functionality"""
     results = []
     summary = ""
+    search_query = ""
+    category_filter = ""
+    kb_spec = ""
     
-    if request.method == 'POST' and server:
+    if request.method == 'POST':
         search_query = request.form.get('search', '').strip()
         category_filter = request.form.get('category', '').strip()
+        kb_spec = request.form.get('kb_name', '').strip()
         
         if search_query:
             try:
-                kb_name = config.get('kb_name', 'texttrove_kb')
-                kb = server.knowledge_bases.get(kb_name)
-                
-                # Perform search
-                results = kb.search(query=search_query, limit=5)
+                # Perform search; KBs that failed or timed out leave partial results
+                results, skipped = search_category(kb_spec or config.get('kb_name', 'texttrove_kb'), search_query, 5,
+                                                   category_filter)
+                for kb_name, error in skipped.items():
+                    flash(f"Knowledge base '{kb_name}' skipped: {error}", "warning")
                 
                 if results:
                     # Generate simple summary
@@ -79,15 +230,101 @@ def index():
         else:
             flash("Please enter a search query", "warning")
     
-    return render_template('index.html', results=results, summary=summary)
+    return render_template('index.html', results=results, summary=summary, query=search_query, kb_spec=kb_spec,
+                           category=category_filter)
+
+def sse(event, data):
+    """Format one Server-Sent Event; data is JSON so newlines in tokens survive"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/summarize/stream')
+def summarize_stream():
+    """Stream an LLM summary of the top results for ?q= (in ?kb=, filtered by ?category=) as Server-Sent Events"""
+    search_query = request.args.get('q', '').strip()
+    if not search_query:
+        return jsonify({'error': "Missing search query (?q=)"}), 400
+    kb_spec = request.args.get('kb', '').strip() or config.get('kb_name', 'texttrove_kb')
+    category_filter = request.args.get('category', '').strip()
+    limit = config.get('summary_results', 5)
+
+    def events():
+        start = time.perf_counter()
+        first_token_ms = None
+        summarizer = Summarizer(llm.complete, llm.model_id, cache=summary_cache, executor=executor,
+                                stream=llm.stream, chunk_chars=config.get('summary_chunk_chars', 4000),
+                                reduce_chars=config.get('summary_reduce_chars', 8000))
+        try:
+            # The same search and filter as the page, so the summary describes the passages shown
+            results, _ = search_category(kb_spec, search_query, limit, category_filter)
+            for fragment in summarizer.summarize_stream([r['content'] for r in results or []], focus=search_query):
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                yield sse('token', fragment)
+        except Exception as e:
+            # Not 'error': EventSource fires that name itself when the connection drops
+            yield sse('failed', str(e))
+            return
+        total_ms = (time.perf_counter() - start) * 1000
+        if first_token_ms is not None:
+            summary_timings.append((first_token_ms, total_ms))
+        app.logger.info("summary for %r: first token %s ms, total %.0f ms, %d LLM calls, %d cache hits",
+                        search_query, 'n/a' if first_token_ms is None else f"{first_token_ms:.0f}", total_ms,
+                        summarizer.stats['llm_calls'], summarizer.stats['cache_hits'])
+        yield sse('done', {'first_token_ms': first_token_ms, 'total_ms': total_ms,
+                           'llm_calls': summarizer.stats['llm_calls'], 'cache_hits': summarizer.stats['cache_hits']})
+
+    # No-buffering headers keep proxies (e.g. nginx) from holding tokens back
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def summary_stats():
+    timings = list(summary_timings)
+    return {
+        'count': len(timings),
+        'first_token_ms': latency_summary([first for first, _ in timings]),
+        'total_ms': latency_summary([total for _, total in timings]),
+    }
+
+def ingest_upload(job, temp_path, filename, category, kb_name):
+    """Background job: extract an uploaded file and insert it as passages"""
+    try:
+        with observe(UPLOAD_JOBS, UPLOAD_SECONDS, kb=kb_name):
+            job.update('extracting')
+            normalize = config.get('normalize', True)
+            content = extract_text_from_file(temp_path, page_break=PAGE_BREAK if normalize else '\n')
+            if content and normalize:
+                normalizer = TextNormalizer(min_share=config.get('boilerplate_share', 0.4))
+                content = normalizer.normalize(filename, content, join_hyphens=filename.lower().endswith('.pdf'))
+                job.update(normalized_bytes=normalizer.removed[filename])
+            if not content or not content.strip():
+                raise ValueError("File appears to be empty or unreadable")
+
+            # Insert document as overlapping passages
+            job.update('inserting', characters=len(content))
+            errors = []
+            with open_kb(kb_name) as kb, \
+                    BatchInserter(kb, batch_size=config.get('ingest_batch_size', 100),
+                                  on_done=lambda key, error: errors.append(error)) as inserter:
+                inserter.add(filename, chunk_rows(content, {
+                    'category': category,
+                    'date_added': str(datetime.date.today()),
+                    'source': filename,
+                    'uploaded_via': 'web_interface'
+                }, **chunk_options(config)))
+            if errors and errors[0] is not None:
+                raise errors[0]
+            job.update(rows=inserter.row_counts.get(filename, 0))
+            invalidate_cache(kb_name)
+    finally:
+        os.remove(temp_path)
+
+def wants_json():
+    return request.args.get('format') == 'json' or (
+        request.accept_mimetypes.accept_json and not request.accept_mimetypes.accept_html)
 
 @app.route('/upload', methods=['POST'])
 def upload():
-    """Handle file upload"""
-    if not server:
-        flash("MindsDB connection not available", "error")
-        return redirect(url_for('index'))
-    
+    """Handle file upload: spool it to disk and queue an ingestion job"""
     if 'file' not in request.files:
         flash("No file selected", "error")
         return redirect(url_for('index'))
@@ -96,75 +333,82 @@ def upload():
     if file.filename == '':
         flash("No file selected", "error")
         return redirect(url_for('index'))
+
+    filename = secure_filename(file.filename) or 'upload'
+    suffix = Path(filename).suffix.lower()
+    if suffix not in ('.txt', '.pdf'):
+        flash("Unsupported file type. Please upload .txt or .pdf files", "error")
+        return redirect(url_for('index'))
     
+    category = request.form.get('category', 'general')
+    kb_name = config.get('kb_name', 'texttrove_kb')
     try:
-        # Extract text from uploaded file
-        if file.filename.endswith('.txt'):
-            content = file.read().decode('utf-8')
-        elif file.filename.endswith('.pdf'):
-            # Save temporarily and extract
-            temp_path = f"/tmp/{file.filename}"
-            file.save(temp_path)
-            content = extract_text_from_file(temp_path)
-            os.remove(temp_path)
-        else:
-            flash("Unsupported file type. Please upload .txt or .pdf files", "error")
-            return redirect(url_for('index'))
-        
-        if not content or not content.strip():
-            flash("File appears to be empty or unreadable", "error")
-            return redirect(url_for('index'))
-        
-        # Get or create knowledge base
-        kb_name = config.get('kb_name', 'texttrove_kb')
+        # Stream the upload to disk in blocks; the job owns the file from here
+        with tempfile.NamedTemporaryFile(prefix='textspark-', suffix=suffix, delete=False) as spooled:
+            shutil.copyfileobj(file.stream, spooled, UPLOAD_BLOCK_SIZE)
         try:
-            kb = server.knowledge_bases.get(kb_name)
-        except:
-            kb = server.knowledge_bases.create(
-                name=kb_name,
-                model='sentence_transformers'
-            )
-        
-        # Insert document
-        category = request.form.get('category', 'general')
-        kb.insert([{
-            'content': content,
-            'metadata': {
-                'category': category,
-                'date_added': str(datetime.date.today()),
-                'source': file.filename,
-                'uploaded_via': 'web_interface'
-            }
-        }])
-        
-        flash(f"Successfully uploaded and processed: {file.filename}", "success")
-        
+            job = jobs.submit(filename, lambda job: ingest_upload(job, spooled.name, filename, category, kb_name))
+        except QueueFull:
+            os.remove(spooled.name)
+            UPLOADS.inc(kb=kb_name, outcome='rejected')
+            raise
+        UPLOADS.inc(kb=kb_name, outcome='queued')
     except Exception as e:
+        if wants_json():
+            return jsonify({'error': str(e)}), 503
         flash(f"Upload error: {str(e)}", "error")
-    
+        return redirect(url_for('index'))
+
+    if wants_json():
+        return jsonify({'job_id': job.id, 'status_url': url_for('job_status', job_id=job.id)}), 202
+    flash(f"Queued {filename} for ingestion (job {job.id}, status at "
+          f"{url_for('job_status', job_id=job.id)})", "success")
     return redirect(url_for('index'))
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report the state of an ingestion job as JSON"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown job {job_id}"}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/status')
 def status():
     """Show system status"""
     status_info = {
-        'mindsdb_connected': server is not None,
+        'backend': 'local' if local_backend else 'mindsdb',
+        'mindsdb_connected': False,
         'mindsdb_url': config.get('mindsdb_url', 'http://127.0.0.1:47334'),
         'kb_name': config.get('kb_name', 'texttrove_kb'),
         'knowledge_bases': []
     }
     
-    if server:
-        try:
+    if local_backend:
+        status_info['knowledge_bases'] = local_backend.list()
+        status_info['coalescing'] = searches_in_flight.stats()
+        status_info['jobs'] = jobs.stats()
+        status_info['summaries'] = summary_stats()
+        return render_template('status.html', status=status_info)
+
+    try:
+        with pool.connection() as server:
             kbs = server.knowledge_bases.list()
+            status_info['mindsdb_connected'] = True
             status_info['knowledge_bases'] = [kb.name for kb in kbs] if kbs else []
-        except:
-            status_info['knowledge_bases'] = ['Error loading KBs']
+    except PoolUnavailable:
+        pass
+    except Exception:
+        status_info['knowledge_bases'] = ['Error loading KBs']
+    status_info['pool'] = pool.stats()
+    status_info['coalescing'] = searches_in_flight.stats()
+    status_info['jobs'] = jobs.stats()
+    status_info['summaries'] = summary_stats()
     
     return render_template('status.html', status=status_info)
 
 if __name__ == '__main__':
-    if not server:
+    if not local_backend and not pool.warm():
         print("Warning: MindsDB connection failed. Web app will have limited functionality.")
     
     print("Starting TextSpark Web App...")
@@ -1,14 +1,112 @@
+"""
+Asyncio execution layer for MindsDB and LLM calls
+
+The MindsDB SDK and the LLM clients are blocking, so AsyncExecutor runs
+them on worker threads. Each call carries a copy of the caller's context,
+keeping the per-request console and tracer of daemon commands intact.
+"""
 import asyncio
+import contextvars
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar('T')
 
-def run_async_safely(coro):
+def run_async_safely(coro: Awaitable[T]) -> T:
     """
-    Utility to run async functions safely, even if the event loop is closed.
+    Utility to run async functions safely from synchronous code.
+
+    This is the one bridge from sync entry points (CLI commands, Flask
+    routes) into the async layer. Without a running loop in this thread the
+    coroutine gets a fresh loop; inside a running loop (for example a
+    notebook) it runs on a helper thread so the caller's loop is not nested.
     """
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_closed():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
+        asyncio.get_running_loop()
     except RuntimeError:
         return asyncio.run(coro)
+
+    outcome: Dict[str, Any] = {}
+
+    def runner():
+        try:
+            outcome['result'] = asyncio.run(coro)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=runner, name="texttrove-async-bridge")
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+class AsyncExecutor:
+    """
+    Run blocking calls (MindsDB SDK, LLM clients) off the event loop.
+
+    A semaphore bounds how many calls run at once within an event loop, and
+    every call can carry a timeout. Cancelling or timing out stops the awaiting coroutine right
+    away; the blocking call itself finishes in its worker thread and its
+    result is dropped. The threads belong to the executor rather than to the
+    event loop, so closing a loop never waits for such abandoned calls.
+    """
+
+    def __init__(self, max_concurrency: int = 8, timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        # Headroom for calls still finishing after their caller timed out
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="texttrove-async")
+
+    async def call(self, fn: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        # Semaphores bind to one loop, and each run_async_safely call (one per
+        # Flask request thread, say) runs its own
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+            return await asyncio.wait_for(loop.run_in_executor(self._pool, call), timeout or self.timeout)
+
+    async def gather(self, *calls: Awaitable[Any], return_exceptions: bool = False) -> List[Any]:
+        """
+        Await several calls concurrently; if one fails, cancel the rest.
+
+        Args:
+            *calls: Awaitables, usually from call()
+            return_exceptions (bool): Return failures instead of raising
+
+        Returns:
+            List[Any]: Results in argument order
+        """
+        tasks = [asyncio.ensure_future(c) for c in calls]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+class AsyncLLM:
+    """
+    Async facade over a summarization provider.
+
+    Args:
+        get_client: Builds (or returns the cached) provider client
+        executor: AsyncExecutor bounding concurrent calls
+    """
+
+    def __init__(self, get_client: Callable[[], Any], executor: Optional[AsyncExecutor] = None):
+        self.get_client = get_client
+        self.executor = executor or AsyncExecutor(max_concurrency=4)
+
+    async def warm(self):
+        """Build the provider client (imports, TLS setup) ahead of the first call."""
+        return await self.executor.call(self.get_client)
@@ -0,0 +1,495 @@
+"""
+Retrieval backends for TextTrove
+
+A backend hands out knowledge base handles with ``insert(rows)`` and
+``search(query, limit)``, the same surface the MindsDB SDK offers, so
+ingest, query, summarize and TextSpark work unchanged on either:
+
+- ``mindsdb``: knowledge bases on a MindsDB server (the default)
+- ``local``: an on-disk vector index per knowledge base, with embeddings
+  in a memory-mapped float32 matrix, a SQLite metadata sidecar and an
+  optional k-means coarse index for large corpora
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+LOCAL_INDEX_DIR = "texttrove_index"
+
+
+class RetrievalBackend:
+    """Interface shared by retrieval backends"""
+
+    name = 'backend'
+
+    def get(self, kb_name: str):
+        """Return the handle of an existing knowledge base; raise if it does not exist."""
+        raise NotImplementedError
+
+    def create(self, kb_name: str):
+        """Create a knowledge base and return its handle."""
+        raise NotImplementedError
+
+    def delete(self, kb_name: str, ids: List[str]):
+        """Delete rows by id."""
+        raise NotImplementedError
+
+    def list(self) -> List[str]:
+        """Return the names of all knowledge bases."""
+        raise NotImplementedError
+
+    def warm(self):
+        """Open connections or files ahead of the first request."""
+
+
+def connect_mindsdb(url: str):
+    """
+    Connect to MindsDB; a ``fake://`` URL gives the in-process stand-in from texttrove.testing.
+
+    Args:
+        url (str): MindsDB URL
+
+    Returns:
+        The server connection
+    """
+    if url and url.startswith('fake://'):
+        from texttrove.testing import connect_fake
+        return connect_fake(url)
+    import mindsdb_sdk
+    return mindsdb_sdk.connect(url)
+
+
+class MindsDBBackend(RetrievalBackend):
+    """
+    Knowledge bases on a MindsDB server.
+
+    Args:
+        get_server (Callable[[], Any]): Returns the (shared) MindsDB connection
+        embedding_model (Optional[Dict[str, str]]): Embedding model for new knowledge bases
+    """
+
+    name = 'mindsdb'
+
+    def __init__(self, get_server: Callable[[], Any], embedding_model: Optional[Dict[str, str]] = None):
+        self.get_server = get_server
+        self.embedding_model = embedding_model
+
+    def get(self, kb_name: str):
+        return self.get_server().knowledge_bases.get(kb_name)
+
+    def create(self, kb_name: str):
+        return self.get_server().knowledge_bases.create(name=kb_name, embedding_model=self.embedding_model)
+
+    def delete(self, kb_name: str, ids: List[str]):
+        for start in range(0, len(ids), 500):
+            id_list = ', '.join(f"'{row_id}'" for row_id in ids[start:start + 500])
+            self.get_server().query(f"DELETE FROM {kb_name} WHERE id IN ({id_list})").fetch()
+
+    def list(self) -> List[str]:
+        return [kb.name for kb in self.get_server().knowledge_bases.list() or []]
+
+    def warm(self):
+        self.get_server()
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The local backend needs numpy. Run: pip install numpy") from None
+    return numpy
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embeddings from hashed word unigrams and bigrams.
+
+    Lexical rather than semantic, but deterministic and fast: good for
+    tests, offline use and corpora where wording is consistent.
+
+    Args:
+        dim (int): Vector size
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def embed(self, texts: List[str]):
+        np = _numpy()
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = re.findall(r'\w+', text.lower())
+            for feature, count in Counter(words + [a + ' ' + b for a, b in zip(words, words[1:])]).items():
+                h = zlib.crc32(feature.encode('utf-8'))
+                vectors[i, h % self.dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + np.log(count))
+        return _normalize(vectors)
+
+
+class OllamaEmbedder:
+    """
+    Embeddings from an Ollama model, e.g. nomic-embed-text.
+
+    Args:
+        model (str): Embedding model name
+        host (Optional[str]): Ollama URL
+    """
+
+    def __init__(self, model: str = 'nomic-embed-text', host: Optional[str] = None):
+        self.model = model
+        self.host = host
+        self.name = f"ollama:{model}"
+        self._client = None
+
+    def embed(self, texts: List[str]):
+        np = _numpy()
+        if self._client is None:
+            import ollama
+            self._client = ollama.Client(host=self.host)
+        if hasattr(self._client, 'embed'):
+            vectors = self._client.embed(model=self.model, input=texts)['embeddings']
+        else:
+            vectors = [self._client.embeddings(model=self.model, prompt=text)['embedding'] for text in texts]
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def _normalize(vectors):
+    np = _numpy()
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalKnowledgeBase:
+    """
+    One knowledge base stored in a folder.
+
+    ``vectors.f32`` holds one unit-length float32 embedding per row and is
+    memory-mapped for search; ``meta.db`` maps rows to ids, content and
+    metadata. Re-inserting an id appends a new row and marks the old one
+    deleted. With a coarse index (``centroids.npy`` + ``assign.npy``) a
+    search only scores the rows of the ``nprobe`` closest clusters, plus
+    rows added since the index was built.
+
+    Args:
+        path (Union[str, Path]): Folder of the knowledge base
+        embedder: Object with ``name`` and ``embed(texts) -> ndarray``
+        clusters (int): Coarse clusters to build once the KB is large enough (0 = exact search only)
+        nprobe (int): Clusters scanned per search
+    """
+
+    VECTORS = 'vectors.f32'
+    META = 'meta.db'
+    CENTROIDS = 'centroids.npy'
+    ASSIGN = 'assign.npy'
+
+    def __init__(self, path: Union[str, Path], embedder, clusters: int = 0, nprobe: int = 8):
+        self.path = Path(path)
+        self.name = self.path.name
+        self.embedder = embedder
+        self.clusters = clusters
+        self.nprobe = nprobe
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path / self.META), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " row INTEGER PRIMARY KEY,"
+            " id TEXT,"
+            " content TEXT NOT NULL,"
+            " metadata TEXT NOT NULL,"
+            " deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS rows_id ON rows (id) WHERE deleted = 0")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._state = None
+        self._state_version = None
+
+    def _info(self, key: str, default=None):
+        row = self._conn.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_info(self, key: str, value):
+        self._conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def count(self) -> int:
+        """Rows stored, including ones marked deleted."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM rows").fetchone()[0]
+
+    def insert(self, rows: List[Dict[str, Any]]):
+        """
+        Embed and store rows of ``{'content', 'metadata', 'id'?}``; rows with a known id replace it.
+
+        Args:
+            rows (List[Dict[str, Any]]): Rows as produced by chunk_rows
+        """
+        if not rows:
+            return
+        vectors = self.embedder.embed([row['content'] for row in rows])
+        with self._lock:
+            # BEGIN IMMEDIATE serializes writers across processes (CLI and TextSpark)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dim = self._info('dim')
+                embedder = self._info('embedder')
+                if dim is None:
+                    dim, embedder = int(vectors.shape[1]), self.embedder.name
+                    self._set_info('dim', dim)
+                    self._set_info('embedder', embedder)
+                if embedder != self.embedder.name or dim != vectors.shape[1]:
+                    raise ValueError(f"Knowledge base {self.name} was built with {embedder} ({dim} dims); "
+                                     f"got {self.embedder.name} ({vectors.shape[1]} dims)")
+                start = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM rows").fetchone()[0]
+                with open(self.path / self.VECTORS, 'ab') as f:
+                    # Drop vectors a crashed writer appended without committing their rows
+                    f.truncate(start * dim * 4)
+                    f.write(vectors.astype('<f4', copy=False).tobytes())
+                ids = [row.get('id') for row in rows if row.get('id') is not None]
+                for offset in range(0, len(ids), 500):
+                    chunk = ids[offset:offset + 500]
+                    self._conn.execute(
+                        f"UPDATE rows SET deleted = 1 WHERE deleted = 0 AND id IN ({', '.join('?' * len(chunk))})", chunk)
+                self._conn.executemany(
+                    "INSERT INTO rows (row, id, content, metadata) VALUES (?, ?, ?, ?)",
+                    [(start + i, row.get('id'), row['content'], json.dumps(row.get('metadata') or {}, default=str))
+                     for i, row in enumerate(rows)]
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        self._maybe_build_index()
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            for offset in range(0, len(ids), 500):
+                chunk = ids[offset:offset + 500]
+                self._conn.execute(f"UPDATE rows SET deleted = 1 WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            self._conn.commit()
+
+    def _load(self):
+        """Map the vectors and deletion mask, reloading only when the store changed."""
+        np = _numpy()
+        version = (self._conn.execute("PRAGMA data_version").fetchone()[0], self.count(),
+                   self._conn.total_changes)
+        if self._state is not None and version == self._state_version:
+            return self._state
+        count, dim = version[1], self._info('dim')
+        state = {'count': count, 'vectors': None, 'deleted': None, 'centroids': None, 'assign': None}
+        if count and dim:
+            state['vectors'] = np.memmap(self.path / self.VECTORS, dtype='<f4', mode='r', shape=(count, dim))
+            deleted = np.zeros(count, dtype=bool)
+            deleted_rows = [row for (row,) in self._conn.execute("SELECT row FROM rows WHERE deleted = 1")]
+            deleted[deleted_rows] = True
+            state['deleted'] = deleted
+            indexed = self._info('indexed_rows', 0)
+            if indexed and (self.path / self.CENTROIDS).exists():
+                state['centroids'] = np.load(self.path / self.CENTROIDS)
+                state['assign'] = np.load(self.path / self.ASSIGN, mmap_mode='r')[:indexed]
+        self._state, self._state_version = state, version
+        return state
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return the rows most similar to the query.
+
+        Args:
+            query (str): Search text
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Dict[str, Any]]: Rows with id, content, metadata and relevance (cosine similarity)
+        """
+        np = _numpy()
+        with self._lock:
+            state = self._load()
+        if not state['count'] or limit <= 0:
+            return []
+        q = self.embedder.embed([query])[0]
+        vectors, deleted = state['vectors'], state['deleted']
+
+        if state['centroids'] is not None:
+            indexed = len(state['assign'])
+            nearest = np.argsort(state['centroids'] @ q)[::-1][:self.nprobe]
+            candidates = np.concatenate([np.flatnonzero(np.isin(state['assign'], nearest)),
+                                         np.arange(indexed, state['count'])])
+            candidates = candidates[~deleted[candidates]]
+            scores = vectors[candidates] @ q
+        else:
+            candidates = None
+            scores = vectors @ q
+            scores[deleted] = -np.inf
+
+        k = min(limit, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        rows = [int(candidates[i]) if candidates is not None else int(i) for i in top]
+        relevance = {row: float(scores[i]) for row, i in zip(rows, top)}
+
+        with self._lock:
+            found = {
+                r[0]: r[1:]
+                for r in self._conn.execute(
+                    f"SELECT row, id, content, metadata FROM rows WHERE row IN ({', '.join('?' * len(rows))})", rows)
+            } if rows else {}
+        return [{'id': found[row][0], 'content': found[row][1], 'metadata': json.loads(found[row][2]),
+                 'relevance': relevance[row]} for row in rows if row in found]
+
+    def _maybe_build_index(self):
+        if not self.clusters:
+            return
+        count = self.count()
+        indexed = self._info('indexed_rows', 0)
+        # Roughly 40 rows per cluster are needed for useful centroids; rebuild as the KB grows
+        if count >= self.clusters * 40 and count - indexed > max(count // 10, 1000):
+            self.build_index()
+
+    def build_index(self, clusters: Optional[int] = None, iterations: int = 10, sample: int = 256, seed: int = 0):
+        """
+        Build the coarse index with spherical k-means.
+
+        Centroids are trained on a sample of rows, then every row is assigned
+        to its nearest centroid in blocks, so memory stays bounded.
+
+        Args:
+            clusters (Optional[int]): Number of clusters; defaults to self.clusters
+            iterations (int): k-means iterations
+            sample (int): Training rows per cluster
+            seed (int): Random seed
+        """
+        np = _numpy()
+        clusters = clusters or self.clusters
+        with self._lock:
+            state = self._load()
+        count, vectors = state['count'], state['vectors']
+        if not count or not clusters:
+            return
+        clusters = min(clusters, count)
+        rng = np.random.default_rng(seed)
+        training = np.asarray(vectors[np.sort(rng.choice(count, size=min(count, clusters * sample), replace=False))])
+        centroids = training[rng.choice(len(training), size=clusters, replace=False)].copy()
+        for _ in range(iterations):
+            nearest = np.argmax(training @ centroids.T, axis=1)
+            for c in range(clusters):
+                members = training[nearest == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+
+        assign = np.empty(count, dtype=np.int32)
+        for start in range(0, count, 65536):
+            assign[start:start + 65536] = np.argmax(np.asarray(vectors[start:start + 65536]) @ centroids.T, axis=1)
+
+        with self._lock:
+            for name, array in ((self.CENTROIDS, centroids), (self.ASSIGN, assign)):
+                tmp = self.path / (name + '.tmp')
+                with open(tmp, 'wb') as f:
+                    np.save(f, array)
+                os.replace(tmp, self.path / name)
+            self._set_info('indexed_rows', count)
+            self._conn.commit()
+            self._state = None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LocalVectorBackend(RetrievalBackend):
+    """
+    Knowledge bases stored as local vector indexes, one folder each.
+
+    Args:
+        root (Union[str, Path]): Folder holding the knowledge bases
+        embedder: Object with ``name`` and ``embed(texts) -> ndarray``
+        clusters (int): Coarse index clusters for large knowledge bases (0 = exact search only)
+        nprobe (int): Clusters scanned per search
+    """
+
+    name = 'local'
+
+    def __init__(self, root: Union[str, Path], embedder, clusters: int = 0, nprobe: int = 8):
+        self.root = Path(root)
+        self.embedder = embedder
+        self.clusters = clusters
+        self.nprobe = nprobe
+        self._handles: Dict[str, LocalKnowledgeBase] = {}
+        self._lock = threading.Lock()
+
+    def _open(self, kb_name: str) -> LocalKnowledgeBase:
+        if not re.fullmatch(r'[A-Za-z0-9_\-]+', kb_name):
+            raise ValueError(f"Invalid knowledge base name: {kb_name}")
+        with self._lock:
+            if kb_name not in self._handles:
+                self._handles[kb_name] = LocalKnowledgeBase(self.root / kb_name, self.embedder,
+                                                            clusters=self.clusters, nprobe=self.nprobe)
+            return self._handles[kb_name]
+
+    def get(self, kb_name: str) -> LocalKnowledgeBase:
+        if kb_name not in self._handles and not (self.root / kb_name / LocalKnowledgeBase.META).exists():
+            raise LookupError(f"Knowledge base {kb_name} does not exist in {self.root}")
+        return self._open(kb_name)
+
+    def create(self, kb_name: str) -> LocalKnowledgeBase:
+        return self._open(kb_name)
+
+    def delete(self, kb_name: str, ids: List[str]):
+        self.get(kb_name).delete(ids)
+
+    def list(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / LocalKnowledgeBase.META).exists())
+
+
+def make_embedder(config: Dict[str, Any]):
+    """
+    Build the embedder for the local backend from config.
+
+    ``local_embedding`` selects ``hashing`` or ``ollama``; by default the
+    KB's ``embedding_provider`` decides, with ``embedding_model`` as model.
+    """
+    kind = config.get('local_embedding') or config.get('embedding_provider', 'ollama')
+    if kind == 'hashing':
+        return HashingEmbedder(config.get('local_embedding_dim', 512))
+    if kind == 'ollama':
+        return OllamaEmbedder(config.get('embedding_model', 'nomic-embed-text'), config.get('ollama_url'))
+    raise ValueError(f"Unsupported local embedding: {kind} (use 'hashing' or 'ollama')")
+
+
+def open_backend(config: Dict[str, Any], get_server: Optional[Callable[[], Any]] = None,
+                 base_dir: Union[str, Path] = '.') -> RetrievalBackend:
+    """
+    Open the backend selected by the ``backend`` config key.
+
+    Args:
+        config (Dict[str, Any]): Loaded configuration
+        get_server (Optional[Callable[[], Any]]): MindsDB connection factory for the mindsdb backend
+        base_dir (Union[str, Path]): Folder that relative index paths are resolved against
+
+    Returns:
+        RetrievalBackend: The configured backend
+    """
+    kind = config.get('backend', 'mindsdb')
+    if kind == 'local':
+        return LocalVectorBackend(Path(base_dir) / (config.get('local_index_path') or LOCAL_INDEX_DIR),
+                                  make_embedder(config), clusters=config.get('local_clusters', 0),
+                                  nprobe=config.get('local_nprobe', 8))
+    if kind == 'mindsdb':
+        return MindsDBBackend(get_server, {
+            'model_name': config.get('embedding_model', 'nomic-embed-text'),
+            'provider': config.get('embedding_provider', 'ollama'),
+        })
+    raise ValueError(f"Unknown backend: {kind} (use 'mindsdb' or 'local')")
@@ -0,0 +1,177 @@
+"""
+Concurrent batch queries for TextTrove CLI
+"""
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+SearchFn = Callable[[str, str, int], List[Dict[str, Any]]]
+
+
+def read_requests(stream: IO[str], default_kb: str, default_limit: int = 5) -> Iterator[Dict[str, Any]]:
+    """
+    Parse batch requests from JSONL.
+
+    Each line is an object with ``search`` (or ``query``) and optional
+    ``kb_name``, ``limit`` and ``id``. Blank lines are skipped.
+
+    Args:
+        stream (IO[str]): JSONL input
+        default_kb (str): Knowledge base for lines without kb_name
+        default_limit (int): Limit for lines without one
+
+    Yields:
+        Dict[str, Any]: Normalized requests with their line index
+    """
+    index = 0
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            search = data.get('search', data.get('query'))
+            if not isinstance(search, str) or not search:
+                raise ValueError("missing 'search'")
+            request = {
+                'index': index,
+                'id': data.get('id', index),
+                'search': search,
+                'kb_name': data.get('kb_name') or default_kb,
+                'limit': int(data.get('limit') or default_limit),
+            }
+        except (ValueError, TypeError, AttributeError) as e:
+            request = {'index': index, 'id': index, 'error': f"line {line_number}: {e}"}
+        index += 1
+        yield request
+
+
+def run_batch(requests: Iterable[Dict[str, Any]], search: SearchFn, concurrency: int = 8,
+              timeout: Optional[float] = None, ordered: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Run searches through a bounded thread pool.
+
+    Only a small window of requests is read ahead, so batches of any size run
+    in constant memory. At most ``concurrency`` requests are handed to the
+    pool at once and each one's timeout runs from that moment. A request that
+    exceeds ``timeout`` is reported as timed out; its thread cannot be
+    interrupted and finishes in the background (its result is discarded).
+    Requests queued behind searches that hang therefore time out as well,
+    instead of stalling the batch.
+
+    Args:
+        requests (Iterable[Dict[str, Any]]): Output of read_requests
+        search (SearchFn): Called as search(kb_name, query, limit)
+        concurrency (int): Maximum searches running at once
+        timeout (Optional[float]): Per-request timeout in seconds
+        ordered (bool): Yield in input order instead of completion order
+
+    Yields:
+        Dict[str, Any]: One record per request with status, results and latency_ms
+    """
+    requests = iter(requests)
+    workers = max(1, concurrency)
+    window = workers * 4
+    started: Dict[int, float] = {}
+    buffered: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+
+    def record(request, status, results=None, error=None):
+        start = started.pop(request['index'], None)
+        latency = (time.perf_counter() - start) * 1000 if start is not None else 0.0
+        return {
+            'id': request['id'],
+            'index': request['index'],
+            'search': request.get('search'),
+            'kb_name': request.get('kb_name'),
+            'status': status,
+            'latency_ms': round(latency, 3),
+            'results': results if results is not None else [],
+            **({'error': error} if error else {}),
+        }
+
+    # Not a with-block: shutting down must not wait for timed-out searches
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="texttrove-batch")
+    try:
+        pending = {}
+        invalid: List[Dict[str, Any]] = []
+        exhausted = False
+
+        def fill():
+            nonlocal exhausted
+            # Submitting no more than the pool runs keeps timeouts measured from submission fair
+            while not exhausted and len(pending) < workers and len(pending) + len(buffered) < window:
+                request = next(requests, None)
+                if request is None:
+                    exhausted = True
+                elif 'error' in request:
+                    invalid.append(record(request, 'error', error=request['error']))
+                else:
+                    started[request['index']] = time.perf_counter()
+                    pending[executor.submit(search, request['kb_name'], request['search'], request['limit'])] = request
+
+        def emit(items):
+            nonlocal next_index
+            if not ordered:
+                yield from items
+                return
+            for item in items:
+                buffered[item['index']] = item
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
+
+        fill()
+        while pending or invalid:
+            finished = invalid[:]
+            invalid.clear()
+
+            if pending:
+                wait_for = None
+                if timeout is not None:
+                    now = time.perf_counter()
+                    wait_for = max(0.0, min(started[r['index']] + timeout - now for r in pending.values()))
+                done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    request = pending.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        finished.append(record(request, 'error', error=str(error)))
+                    else:
+                        finished.append(record(request, 'ok', results=future.result()))
+
+                if timeout is not None:
+                    now = time.perf_counter()
+                    for future, request in list(pending.items()):
+                        if now - started[request['index']] >= timeout:
+                            del pending[future]
+                            future.cancel()
+                            finished.append(record(request, 'timeout', error=f"timed out after {timeout}s"))
+
+            yield from emit(finished)
+            fill()
+
+        yield from emit([])
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies in milliseconds.
+
+    Args:
+        latencies (List[float]): Per-request latency in milliseconds
+
+    Returns:
+        Dict[str, float]: p50, p95, p99 and max
+    """
+    if not latencies:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {'p50': percentile(50), 'p95': percentile(95), 'p99': percentile(99), 'max': ordered[-1]}
@@ -0,0 +1,176 @@
+"""
+Query result cache shared by the TextTrove CLI and TextSpark
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from texttrove.metrics import SEARCH_SECONDS, SEARCHES, observe
+
+CACHE_FILE = "texttrove_cache.db"
+
+
+def cache_key(kb_name: str, query: str, limit: int, filters: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cache key for a knowledge base search.
+
+    Args:
+        kb_name (str): Knowledge base name
+        query (str): Search text
+        limit (int): Maximum number of results
+        filters (Optional[Dict[str, Any]]): Metadata filters, if any
+
+    Returns:
+        str: Hex digest identifying the search
+    """
+    payload = json.dumps([kb_name, query, limit, filters or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with a TTL, safe to share between request threads.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, kb_name: str, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (kb_name, time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, kb_name: str):
+        """Drop every cached search against a knowledge base."""
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[0] == kb_name]:
+                del self._entries[key]
+
+
+class DiskCache:
+    """
+    SQLite-backed LRU cache with a TTL, shared by separate CLI invocations.
+
+    Values are stored as JSON, so cached search results come back as plain
+    dicts and lists.
+    """
+
+    def __init__(self, path: Union[str, Path] = CACHE_FILE, max_entries: int = 1024, ttl: float = 300.0):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " kb_name TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_kb ON results (kb_name)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self.conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, kb_name: str, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (key, kb_name, value, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, kb_name, json.dumps(value, default=str), now, now)
+            )
+            self.conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def invalidate(self, kb_name: str):
+        """Drop every cached search against a knowledge base."""
+        with self._lock:
+            self.conn.execute("DELETE FROM results WHERE kb_name = ?", (kb_name,))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def cached_search(cache, kb_name: str, query: str, limit: int, search: Callable[[], List[Dict[str, Any]]],
+                  filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Return cached results for a search, running it on a miss.
+
+    Args:
+        cache: MemoryCache, DiskCache or None to bypass caching
+        kb_name (str): Knowledge base name
+        query (str): Search text
+        limit (int): Maximum number of results
+        search (Callable[[], List[Dict[str, Any]]]): Runs the real search
+        filters (Optional[Dict[str, Any]]): Metadata filters, if any
+
+    Returns:
+        List[Dict[str, Any]]: Search results
+    """
+    with observe(SEARCHES, SEARCH_SECONDS, kb=kb_name) as labels:
+        if cache is None:
+            labels['outcome'] = 'uncached'
+            return search()
+        key = cache_key(kb_name, query, limit, filters)
+        results = cache.get(key)
+        labels['outcome'] = 'miss' if results is None else 'hit'
+        if results is None:
+            results = search()
+            if results is not None:
+                results = _plain(results)
+                cache.set(kb_name, key, results)
+        return results
+
+
+def _plain(results: Any) -> Any:
+    """Convert search results to plain lists and dicts before caching."""
+    if hasattr(results, 'to_dict'):
+        return results.to_dict('records')
+    return [dict(r) if hasattr(r, 'keys') else r for r in results]
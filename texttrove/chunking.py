@@ -0,0 +1,208 @@
+"""
+Streaming document chunker for TextTrove
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+UNITS = ('chars', 'tokens')
+BOUNDARIES = ('sentence', 'paragraph', 'none')
+
+_TOKEN = re.compile(r'\S+')
+_WHITESPACE = re.compile(r'\s+')
+_BOUNDARY_PATTERNS = {
+    'paragraph': re.compile(r'\n[ \t]*\n\s*'),
+    'sentence': re.compile(r'[.!?]["\')\]]*\s+'),
+}
+
+
+class Chunk(NamedTuple):
+    """A passage of a document with its character offsets in the full text"""
+    text: str
+    index: int
+    start: int
+    end: int
+
+
+def chunk_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read chunking settings from the TextTrove config.
+
+    Args:
+        config (Dict[str, Any]): Loaded config.yaml
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for iter_chunks
+    """
+    return {
+        'chunk_size': int(config.get('chunk_size', 1000)),
+        'overlap': int(config.get('chunk_overlap', 200)),
+        'unit': config.get('chunk_unit', 'chars'),
+        'boundary': config.get('chunk_boundary', 'sentence'),
+    }
+
+
+def check_chunk_options(chunk_size: int, overlap: int, unit: str, boundary: Optional[str]):
+    """
+    Validate chunking settings.
+
+    Raises:
+        ValueError: If the unit, boundary or overlap is not usable
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown chunk unit: {unit}. Use one of: {', '.join(UNITS)}")
+    if (boundary or 'none') not in BOUNDARIES:
+        raise ValueError(f"Unknown chunk boundary: {boundary}. Use one of: {', '.join(BOUNDARIES)}")
+    if chunk_size > 0 and not 0 <= overlap < chunk_size:
+        raise ValueError("Chunk overlap must be at least 0 and smaller than the chunk size")
+
+
+def iter_chunks(text: Union[str, Iterable[str]], chunk_size: int = 1000, overlap: int = 200,
+                unit: str = 'chars', boundary: Optional[str] = 'sentence') -> Iterator[Chunk]:
+    """
+    Split text into overlapping passages.
+
+    ``text`` may be a string or an iterable of string segments (for example
+    pages); segments are consumed lazily and only about one window of text is
+    buffered at a time. Windows are measured in characters or whitespace
+    separated tokens and end on the last sentence or paragraph boundary in
+    the second half of the window, falling back to whitespace.
+
+    Args:
+        text (Union[str, Iterable[str]]): Text or text segments
+        chunk_size (int): Window size in units; 0 disables chunking
+        overlap (int): Units shared between consecutive chunks
+        unit (str): 'chars' or 'tokens'
+        boundary (Optional[str]): 'sentence', 'paragraph' or 'none'
+
+    Yields:
+        Chunk: Passages with offsets into the concatenated segments
+    """
+    check_chunk_options(chunk_size, overlap, unit, boundary)
+    boundary = boundary or 'none'
+    segments = iter([text] if isinstance(text, str) else text)
+
+    if chunk_size <= 0:
+        full = ''.join(segments)
+        chunk = _make_chunk(full, 0, len(full), 0, 0)
+        if chunk:
+            yield chunk
+        return
+
+    buf = ''
+    buf_offset = 0  # offset of buf[0] in the full text
+    pos = 0         # start of the current window within buf
+    index = 0
+    exhausted = False
+
+    while True:
+        end = _window_end(buf, pos, chunk_size, unit)
+        if end is None and not exhausted:
+            segment = next(segments, None)
+            if segment is None:
+                exhausted = True
+            else:
+                # Drop consumed text before growing the buffer
+                buf_offset += pos
+                buf = buf[pos:] + segment
+                pos = 0
+            continue
+
+        if end is None:
+            chunk = _make_chunk(buf, pos, len(buf), buf_offset, index)
+            if chunk:
+                yield chunk
+            return
+
+        cut = _find_cut(buf, pos, end, boundary)
+        chunk = _make_chunk(buf, pos, cut, buf_offset, index)
+        if chunk:
+            yield chunk
+            index += 1
+        next_pos = _overlap_start(buf, pos, cut, overlap, unit)
+        pos = next_pos if next_pos > pos else cut
+
+
+def chunk_rows(text: Union[str, Iterable[str]], metadata: Dict[str, Any], id_prefix: Optional[str] = None,
+               **options) -> Iterator[Dict[str, Any]]:
+    """
+    Build knowledge base rows for each chunk of a document.
+
+    Args:
+        text (Union[str, Iterable[str]]): Text or text segments
+        metadata (Dict[str, Any]): Metadata shared by every chunk
+        id_prefix (Optional[str]): If set, rows get the id "<prefix>-<chunk_index>"
+        **options: Keyword arguments for iter_chunks
+
+    Yields:
+        Dict[str, Any]: Rows with chunk_index and offsets in their metadata
+    """
+    for chunk in iter_chunks(text, **options):
+        row = {} if id_prefix is None else {'id': f"{id_prefix}-{chunk.index}"}
+        yield {
+            **row,
+            'content': chunk.text,
+            'metadata': {
+                **metadata,
+                'chunk_index': chunk.index,
+                'start_offset': chunk.start,
+                'end_offset': chunk.end,
+            }
+        }
+
+
+def _window_end(buf: str, pos: int, size: int, unit: str) -> Optional[int]:
+    """Return the end of a full window starting at pos, or None if buf is too short."""
+    if unit == 'chars':
+        end = pos + size
+        # One character of lookahead so a boundary right at the edge is seen
+        return end if end < len(buf) else None
+    count = 0
+    for match in _TOKEN.finditer(buf, pos):
+        count += 1
+        if count == size:
+            # Only trust the token once whitespace after it has arrived
+            return match.end() if match.end() < len(buf) else None
+    return None
+
+
+def _find_cut(buf: str, pos: int, end: int, boundary: str) -> int:
+    """Return the best place to end a window between its midpoint and end."""
+    lo = pos + (end - pos) // 2
+    patterns = []
+    if boundary == 'paragraph':
+        patterns.append(_BOUNDARY_PATTERNS['paragraph'])
+    if boundary in ('paragraph', 'sentence'):
+        patterns.append(_BOUNDARY_PATTERNS['sentence'])
+    patterns.append(_WHITESPACE)
+
+    for pattern in patterns:
+        cut = None
+        for match in pattern.finditer(buf, lo, end + 1):
+            cut = match.end()
+        if cut is not None and cut > pos:
+            return min(cut, end)
+    return end
+
+
+def _overlap_start(buf: str, pos: int, cut: int, overlap: int, unit: str) -> int:
+    """Return where the next window starts so that it shares `overlap` units."""
+    if overlap <= 0:
+        return cut
+    if unit == 'tokens':
+        starts = [m.start() for m in _TOKEN.finditer(buf, pos, cut)]
+        return starts[-overlap] if len(starts) >= overlap else cut
+    start = max(pos, cut - overlap)
+    # Start on a word rather than in the middle of one
+    if start > 0 and not buf[start - 1].isspace():
+        match = _WHITESPACE.search(buf, start, cut)
+        start = match.end() if match else cut
+    return start
+
+
+def _make_chunk(buf: str, start: int, end: int, buf_offset: int, index: int) -> Optional[Chunk]:
+    raw = buf[start:end]
+    text = raw.strip()
+    if not text:
+        return None
+    lead = len(raw) - len(raw.lstrip())
+    return Chunk(text, index, buf_offset + start + lead, buf_offset + start + lead + len(text))
@@ -1,23 +1,21 @@
+import os
 import sys
 import datetime
 from pathlib import Path
 import typer
-import yaml
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-try:
-    import mindsdb_sdk
-except ImportError:
-    print("Error: mindsdb-sdk not installed. Run: pip install mindsdb-sdk")
-    sys.exit(1)
-
+# Heavy modules (mindsdb_sdk, yaml, rich) are imported inside the functions
+# that use them so that --help and scripted calls start quickly.
+from texttrove.profiling import tracer
 from texttrove.utils import (
+    SUPPORTED_EXTENSIONS,
     extract_text_from_file,
+    loading_progress,
     loading_spinner,
+    peak_rss_bytes,
+    resolve_path,
     get_banner,
     validate_folder,
     console
@@ -31,9 +29,21 @@ app = typer.Typer(
 
 server = None
 config = {}
+backend = None
+lexical_index = None
+dedup_index = None
+kb_handles = {}
+kb_resolver = None
+fanout_executor = None
+summary_executor = None
+llm_clients = {}
+result_cache = None
+summary_cache = None
+daemon_mode = False
 
 def load_config():
     global config
+    import yaml
     config_path = Path("config.yaml")
     if not config_path.exists():
         create_default_config()
@@ -41,6 +51,7 @@ def load_config():
         config = yaml.safe_load(f)
 
 def create_default_config():
+    import yaml
     default_config = {
         'ai_provider': 'groq',
         'groq_api_key': '',
@@ -50,7 +61,27 @@ def create_default_config():
         'ollama_model': 'llama3',
         'embedding_model': 'nomic-embed-text',
         'embedding_provider': 'ollama',
-        'huggingface_api_token': ''
+        'huggingface_api_token': '',
+        'ingest_batch_size': 100,
+        'chunk_size': 1000,
+        'chunk_overlap': 200,
+        'chunk_unit': 'chars',
+        'chunk_boundary': 'sentence',
+        'pdf_split_pages': 100,
+        'pdf_split_mb': 10,
+        'stream_text_mb': 32,
+        'cache_enabled': True,
+        'cache_ttl': 300,
+        'cache_max_entries': 1024,
+        'lexical_index': True,
+        'summary_results': 5,
+        'summary_concurrency': 4,
+        'summary_chunk_chars': 4000,
+        'summary_cache': True,
+        'dedup': True,
+        'dedup_threshold': 0.85,
+        'normalize': True,
+        'boilerplate_share': 0.4
     }
     with open('config.yaml', 'w') as f:
         yaml.dump(default_config, f)
@@ -58,89 +89,460 @@ def create_default_config():
 
 def connect_to_mindsdb():
     global server
+    from texttrove.backends import connect_mindsdb
     try:
-        server = mindsdb_sdk.connect(config.get('mindsdb_url'))
+        with tracer.stage('connect'):
+            server = connect_mindsdb(config.get('mindsdb_url'))
         console.print(f"[green]✓ Connected to MindsDB at {config.get('mindsdb_url')}[/green]")
+    except ImportError:
+        print("Error: mindsdb-sdk not installed. Run: pip install mindsdb-sdk")
+        sys.exit(1)
     except Exception as e:
         console.print(f"[red]Failed to connect to MindsDB: {e}[/red]")
         sys.exit(1)
 
+def get_server():
+    """Connect to MindsDB on first use and reuse the connection for the rest of the process"""
+    if server is None:
+        connect_to_mindsdb()
+    return server
+
+def manifest_path() -> Path:
+    from texttrove.manifest import MANIFEST_FILE
+    return Path(config.get('manifest_path') or Path("config.yaml").parent / MANIFEST_FILE)
+
+def get_lexical_index(create: bool = True):
+    """Open the BM25 index once per process; None when disabled (or missing and not created)"""
+    global lexical_index
+    if lexical_index is None and config.get('lexical_index', True):
+        from texttrove.lexical import LEXICAL_FILE, LexicalIndex
+        path = Path(config.get('lexical_path') or Path("config.yaml").parent / LEXICAL_FILE)
+        if create or path.exists():
+            lexical_index = LexicalIndex(path)
+    return lexical_index
+
+def get_backend():
+    """Open the configured retrieval backend (MindsDB or local vector index) once per process"""
+    global backend
+    if backend is None:
+        from texttrove.backends import open_backend
+        backend = open_backend(config, get_server, base_dir=Path("config.yaml").parent)
+    return backend
+
+def get_dedup_index(create: bool = True):
+    """Open the passage dedup store once per process; an existing store is always opened so deletes reach it"""
+    global dedup_index
+    if dedup_index is None:
+        from texttrove.dedup import DEDUP_FILE, DedupIndex
+        path = Path(config.get('dedup_path') or Path("config.yaml").parent / DEDUP_FILE)
+        if path.exists() or (create and config.get('dedup', True)):
+            dedup_index = DedupIndex(path, threshold=config.get('dedup_threshold', 0.85))
+    return dedup_index
+
+def delete_from_kb(kb_name: str, ids: list, release: bool = True) -> list:
+    """
+    Delete rows from the knowledge base and the local indexes.
+
+    Returns:
+        list: Ids of skipped duplicate rows whose kept passage was deleted
+    """
+    from texttrove.metrics import KB_CALLS, KB_SECONDS, observe
+    with observe(KB_CALLS, KB_SECONDS, operation='delete', kb=kb_name):
+        get_backend().delete(kb_name, ids)
+    lexical = get_lexical_index()
+    if lexical:
+        lexical.delete(kb_name, ids)
+    dedup = get_dedup_index(create=False) if release else None
+    return dedup.release(kb_name, ids) if dedup else []
+
+def open_cache(enabled: bool = True):
+    global result_cache
+    if not enabled or not config.get('cache_enabled', True):
+        return None
+    if result_cache is None:
+        from texttrove.cache import CACHE_FILE, DiskCache
+        path = config.get('cache_path') or Path("config.yaml").parent / CACHE_FILE
+        result_cache = DiskCache(path, max_entries=config.get('cache_max_entries', 1024), ttl=config.get('cache_ttl', 300))
+    return result_cache
+
 def show_banner():
+    from rich.panel import Panel
     banner = get_banner()
     console.print(Panel(banner, style="bold green", title="TextTrove CLI"))
 
+def get_kb(kb_name: str):
+    """Look up a knowledge base handle once per process"""
+    if kb_name not in kb_handles:
+        with tracer.stage('kb_lookup', kb=kb_name):
+            kb_handles[kb_name] = get_backend().get(kb_name)
+    return kb_handles[kb_name]
+
+def search_kb(kb_name: str, search: str, limit: int):
+    from texttrove.metrics import KB_CALLS, KB_SECONDS, observe
+    kb = get_kb(kb_name)
+    try:
+        with tracer.stage('search', kb=kb_name, limit=limit) as stage, \
+                observe(KB_CALLS, KB_SECONDS, operation='search', kb=kb_name):
+            results = kb.search(query=search, limit=limit)
+            stage['results'] = len(results) if results is not None else 0
+    except Exception:
+        # The KB may have been dropped or recreated; look it up again next time
+        kb_handles.pop(kb_name, None)
+        raise
+    return results
+
+SEARCH_MODES = ('semantic', 'lexical', 'hybrid')
+
+def retrieve(kb_name: str, search: str, limit: int, mode: str = 'semantic', cache=None):
+    """Search by meaning (the backend), by terms (BM25 index) or both, fused by reciprocal rank"""
+    from texttrove.cache import cached_search
+
+    if mode == 'semantic':
+        return cached_search(cache, kb_name, search, limit, lambda: search_kb(kb_name, search, limit))
+    lexical = get_lexical_index(create=False)
+    if lexical is None:
+        raise RuntimeError("No lexical index found. Run ingest with lexical_index enabled to build it.")
+    # Hybrid fuses deeper lists so passages ranked lower by one method can still surface
+    depth = limit if mode == 'lexical' else limit * 3
+    with tracer.stage('lexical', kb=kb_name, limit=depth) as stage:
+        lexical_results = lexical.search(kb_name, search, depth)
+        stage['results'] = len(lexical_results)
+    if mode == 'lexical':
+        return lexical_results
+
+    from texttrove.lexical import reciprocal_rank_fusion
+    semantic_results = cached_search(cache, kb_name, search, depth, lambda: search_kb(kb_name, search, depth))
+    return reciprocal_rank_fusion([semantic_results, lexical_results], limit=limit)
+
+def get_kb_resolver():
+    """Expand KB lists and globs against the backend's knowledge bases, listing them at most every kb_list_ttl seconds"""
+    global kb_resolver
+    if kb_resolver is None:
+        from texttrove.fanout import KBNameResolver
+        kb_resolver = KBNameResolver(lambda: get_backend().list(), ttl=config.get('kb_list_ttl', 30))
+    return kb_resolver
+
+def retrieve_many(kb_spec: str, search: str, limit: int, mode: str = 'semantic', cache=None, timeout: float = None):
+    """Search every KB a spec names (``a,b`` and/or globs) concurrently; failed or slow KBs leave partial results"""
+    global fanout_executor
+    from texttrove.async_utils import AsyncExecutor
+    from texttrove.fanout import fan_out
+
+    kb_names = get_kb_resolver().resolve(kb_spec)
+    if fanout_executor is None:
+        fanout_executor = AsyncExecutor(max_concurrency=config.get('fanout_concurrency', 8))
+    with tracer.stage('fan_out', kbs=len(kb_names)) as stage:
+        # Only semantic relevance is on one scale in every KB; BM25 and fused scores are merged by rank
+        result = fan_out(lambda name: retrieve(name, search, limit, mode, cache), kb_names, limit,
+                         executor=fanout_executor, timeout=timeout,
+                         score_key='relevance' if mode == 'semantic' else None)
+        stage.update(results=len(result.results), failed=len(result.errors))
+    return result
+
+def report_profile(profile: bool, profile_json: str, metrics_file: str = None):
+    if metrics_file:
+        from texttrove.metrics import REGISTRY
+        REGISTRY.write(resolve_path(metrics_file))
+    if profile:
+        console.print(tracer.table())
+    if profile_json == '-':
+        console.out(tracer.to_json(), highlight=False)
+    elif profile_json:
+        resolve_path(profile_json).write_text(tracer.to_json())
+
 @app.callback()
-def main():
-    load_config()
-    connect_to_mindsdb()
+def main(ctx: typer.Context,
+         profile: bool = typer.Option(False, "--profile", help="Print per-stage timings when the command finishes"),
+         profile_json: str = typer.Option(None, "--profile-json", help="Write per-stage timings as JSON to a file ('-' for stdout)"),
+         metrics_file: str = typer.Option(None, "--metrics", help="Write counters and latency histograms in Prometheus text format to a file")):
+    ctx.call_on_close(lambda: report_profile(profile, profile_json, metrics_file))
+    if ctx.resilient_parsing or any(arg in ('--help', '-h') for arg in sys.argv[1:]):
+        return
+    if daemon_mode:
+        # The daemon loaded its config at startup and keeps it warm
+        return
+    with tracer.stage('config'):
+        load_config()
+
+def ingest_settings(workers: int = None, batch_size: int = None, chunk_size: int = None, chunk_overlap: int = None,
+                    chunk_unit: str = None, max_pages: int = None, time_budget: float = None, dedup: bool = None,
+                    normalize: bool = None) -> dict:
+    """Merge ingest options with config defaults; raises ValueError for invalid chunking"""
+    from texttrove.chunking import check_chunk_options, chunk_options
+
+    chunking = chunk_options(config)
+    if chunk_size is not None:
+        chunking['chunk_size'] = chunk_size
+    if chunk_overlap is not None:
+        chunking['overlap'] = chunk_overlap
+    if chunk_unit is not None:
+        chunking['unit'] = chunk_unit
+    check_chunk_options(**chunking)
+    return {
+        'workers': workers or config.get('ingest_workers') or os.cpu_count() or 1,
+        'batch_size': batch_size or config.get('ingest_batch_size', 100),
+        'max_pages': max_pages or config.get('pdf_max_pages'),
+        'time_budget': time_budget or config.get('pdf_time_budget'),
+        'split_pages': config.get('pdf_split_pages', 100),
+        'split_bytes': int(config.get('pdf_split_mb', 10) * 1024 * 1024),
+        'stream_bytes': int(config.get('stream_text_mb', 32) * 1024 * 1024),
+        'chunking': chunking,
+        'dedup': config.get('dedup', True) if dedup is None else dedup,
+        'normalize': config.get('normalize', True) if normalize is None else normalize,
+        'boilerplate_share': config.get('boilerplate_share', 0.4),
+    }
+
+def open_ingest_kb(kb_name: str):
+    """Return the knowledge base to ingest into, creating it if needed"""
+    with loading_spinner("Initializing Knowledge Base"), tracer.stage('kb_lookup', kb=kb_name):
+        try:
+            kb = get_backend().get(kb_name)
+            console.print(f"[blue]Using existing Knowledge Base: {kb_name}[/blue]")
+        except:
+            kb = get_backend().create(kb_name)
+            console.print(f"[green]Created new Knowledge Base: {kb_name}[/green]")
+    return kb
+
+def apply_ingest_plan(kb, kb_name: str, plan, manifest, category: str, settings: dict, prune: bool) -> dict:
+    """
+    Extract and insert the new and modified files of a plan, then prune removed ones.
+
+    Passages duplicating one already in the knowledge base are skipped before
+    they are embedded. Files whose skipped passages lose their kept copy (it
+    was deleted or changed) are forgotten and ingested again. Text files of
+    at least ``stream_bytes`` are read block by block and chunked as they
+    stream, so their size does not change memory use. With ``normalize`` set,
+    text is cleaned before chunking (whitespace, Unicode, hyphenation, PDF
+    headers and footers) and the bytes removed are reported per file.
+
+    Returns:
+        dict: Counts of processed, failed, updated and removed files, of
+            exact and near duplicate passages skipped, and of bytes normalized away
+    """
+    from itertools import chain
+    from texttrove.chunking import chunk_rows
+    from texttrove.manifest import document_id, row_ids
+    from texttrove.pipeline import BatchInserter, extract_files
+    from texttrove.normalize import TextNormalizer
+    from texttrove.utils import PAGE_BREAK, TEXT_EXTENSIONS, iter_text_blocks
+
+    modified = {str(f.resolve()) for f in plan.modified}
+    pending_files = plan.new + plan.modified
+    stats = {'processed': 0, 'failed': 0, 'updated': 0, 'removed': 0, 'duplicates': 0, 'near_duplicates': 0,
+             'normalized_bytes': 0}
+    normalizer = TextNormalizer(min_share=settings['boilerplate_share']) if settings['normalize'] else None
+    completed = []
+    failed = []
+    skipped = {}
+    orphaned = []
+
+    def on_skip(file_path, row, kind):
+        skipped.setdefault(file_path, []).append(row['id'])
+        stats['duplicates' if kind == 'exact' else 'near_duplicates'] += 1
+
+    def add_document(file_path, text) -> bool:
+        """Queue the passages of a document (a string or streamed segments); False if it has none"""
+        if normalizer:
+            # Only PDF line ends come from the layout; elsewhere a hyphen before a line break is meant
+            pdf = file_path.suffix.lower() == '.pdf'
+            text = (normalizer.normalize(file_path, text, join_hyphens=pdf) if isinstance(text, str)
+                    else normalizer.stream(file_path, text, join_hyphens=pdf))
+        rows = chunk_rows(text, {
+            'category': category,
+            'date_added': str(datetime.date.today()),
+            'source': file_path.name,
+            'file_type': file_path.suffix.lower()
+        }, id_prefix=document_id(file_path), **settings['chunking'])
+        first = next(rows, None)
+        if first is None:
+            return False
+        rows = chain([first], rows)
+        if dedup:
+            rows = dedup.filter(kb_name, rows, on_skip=lambda row, of, kind: on_skip(file_path, row, kind))
+        if lexical:
+            rows = lexical.tee(kb_name, rows)
+        inserter.add(file_path, rows)
+        return True
+
+    def on_inserted(file_path, error):
+        if error is None:
+            stats['processed'] += 1
+            completed.append(file_path)
+            removed = normalizer.removed.get(file_path) if normalizer else None
+            console.print(f"[green]✓ Processed: {file_path.name}[/green]" +
+                          (f" [dim](normalized: {removed:,} bytes removed)[/dim]" if removed else ""))
+        else:
+            stats['failed'] += 1
+            failed.append(file_path)
+            console.print(f"[red]✗ Failed: {file_path.name} - {str(error)}[/red]")
+        advance()
+
+    if pending_files:
+        lexical = get_lexical_index()
+        dedup = get_dedup_index() if settings['dedup'] else None
+        dedup_store = dedup or get_dedup_index(create=False)
+        if dedup_store and plan.modified:
+            # The old passages of modified files are replaced; stop matching new rows against them
+            orphaned += dedup_store.release(kb_name, [row_id for f in plan.modified
+                                                      for row_id in row_ids(f, 0, plan.chunks.get(str(f.resolve()), 0))])
+        # Large text files skip the worker pool (which would return them as one string) and stream here
+        streamed = [f for f in pending_files if settings['chunking']['chunk_size'] > 0
+                    and f.suffix.lower() in TEXT_EXTENSIONS and f.stat().st_size >= settings['stream_bytes']]
+        extracted = [f for f in pending_files if f not in streamed]
+        workers = settings['workers']
+        split_pages, split_bytes = settings['split_pages'], settings['split_bytes']
+        splittable = split_pages and any(f.suffix.lower() == '.pdf' and f.stat().st_size >= split_bytes for f in extracted)
+        if not splittable:
+            workers = max(1, min(workers, len(extracted)))
+        console.print(f"[cyan]Processing {len(pending_files)} files with {workers} worker(s)"
+                      f"{f', streaming {len(streamed)} large text file(s)' if streamed else ''}...[/cyan]")
+
+        with loading_progress("Ingesting files", total=len(pending_files)) as advance, \
+                BatchInserter(kb, batch_size=settings['batch_size'], on_done=on_inserted) as inserter, \
+                tracer.stage('extract', files=len(pending_files), workers=workers, streamed=len(streamed)):
+            for file_path, content, error in extract_files(extracted, workers=workers, max_pages=settings['max_pages'],
+                                                           time_budget=settings['time_budget'], split_pages=split_pages,
+                                                           split_bytes=split_bytes,
+                                                           page_break=PAGE_BREAK if normalizer else '\n'):
+                if error is not None:
+                    stats['failed'] += 1
+                    console.print(f"[red]✗ Failed: {file_path.name} - {str(error)}[/red]")
+                    advance()
+                elif not (content and content.strip() and add_document(file_path, content)):
+                    stats['failed'] += 1
+                    console.print(f"[yellow]⚠ Skipped (empty): {file_path.name}[/yellow]")
+                    advance()
+            for file_path in streamed:
+                try:
+                    added = add_document(file_path, iter_text_blocks(file_path))
+                except Exception as e:
+                    # Rows already queued stay in the KB; the file is not recorded and is retried next run
+                    stats['failed'] += 1
+                    failed.append(file_path)
+                    console.print(f"[red]✗ Failed: {file_path.name} - {str(e)}[/red]")
+                    advance()
+                    continue
+                if not added:
+                    stats['failed'] += 1
+                    console.print(f"[yellow]⚠ Skipped (empty): {file_path.name}[/yellow]")
+                    advance()
+        tracer.add('insert', inserter.insert_seconds, batches=inserter.batches_inserted,
+                   rows=sum(inserter.row_counts.values()))
+        if normalizer:
+            stats['normalized_bytes'] = normalizer.total_removed
+            tracer.add('normalize', normalizer.seconds, files=len(normalizer.removed),
+                       bytes_removed=normalizer.total_removed)
+
+        # Skipped rows keep their chunk index, so counts include them for later deletes
+        chunk_counts = {str(f.resolve()): inserter.row_counts.get(f, 0) + len(skipped.get(f, [])) for f in completed}
+        for path, count in chunk_counts.items():
+            if path in modified:
+                stats['updated'] += 1
+                # Rows with the same ids were replaced; drop the ones past the new end
+                orphaned += delete_from_kb(kb_name, row_ids(path, count, plan.chunks.get(path, 0)))
+        for f in completed:
+            if str(f.resolve()) in modified and skipped.get(f):
+                # Old rows whose new version was skipped as a duplicate are still in the knowledge base
+                delete_from_kb(kb_name, skipped[f], release=False)
+        for f in failed:
+            # Passages of failed files never reached the knowledge base; do not match or find them
+            ids = row_ids(f, 0, inserter.row_counts.get(f, 0) + len(skipped.get(f, [])))
+            if lexical:
+                lexical.delete(kb_name, ids)
+            if dedup:
+                orphaned += dedup.release(kb_name, ids)
+        manifest.record(kb_name, [plan.states[path] for path in chunk_counts], chunk_counts)
+
+    if plan.removed and prune:
+        for path in plan.removed:
+            orphaned += delete_from_kb(kb_name, row_ids(path, 0, plan.chunks.get(path, 0)))
+            console.print(f"[magenta]− Removed: {Path(path).name}[/magenta]")
+        manifest.forget(kb_name, plan.removed)
+        stats['removed'] = len(plan.removed)
+    elif plan.removed:
+        console.print(f"[yellow]{len(plan.removed)} previously ingested file(s) no longer exist. Re-run with --prune to delete them.[/yellow]")
+
+    if orphaned:
+        requeue = manifest.forget_documents(kb_name, {row_id.rsplit('-', 1)[0] for row_id in orphaned})
+        if requeue:
+            console.print(f"[cyan]Re-ingesting {len(requeue)} file(s) with passages that duplicated removed content...[/cyan]")
+            again = apply_ingest_plan(kb, kb_name, manifest.plan_paths(kb_name, requeue), manifest, category, settings, prune)
+            stats = {key: stats[key] + again[key] for key in stats}
+
+    if stats['processed'] or stats['removed']:
+        cache = open_cache()
+        if cache:
+            cache.invalidate(kb_name)
+    return stats
+
+def supported_files_in(folder: str) -> list:
+    return [f for f in Path(folder).iterdir() if f.suffix.lower() in SUPPORTED_EXTENSIONS]
 
 @app.command()
-def ingest(folder: str, kb_name: str = typer.Option(None, "--kb-name", "-k"), category: str = typer.Option("general", "--category", "-c")):
+def ingest(folder: str, kb_name: str = typer.Option(None, "--kb-name", "-k"), category: str = typer.Option("general", "--category", "-c"),
+           workers: int = typer.Option(None, "--workers", "-w", help="Extraction worker processes (default: CPU count)"),
+           batch_size: int = typer.Option(None, "--batch-size", "-b", help="Rows per knowledge base insert"),
+           chunk_size: int = typer.Option(None, "--chunk-size", help="Passage size in chunk units; 0 inserts whole files"),
+           chunk_overlap: int = typer.Option(None, "--chunk-overlap", help="Units shared between neighbouring passages"),
+           chunk_unit: str = typer.Option(None, "--chunk-unit", help="Measure passages in 'chars' or 'tokens'"),
+           prune: bool = typer.Option(False, "--prune", help="Delete rows of files that no longer exist in the folder"),
+           force: bool = typer.Option(False, "--force", help="Re-ingest files even if they are unchanged"),
+           max_pages: int = typer.Option(None, "--max-pages", help="Read at most this many pages per PDF"),
+           time_budget: float = typer.Option(None, "--time-budget", help="Seconds allowed for extracting one PDF"),
+           no_dedup: bool = typer.Option(False, "--no-dedup", help="Insert passages even if they duplicate existing ones"),
+           no_normalize: bool = typer.Option(False, "--no-normalize", help="Embed text as extracted, without whitespace, hyphenation and header/footer cleanup")):
     show_banner()
+    folder = str(resolve_path(folder))
     if not validate_folder(folder):
         raise typer.Exit(1)
 
-    kb_name = kb_name or config.get('kb_name', 'texttrove_kb')
-    embedding_model = config.get('embedding_model', 'nomic-embed-text')
-    embedding_provider = config.get('embedding_provider', 'ollama')
-
-    loading_spinner("Initializing Knowledge Base", 1.5)
+    from texttrove.manifest import Manifest
 
+    kb_name = kb_name or config.get('kb_name', 'texttrove_kb')
     try:
-        try:
-            kb = server.knowledge_bases.get(kb_name)
-            console.print(f"[blue]Using existing Knowledge Base: {kb_name}[/blue]")
-        except:
-            embedding_model_config = {
-                "model_name": embedding_model,
-                "provider": embedding_provider
-            }
-            kb = server.knowledge_bases.create(
-                name=kb_name,
-                embedding_model=embedding_model_config
-            )
-            console.print(f"[green]Created new Knowledge Base: {kb_name}[/green]")
+        settings = ingest_settings(workers, batch_size, chunk_size, chunk_overlap, chunk_unit, max_pages, time_budget,
+                                   dedup=False if no_dedup else None, normalize=False if no_normalize else None)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
 
-        folder_path = Path(folder)
-        files_processed = 0
-        files_failed = 0
+    try:
+        kb = open_ingest_kb(kb_name)
 
-        supported_files = [f for f in folder_path.iterdir() if f.suffix.lower() in ['.txt', '.pdf', '.md', '.rst']]
+        supported_files = supported_files_in(folder)
         if not supported_files:
             console.print("[yellow]No supported files found![/yellow]")
             raise typer.Exit(1)
 
-        console.print(f"[cyan]Processing {len(supported_files)} files...[/cyan]")
+        manifest = Manifest(manifest_path())
+        with tracer.stage('manifest', files=len(supported_files)):
+            plan = manifest.plan(kb_name, supported_files, folder, force=force)
+        console.print(f"[cyan]{len(plan.new)} new, {len(plan.modified)} modified, {len(plan.unchanged)} unchanged file(s)[/cyan]")
 
-        for file_path in supported_files:
-            try:
-                content = extract_text_from_file(file_path)
-                if content and content.strip():
-                    kb.insert([{
-                        'content': content,
-                        'metadata': {
-                            'category': category,
-                            'date_added': str(datetime.date.today()),
-                            'source': file_path.name,
-                            'file_type': file_path.suffix.lower()
-                        }
-                    }])
-                    files_processed += 1
-                    console.print(f"[green]✓ Processed: {file_path.name}[/green]")
-                else:
-                    files_failed += 1
-                    console.print(f"[yellow]⚠ Skipped (empty): {file_path.name}[/yellow]")
-            except Exception as e:
-                files_failed += 1
-                console.print(f"[red]✗ Failed: {file_path.name} - {str(e)}[/red]")
+        stats = apply_ingest_plan(kb, kb_name, plan, manifest, category, settings, prune)
+        manifest.close()
+
+        from rich.table import Table
 
         summary_table = Table(title="Ingestion Summary")
         summary_table.add_column("Metric", style="cyan")
         summary_table.add_column("Count", style="green")
-        summary_table.add_row("Files Processed", str(files_processed))
-        summary_table.add_row("Files Failed", str(files_failed))
+        summary_table.add_row("Files Processed", str(stats['processed']))
+        summary_table.add_row("Files Failed", str(stats['failed']))
+        summary_table.add_row("Files Skipped (unchanged)", str(len(plan.unchanged)))
+        summary_table.add_row("Files Updated", str(stats['updated']))
+        summary_table.add_row("Files Removed", str(stats['removed']))
+        summary_table.add_row("Passages Skipped (duplicates)",
+                              f"{stats['duplicates'] + stats['near_duplicates']} "
+                              f"({stats['duplicates']} exact, {stats['near_duplicates']} near)")
+        if settings['normalize']:
+            summary_table.add_row("Bytes Removed (normalization)", f"{stats['normalized_bytes']:,} bytes")
         summary_table.add_row("Knowledge Base", kb_name)
         summary_table.add_row("Category", category)
+        peak, workers_peak = peak_rss_bytes(), peak_rss_bytes(children=True)
+        if peak:
+            summary_table.add_row("Peak Memory (RSS)", f"{peak / 2**20:.1f} MB" +
+                                  (f" (largest worker {workers_peak / 2**20:.1f} MB)" if workers_peak else ""))
 
         console.print(summary_table)
 
@@ -149,14 +551,107 @@ def ingest(folder: str, kb_name: str = typer.Option(None, "--kb-name", "-k"), ca
         raise typer.Exit(1)
 
 @app.command()
-def query(search: str, kb_name: str = typer.Option(None, "--kb-name", "-k"), limit: int = typer.Option(5, "--limit", "-l")):
+def watch(folder: str, kb_name: str = typer.Option(None, "--kb-name", "-k"), category: str = typer.Option("general", "--category", "-c"),
+          debounce: float = typer.Option(2.0, "--debounce", help="Quiet seconds before a burst of changes is ingested"),
+          max_delay: float = typer.Option(30.0, "--max-delay", help="Longest a change waits during a continuous burst"),
+          interval: float = typer.Option(1.0, "--interval", help="Seconds between scans when polling"),
+          poll: bool = typer.Option(False, "--poll", help="Poll even if native file events (watchdog) are available"),
+          workers: int = typer.Option(None, "--workers", "-w", help="Extraction worker processes (default: CPU count)"),
+          batch_size: int = typer.Option(None, "--batch-size", "-b", help="Rows per knowledge base insert")):
+    """Keep a knowledge base in sync with a folder: created, modified and deleted files are ingested within seconds"""
     show_banner()
+    folder = str(resolve_path(folder))
+    if not validate_folder(folder):
+        raise typer.Exit(1)
+
+    from texttrove.manifest import Manifest
+    from texttrove.watcher import debounced, open_watcher
+
+    kb_name = kb_name or config.get('kb_name', 'texttrove_kb')
+    watcher = None
+    try:
+        settings = ingest_settings(workers, batch_size)
+        kb = open_ingest_kb(kb_name)
+        manifest = Manifest(manifest_path())
+        # Watch before catching up, so files changed during a long catch-up are queued rather than
+        # missed; those the catch-up already ingested come back unchanged from plan_paths
+        watcher = open_watcher(folder, SUPPORTED_EXTENSIONS, interval=interval, polling=poll)
+        # Catch up on changes made while nobody was watching
+        plan = manifest.plan(kb_name, supported_files_in(folder), folder)
+        console.print(f"[cyan]{len(plan.new)} new, {len(plan.modified)} modified, {len(plan.removed)} removed since last ingest[/cyan]")
+        apply_ingest_plan(kb, kb_name, plan, manifest, category, settings, prune=True)
+    except Exception as e:
+        if watcher is not None:
+            watcher.close()
+        console.print(f"[red]Error starting watch: {e}[/red]")
+        raise typer.Exit(1)
+
+    how = "file system events" if watcher.native else f"polling every {interval}s"
+    console.print(f"[green]✓ Watching {folder} ({how}). Press Ctrl+C to stop.[/green]")
+    retry = set()
+    try:
+        for paths in debounced(watcher, debounce=debounce, max_delay=max_delay):
+            paths = sorted(retry.union(paths))
+            retry.clear()
+            try:
+                with tracer.stage('watch_batch', files=len(paths)):
+                    plan = manifest.plan_paths(kb_name, paths)
+                    if not (plan.new or plan.modified or plan.removed):
+                        continue
+                    stats = apply_ingest_plan(kb, kb_name, plan, manifest, category, settings, prune=True)
+                console.print(f"[cyan]{datetime.datetime.now():%H:%M:%S} {stats['processed']} ingested, "
+                              f"{stats['removed']} removed, {stats['failed']} failed, "
+                              f"{stats['duplicates'] + stats['near_duplicates']} duplicate passages skipped[/cyan]")
+            except Exception as e:
+                # Unrecorded files are picked up again with the next batch
+                retry.update(paths)
+                console.print(f"[red]Error ingesting changes: {e}[/red]")
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopped watching.[/yellow]")
+    finally:
+        watcher.close()
+        manifest.close()
+
+@app.command()
+def query(search: str = typer.Argument(None), kb_name: str = typer.Option(None, "--kb-name", "-k"), limit: int = typer.Option(5, "--limit", "-l"),
+          no_cache: bool = typer.Option(False, "--no-cache", help="Always search the knowledge base"),
+          batch: str = typer.Option(None, "--batch", help="JSONL file of {search, kb_name, limit} requests ('-' for stdin)"),
+          concurrency: int = typer.Option(8, "--concurrency", help="Batch searches running at once"),
+          timeout: float = typer.Option(None, "--timeout", help="Per-request timeout in seconds for --batch"),
+          output: str = typer.Option(None, "--output", "-o", help="Write batch results to this JSONL file instead of stdout"),
+          ordered: bool = typer.Option(False, "--ordered", help="Write batch results in input order"),
+          mode: str = typer.Option("semantic", "--mode", "-m", help="semantic (knowledge base), lexical (BM25) or hybrid (both, fused)"),
+          kb_timeout: float = typer.Option(None, "--kb-timeout", help="Seconds each knowledge base may take when --kb-name names several (default: kb_timeout)")):
+    """Search a knowledge base; --kb-name also takes a comma separated list or a glob such as 'dept_*'"""
     kb_name = kb_name or config.get('kb_name', 'texttrove_kb')
-    loading_spinner("Searching Knowledge Base", 1.0)
+    kb_timeout = kb_timeout if kb_timeout is not None else config.get('kb_timeout')
+    if mode not in SEARCH_MODES:
+        console.print(f"[red]Error: --mode must be one of {', '.join(SEARCH_MODES)}[/red]")
+        raise typer.Exit(1)
+    if batch:
+        run_query_batch(batch, kb_name, limit, not no_cache, concurrency, timeout, output, ordered, mode, kb_timeout)
+        return
+    if not search:
+        console.print("[red]Error: provide a search string or --batch FILE[/red]")
+        raise typer.Exit(1)
+    show_banner()
+    from rich.panel import Panel
+    from texttrove.fanout import is_multi_kb
 
     try:
-        kb = server.knowledge_bases.get(kb_name)
-        results = kb.search(query=search, limit=limit)
+        with loading_spinner("Searching Knowledge Base"):
+            if is_multi_kb(kb_name):
+                fanned = retrieve_many(kb_name, search, limit, mode, open_cache(not no_cache), kb_timeout)
+                results = fanned.results
+            else:
+                fanned = None
+                results = retrieve(kb_name, search, limit, mode, open_cache(not no_cache))
+        if fanned is not None:
+            for failed_kb, error in fanned.errors.items():
+                console.print(f"[yellow]Warning: knowledge base '{failed_kb}' skipped: {error}[/yellow]")
+            if fanned.failed:
+                console.print(f"[red]Error during search: none of {', '.join(fanned.kb_names)} answered[/red]")
+                raise typer.Exit(1)
         if not results:
             console.print("[yellow]No results found.[/yellow]")
             return
@@ -166,8 +661,13 @@ def query(search: str, kb_name: str = typer.Option(None, "--kb-name", "-k"), lim
             content = result.get('content', '')[:300] + "..." if len(result.get('content', '')) > 300 else result.get('content', '')
             metadata = result.get('metadata', {})
             source = metadata.get('source', 'Unknown')
-            console.print(Panel(f"[bold cyan]Source:[/bold cyan] {source}\n\n{content}", title=f"Result {i}", style="blue"))
+            if metadata.get('chunk_index') is not None:
+                source += f" (passage {metadata['chunk_index'] + 1}, chars {metadata.get('start_offset')}-{metadata.get('end_offset')})"
+            title = f"Result {i} · {result['kb_name']}" if fanned is not None else f"Result {i}"
+            console.print(Panel(f"[bold cyan]Source:[/bold cyan] {source}\n\n{content}", title=title, style="blue"))
 
+    except typer.Exit:
+        raise
     except AttributeError as e:
         console.print(f"[red]Error: KnowledgeBase does not support this operation. Ensure MindsDB SDK is up-to-date and the knowledge base exists: {e}[/red]")
         raise typer.Exit(1)
@@ -175,28 +675,112 @@ def query(search: str, kb_name: str = typer.Option(None, "--kb-name", "-k"), lim
         console.print(f"[red]Error during search: {e}[/red]")
         raise typer.Exit(1)
 
+def run_query_batch(batch: str, kb_name: str, limit: int, use_cache: bool, concurrency: int,
+                    timeout: float, output: str, ordered: bool, mode: str = 'semantic', kb_timeout: float = None):
+    import json
+    import time
+    from rich.console import Console
+    from texttrove.batch import latency_summary, read_requests, run_batch
+    from texttrove.fanout import is_multi_kb
+
+    cache = open_cache(use_cache)
+    # Keep stdout pure JSONL: the summary goes to stderr, or to the console when
+    # results go to a file. A daemon client only has the one stream, so it gets
+    # the summary only with --output.
+    local = console.get().file is sys.stdout
+    status = console if output else (Console(stderr=True) if local else None)
+
+    def search(request_kb: str, text: str, request_limit: int):
+        if not is_multi_kb(request_kb):
+            return retrieve(request_kb, text, request_limit, mode, cache)
+        # Rows carry their kb_name; the request fails only if no KB answered
+        fanned = retrieve_many(request_kb, text, request_limit, mode, cache, kb_timeout)
+        if fanned.failed:
+            raise RuntimeError('; '.join(f"{kb}: {error}" for kb, error in fanned.errors.items()))
+        return fanned.results
+
+    source = sys.stdin if batch == '-' else open(resolve_path(batch), 'r', encoding='utf-8')
+    sink = open(resolve_path(output), 'w', encoding='utf-8') if output else console.file
+    counts = {'ok': 0, 'error': 0, 'timeout': 0}
+    latencies = []
+    started = time.perf_counter()
+    try:
+        with tracer.stage('batch', concurrency=concurrency) as stage:
+            for record in run_batch(read_requests(source, kb_name, limit), search,
+                                    concurrency=concurrency, timeout=timeout, ordered=ordered):
+                counts[record['status']] += 1
+                latencies.append(record['latency_ms'])
+                sink.write(json.dumps(record, default=str) + '\n')
+            stage.update(counts)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output:
+            sink.close()
+        else:
+            sink.flush()
+
+    elapsed = time.perf_counter() - started
+    summary = latency_summary(latencies)
+    total = sum(counts.values())
+    if status is None:
+        raise typer.Exit(1 if counts['error'] or counts['timeout'] else 0)
+    status.print(f"[green]Batch finished: {total} requests in {elapsed:.2f}s "
+                 f"({total / elapsed if elapsed else 0:.1f}/s) - {counts['ok']} ok, "
+                 f"{counts['error']} errors, {counts['timeout']} timeouts[/green]")
+    status.print(f"[cyan]Latency ms: p50 {summary['p50']:.1f}, p95 {summary['p95']:.1f}, "
+                 f"p99 {summary['p99']:.1f}, max {summary['max']:.1f}[/cyan]")
+    if counts['error'] or counts['timeout']:
+        raise typer.Exit(1)
+
 @app.command()
-def summarize(search: str, kb_name: str = typer.Option(None, "--kb-name", "-k")):
+def summarize(search: str, kb_name: str = typer.Option(None, "--kb-name", "-k"),
+              limit: int = typer.Option(None, "--limit", "-l", help="Number of results to summarize (default: summary_results)"),
+              no_cache: bool = typer.Option(False, "--no-cache", help="Always search the knowledge base and the LLM")):
     show_banner()
     kb_name = kb_name or config.get('kb_name', 'texttrove_kb')
-    loading_spinner("Generating summary", 2.0)
+    limit = limit or config.get('summary_results', 5)
+    from rich.live import Live
+    from rich.panel import Panel
+    from rich.text import Text
+    from texttrove.async_utils import run_async_safely
+    from texttrove.cache import cached_search
+
+    provider = config.get('ai_provider')
+    llm = get_async_llm(provider)
+    summarizer = get_summarizer(provider, llm.executor, use_cache=not no_cache)
+
+    async def search_and_warm():
+        # The LLM client (imports, TLS setup) is built while the search runs;
+        # a failed warm-up surfaces later from the summarize call itself
+        found, _ = await llm.executor.gather(
+            llm.executor.call(cached_search, open_cache(not no_cache), kb_name, search, limit,
+                              lambda: search_kb(kb_name, search, limit)),
+            llm.warm(),
+            return_exceptions=True,
+        )
+        if isinstance(found, BaseException):
+            raise found
+        return found
 
     try:
-        kb = server.knowledge_bases.get(kb_name)
-        results = kb.search(query=search, limit=3)
+        with loading_spinner("Searching Knowledge Base"):
+            results = run_async_safely(search_and_warm())
         if not results:
             console.print("[yellow]No results to summarize.[/yellow]")
             return
 
-        combined_text = '\n\n'.join([r['content'][:500] for r in results])
-        provider = config.get('ai_provider')
-
-        if provider == 'groq':
-            summary = summarize_with_groq(combined_text)
-        else:
-            summary = summarize_with_ollama(combined_text)
-
-        console.print(Panel(f"[cyan]Query:[/cyan] {search}\n\n[green]Summary:[/green]\n{summary}", title="📝 AI Summary", style="cyan"))
+        with tracer.stage('llm', provider=provider) as stage:
+            fragments = summarizer.summarize_stream([r['content'] for r in results], focus=search)
+            with loading_spinner("Generating summary"):
+                first = next(fragments, '')
+            # Tokens are appended to the panel body as they arrive; Live redraws it
+            body = Text.assemble(("Query: ", "cyan"), search, "\n\n", ("Summary:", "green"), "\n", first)
+            with Live(Panel(body, title="📝 AI Summary", style="cyan"), console=console.get(), auto_refresh=False) as live:
+                for fragment in fragments:
+                    body.append(fragment)
+                    live.refresh()
+            stage.update(results=len(results), **summarizer.stats)
 
     except AttributeError as e:
         console.print(f"[red]Error: KnowledgeBase does not support this operation. Ensure MindsDB SDK is up-to-date and the knowledge base exists: {e}[/red]")
@@ -205,30 +789,153 @@ def summarize(search: str, kb_name: str = typer.Option(None, "--kb-name", "-k"))
         console.print(f"[red]Error during summarization: {e}[/red]")
         raise typer.Exit(1)
 
-def summarize_with_groq(text: str) -> str:
+@app.command()
+def serve(socket_path: str = typer.Option(None, "--socket", help="Unix socket to listen on (default: $TEXTTROVE_SOCKET or a per-user temp file)")):
+    """Keep connections and caches warm and serve query, summarize and ingest to thin clients"""
+    global daemon_mode
+    from texttrove.client import default_socket_path
+    from texttrove.daemon import open_server, serve_forever
+
+    socket_path = socket_path or default_socket_path()
+    get_backend().warm()
     try:
-        from groq import Groq
-        client = Groq(api_key=config.get('groq_api_key'))
-        if not config.get('groq_api_key'):
-            return "Error: Groq API key not configured in config.yaml"
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[{"role": "user", "content": f"Summarize this:\n\n{text}"}]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error with Groq: {e}"
+        server = open_server(socket_path)
+    except OSError as e:
+        console.print(f"[red]Cannot listen on {socket_path}: {e}[/red]")
+        raise typer.Exit(1)
+    daemon_mode = True
+    console.print(f"[green]✓ TextTrove daemon listening on {socket_path}[/green]")
+    console.print(f"[cyan]Clients use it when TEXTTROVE_SOCKET={socket_path} (or the default path) is set.[/cyan]")
+    try:
+        serve_forever(server)
+    except KeyboardInterrupt:
+        console.print("[yellow]Daemon stopped.[/yellow]")
 
-def summarize_with_ollama(text: str) -> str:
+@app.command()
+def loadtest(url: str = typer.Option(None, "--url", help="TextSpark server to load (default: TextSpark in-process against the fake MindsDB stand-in)"),
+             concurrency: int = typer.Option(8, "--concurrency", help="Users (closed loop) or most requests in flight (open loop)"),
+             duration: float = typer.Option(30, "--duration", "-d", help="Seconds to send requests for"),
+             mix: str = typer.Option(None, "--mix", help="Route weights, e.g. search=80,status=15,upload=5"),
+             mode: str = typer.Option("closed", "--mode", "-m", help="closed (users send back to back) or open (fixed arrival rate)"),
+             rate: float = typer.Option(None, "--rate", "-r", help="Open loop: requests per second (Poisson arrivals)"),
+             fake_url: str = typer.Option(None, "--fake-url", help="Stand-in server URL with latencies, e.g. fake://kb?search_ms=20&insert_ms=30"),
+             settings: list[str] = typer.Option(None, "--set", help="TextSpark config override for the in-process run, e.g. --set pool_size=8"),
+             upload_kb: float = typer.Option(8, "--upload-kb", help="Size of uploaded documents"),
+             seed: int = typer.Option(0, "--seed"),
+             output: str = typer.Option(None, "--output", "-o", help="Write the report as JSON to this file ('-' for stdout)")):
+    """Drive TextSpark's search, upload and status routes and report throughput, errors and latency percentiles"""
+    import json
+    import yaml
+    from contextlib import nullcontext
+    from rich.table import Table
+    from texttrove.loadtest import (DEFAULT_FAKE_URL, DEFAULT_MIX, PERCENTILES, HttpTarget, LoadTest, Workload,
+                                    local_textspark, parse_mix)
+
+    try:
+        weights = parse_mix(mix or DEFAULT_MIX)
+        if mode not in ('closed', 'open'):
+            raise ValueError("--mode must be 'closed' or 'open'")
+        if mode == 'open' and not (rate and rate > 0):
+            raise ValueError("--mode open needs --rate")
+        if concurrency < 1 or duration <= 0:
+            raise ValueError("--concurrency and --duration must be positive")
+        overrides = {}
+        for setting in settings or []:
+            key, sep, value = setting.partition('=')
+            if not sep or not key.strip():
+                raise ValueError(f"--set expects KEY=VALUE, got '{setting}'")
+            overrides[key.strip()] = yaml.safe_load(value)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+    target_name = url or f"in-process TextSpark on {fake_url or DEFAULT_FAKE_URL}"
+    target = nullcontext(HttpTarget(url)) if url else \
+        local_textspark(config, fake_url or DEFAULT_FAKE_URL, overrides, seed=seed)
     try:
-        import ollama
-        client = ollama.Client(host=config.get('ollama_url'))
-        model = config.get('ollama_model', 'llama3')
-        prompt = f"Summarize this:\n\n{text}"
-        response = client.generate(model=model, prompt=prompt)
-        return response['response']
+        with target as client:
+            test = LoadTest(client, weights, Workload(seed, upload_kb=upload_kb), seed=seed)
+            load = f"{concurrency} users" if mode == 'closed' else f"{rate:g} req/s, up to {concurrency} in flight"
+            with loading_spinner(f"Loading {target_name} ({load}) for {duration:g}s..."):
+                if mode == 'closed':
+                    result = test.closed_loop(concurrency, duration)
+                else:
+                    result = test.open_loop(rate, duration, concurrency)
     except Exception as e:
-        return f"Error with Ollama: {e}"
+        console.print(f"[red]Load test failed: {e}[/red]")
+        raise typer.Exit(1)
+
+    report = {'target': target_name, 'mode': mode, 'concurrency': concurrency, 'rate': rate,
+              'duration_s': duration, 'mix': weights, 'settings': overrides, **result.report()}
+    if output:
+        text = json.dumps(report, indent=2)
+        if output == '-':
+            console.file.write(text + '\n')
+            return
+        Path(resolve_path(output)).write_text(text + '\n')
+
+    table = Table(title=f"Load Test ({mode} loop, {report['elapsed_s']:.1f}s)")
+    table.add_column("Route", style="cyan")
+    for column in ("Requests", "Req/s", "Errors", *(f"p{p:g} ms" for p in PERCENTILES), "Max ms"):
+        table.add_column(column, style="green", justify="right")
+    rows = [(route, stats) for route, stats in report['routes'].items()]
+    rows.append(("all", report))
+    for route, stats in rows:
+        latency = stats['latency_ms']
+        table.add_row(route, str(stats['requests']), f"{stats['throughput_per_s']:.1f}",
+                      f"{stats['errors']} ({stats['error_rate']:.1%})",
+                      *(f"{latency[f'p{p:g}']:.1f}" for p in PERCENTILES), f"{latency['max']:.1f}")
+    console.print(table)
+    failures = {}
+    for stats in report['routes'].values():
+        for status, count in stats['statuses'].items():
+            if not status.startswith(('2', '3')):
+                failures[status] = failures.get(status, 0) + count
+    if failures:
+        console.print(f"[yellow]Failed responses: {', '.join(f'{s} x{n}' for s, n in failures.items())}[/yellow]")
+    if output:
+        console.print(f"[green]✓ Report written to {output}[/green]")
+
+def get_llm(provider: str):
+    """Provider (Groq or Ollama) with a client built once per process and reused"""
+    from texttrove.llm import LLMProvider
+
+    name = 'groq' if provider == 'groq' else 'ollama'
+    if name not in llm_clients:
+        llm_clients[name] = LLMProvider(name, config)
+    return llm_clients[name]
+
+def get_async_llm(provider: str):
+    """Async facade over the configured summarization provider; its thread pool is shared by the process"""
+    global summary_executor
+    from texttrove.async_utils import AsyncExecutor, AsyncLLM
+
+    if summary_executor is None:
+        summary_executor = AsyncExecutor(max_concurrency=config.get('summary_concurrency', 4))
+    return AsyncLLM(get_llm(provider).client, summary_executor)
+
+def open_summary_cache(enabled: bool = True):
+    """Open the LLM answer cache once per process; None when disabled"""
+    global summary_cache
+    if not enabled or not config.get('summary_cache', True):
+        return None
+    if summary_cache is None:
+        from texttrove.summarizer import SUMMARY_CACHE_FILE, SummaryCache
+        summary_cache = SummaryCache(config.get('summary_cache_path') or Path("config.yaml").parent / SUMMARY_CACHE_FILE)
+    return summary_cache
+
+def get_summarizer(provider: str, executor=None, use_cache: bool = True):
+    """Map-reduce summarizer over the configured provider, sharing the provider client"""
+    from texttrove.summarizer import Summarizer
+
+    llm = get_llm(provider)
+    return Summarizer(llm.complete, llm.model_id, cache=open_summary_cache(use_cache), executor=executor,
+                      stream=llm.stream, chunk_chars=config.get('summary_chunk_chars', 4000),
+                      reduce_chars=config.get('summary_reduce_chars', 8000))
 
 if __name__ == "__main__":
+    from texttrove.client import forward
+    code = forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
     app()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Thin client that forwards CLI invocations to a running TextTrove daemon
+
+Kept free of third-party imports so that a forwarded command costs little
+more than starting the interpreter.
+"""
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+from typing import List, Optional
+
+FORWARDED_COMMANDS = ('query', 'summarize', 'ingest')
+GLOBAL_VALUE_OPTIONS = ('--profile-json', '--metrics')
+
+
+def default_socket_path() -> str:
+    """
+    Return the daemon socket path: $TEXTTROVE_SOCKET or a per-user temp file.
+
+    Returns:
+        str: Path of the Unix socket
+    """
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.environ.get('TEXTTROVE_SOCKET') or os.path.join(tempfile.gettempdir(), f"texttrove-{uid}.sock")
+
+
+def command_name(argv: List[str]) -> Optional[str]:
+    """Return the subcommand in argv, skipping global options."""
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in GLOBAL_VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
+
+def forward(argv: List[str], socket_path: Optional[str] = None) -> Optional[int]:
+    """
+    Run a CLI invocation inside the daemon, streaming its output to stdout.
+
+    Args:
+        argv (List[str]): Command-line arguments, without the program name
+        socket_path (Optional[str]): Daemon socket; defaults to default_socket_path()
+
+    Returns:
+        Optional[int]: The command's exit code, or None if the command cannot
+        be forwarded (no daemon running, help requested, other command)
+    """
+    if command_name(argv) not in FORWARDED_COMMANDS or '--help' in argv:
+        return None
+    path = socket_path or default_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+
+    request = {
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'color': sys.stdout.isatty(),
+        'width': shutil.get_terminal_size().columns,
+    }
+    with sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        stream.flush()
+        received = False
+        for line in stream:
+            received = True
+            message = json.loads(line)
+            if 'out' in message:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+            elif 'exit_code' in message:
+                return message['exit_code']
+    # The daemon went away: run in-process unless it had already started
+    return 1 if received else None
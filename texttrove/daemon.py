@@ -0,0 +1,141 @@
+"""
+Resident TextTrove daemon serving CLI invocations over a Unix socket
+
+The daemon keeps the MindsDB connection, knowledge base handles, the
+result cache and LLM clients alive between commands. Each request carries
+the client's argv and working directory; the command runs through the
+normal Typer app with its console output streamed back to the client.
+"""
+import json
+import os
+import socketserver
+import stat
+from typing import List
+
+from texttrove.profiling import Tracer, tracer
+from texttrove.utils import console, working_dir
+
+
+class SocketWriter:
+    """File-like object that sends each write to the client as a JSON message"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> int:
+        if text:
+            self.wfile.write(json.dumps({'out': text}).encode('utf-8') + b'\n')
+        return len(text)
+
+    def flush(self):
+        self.wfile.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+def run_command(argv: List[str], cwd: str, stream, color: bool = False, width: int = 80) -> int:
+    """
+    Run one CLI invocation with its output sent to ``stream``.
+
+    Args:
+        argv (List[str]): Command-line arguments, without the program name
+        cwd (str): Working directory of the client
+        stream: File-like object receiving the rendered output
+        color (bool): Render ANSI colors
+        width (int): Console width of the client terminal
+
+    Returns:
+        int: Exit code
+    """
+    import typer
+    from rich.console import Console
+    from texttrove import cli
+
+    out = Console(file=stream, force_terminal=color, no_color=not color, width=width)
+    with console.redirect(out), tracer.use(Tracer()), working_dir(cwd):
+        try:
+            # Without standalone mode click returns a typer.Exit code instead of raising it
+            code = cli.app(args=argv, prog_name="texttrove", standalone_mode=False)
+            return 0 if code is None else code
+        except typer.Exit as e:
+            return e.exit_code
+        except typer.Abort:
+            return 1
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            if hasattr(e, 'show'):
+                # Usage errors render themselves, as they would in-process
+                e.show(file=stream)
+                return getattr(e, 'exit_code', 2)
+            out.print(f"[red]Daemon error: {e}[/red]")
+            return 1
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        request = json.loads(line)
+        writer = SocketWriter(self.wfile)
+        code = run_command(request.get('argv', []), request.get('cwd') or os.getcwd(), writer,
+                           color=request.get('color', False), width=request.get('width', 80))
+        self.wfile.write(json.dumps({'exit_code': code}).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def open_server(socket_path: str) -> DaemonServer:
+    """
+    Bind the daemon socket, readable and writable by the current user only.
+
+    A socket left behind by an earlier daemon is replaced; any other file at
+    ``socket_path`` is left alone.
+
+    Args:
+        socket_path (str): Path of the socket to create
+
+    Returns:
+        DaemonServer: Server bound to the socket
+
+    Raises:
+        FileExistsError: If something other than a socket exists at the path
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(f"{socket_path} exists and is not a socket")
+        os.remove(socket_path)
+    # The umask applies at bind time, so the socket is never accessible to others
+    previous = os.umask(0o177)
+    try:
+        return DaemonServer(socket_path, DaemonHandler)
+    finally:
+        os.umask(previous)
+
+
+def serve_forever(server: DaemonServer):
+    """
+    Serve CLI invocations until interrupted, then remove the socket.
+
+    Args:
+        server (DaemonServer): Server from open_server
+    """
+    socket_path = server.server_address
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            if stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+                os.remove(socket_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,267 @@
+"""
+Passage deduplication before embedding
+
+Every passage ingested into a knowledge base is registered by the hash of
+its normalized text (exact duplicates) and by a MinHash signature whose
+bands are bucketed for locality-sensitive hashing (near duplicates, e.g.
+the same report with a changed date line). A passage matching one already
+kept is skipped, so it is neither embedded nor stored twice.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+DEDUP_FILE = "texttrove_dedup.db"
+
+_WORD = re.compile(r"\w+")
+# MinHash permutations are h -> (a * h + b) mod p over 31-bit shingle hashes;
+# products stay below 2**62 so uint64 arithmetic never overflows
+_PRIME = (1 << 31) - 1
+
+
+def normalize(text: str) -> str:
+    """Case-fold and collapse whitespace, so re-wrapped or re-cased copies hash alike."""
+    return ' '.join(text.casefold().split())
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the normalized text."""
+    return hashlib.sha256(normalize(text).encode('utf-8')).hexdigest()
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick (bands, rows per band) for a similarity threshold.
+
+    Two passages share a bucket in some band with probability
+    1 - (1 - s**rows)**bands for Jaccard similarity s; the curve is steepest
+    near (1 / bands) ** (1 / rows). The longest bands keeping that point
+    at or below the threshold are chosen: candidates above the threshold
+    are rarely missed, and false candidates are removed by comparing
+    signatures.
+
+    Args:
+        num_perm (int): Signature length
+        threshold (float): Jaccard similarity considered a near duplicate
+
+    Returns:
+        Tuple[int, int]: bands, rows per band
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold:
+            best = (num_perm // rows, rows)
+    return best
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles.
+
+    Args:
+        num_perm (int): Signature length
+        shingle (int): Words per shingle
+        seed (int): Seed for the permutations; signatures are only comparable
+            under the same seed
+    """
+
+    def __init__(self, num_perm: int = 128, shingle: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        words = _WORD.findall(text.casefold())
+        if len(words) < self.shingle:
+            return []
+        return [' '.join(words[i:i + self.shingle]) for i in range(len(words) - self.shingle + 1)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the signature of a text.
+
+        Args:
+            text (str): Passage text
+
+        Returns:
+            Optional[np.ndarray]: uint32 signature, or None when the text is
+                shorter than one shingle (only exact matching applies)
+        """
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) & _PRIME for s in set(shingles)), dtype=np.uint64)
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+class DedupIndex:
+    """
+    Persistent registry of kept passages per knowledge base.
+
+    Args:
+        path (Union[str, Path]): Database file
+        threshold (float): Estimated Jaccard similarity at or above which a
+            passage is a near duplicate; 1.0 or more keeps exact matching only
+        num_perm (int): MinHash signature length
+        shingle (int): Words per shingle
+    """
+
+    def __init__(self, path: Union[str, Path] = DEDUP_FILE, threshold: float = 0.85,
+                 num_perm: int = 128, shingle: int = 3):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.near = threshold < 1.0
+        self.hasher = MinHasher(num_perm, shingle)
+        self.bands, self.rows = lsh_bands(num_perm, min(threshold, 1.0))
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS passages ("
+            " kb_name TEXT NOT NULL,"
+            " id TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " signature BLOB,"
+            " PRIMARY KEY (kb_name, id));"
+            "CREATE INDEX IF NOT EXISTS passages_hash ON passages (kb_name, hash);"
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " kb_name TEXT NOT NULL,"
+            " bucket INTEGER NOT NULL,"
+            " id TEXT NOT NULL,"
+            " PRIMARY KEY (bucket, kb_name, id)) WITHOUT ROWID;"
+            # Lookups go by bucket; an index led by kb_name would tempt the planner into scanning the KB
+            "CREATE INDEX IF NOT EXISTS buckets_id ON buckets (id, kb_name);"
+            "CREATE TABLE IF NOT EXISTS skipped ("
+            " kb_name TEXT NOT NULL,"
+            " id TEXT NOT NULL,"
+            " duplicate_of TEXT NOT NULL,"
+            " PRIMARY KEY (kb_name, id));"
+            "CREATE INDEX IF NOT EXISTS skipped_of ON skipped (kb_name, duplicate_of);"
+        )
+        self.conn.commit()
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8, person=band.to_bytes(2, 'little') * 8).digest()
+            buckets.append(int.from_bytes(digest, 'little', signed=True))
+        return buckets
+
+    def _near_match(self, kb_name: str, row_id: str, signature: np.ndarray, buckets: List[int]) -> Optional[str]:
+        candidates = [c for (c,) in self.conn.execute(
+            f"SELECT DISTINCT id FROM buckets WHERE bucket IN ({', '.join('?' * len(buckets))}) AND kb_name = ?",
+            [*buckets, kb_name]) if c != row_id]
+        best, best_similarity = None, self.threshold
+        for offset in range(0, len(candidates), 500):
+            chunk = candidates[offset:offset + 500]
+            for candidate, blob in self.conn.execute(
+                    f"SELECT id, signature FROM passages WHERE kb_name = ? AND id IN ({', '.join('?' * len(chunk))})",
+                    [kb_name, *chunk]):
+                similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+        return best
+
+    def _check(self, kb_name: str, row: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        row_id = str(row['id'])
+        digest = content_hash(row['content'])
+        match = self.conn.execute("SELECT id FROM passages WHERE kb_name = ? AND hash = ? AND id != ? LIMIT 1",
+                                  (kb_name, digest, row_id)).fetchone()
+        if match:
+            return match[0], 'exact'
+        signature = self.hasher.signature(row['content']) if self.near else None
+        buckets = self._buckets(signature) if signature is not None else []
+        if buckets:
+            near = self._near_match(kb_name, row_id, signature, buckets)
+            if near:
+                return near, 'near'
+        # Keep the passage and register it, replacing what was known under its id
+        known = self.conn.execute("SELECT hash FROM passages WHERE kb_name = ? AND id = ?", (kb_name, row_id)).fetchone()
+        if known and known[0] == digest:
+            return None, None
+        self.conn.execute("DELETE FROM passages WHERE kb_name = ? AND id = ?", (kb_name, row_id))
+        self.conn.execute("DELETE FROM buckets WHERE kb_name = ? AND id = ?", (kb_name, row_id))
+        self.conn.execute("DELETE FROM skipped WHERE kb_name = ? AND id = ?", (kb_name, row_id))
+        self.conn.execute("INSERT INTO passages (kb_name, id, hash, signature) VALUES (?, ?, ?, ?)",
+                          (kb_name, row_id, digest, None if signature is None else signature.tobytes()))
+        self.conn.executemany("INSERT OR IGNORE INTO buckets (kb_name, bucket, id) VALUES (?, ?, ?)",
+                              [(kb_name, bucket, row_id) for bucket in buckets])
+        return None, None
+
+    def filter(self, kb_name: str, rows: Iterable[Dict[str, Any]],
+               on_skip: Optional[Callable[[Dict[str, Any], str, str], None]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Pass on rows that do not duplicate a kept passage, registering them.
+
+        Args:
+            kb_name (str): Knowledge base the rows are inserted into
+            rows (Iterable[Dict[str, Any]]): Rows with id and content
+            on_skip (Optional[Callable]): Called with (row, id of the kept
+                passage, 'exact' or 'near') for each skipped row
+
+        Yields:
+            Dict[str, Any]: Rows to insert
+        """
+        try:
+            for row in rows:
+                with self._lock:
+                    duplicate_of, kind = self._check(kb_name, row)
+                    if duplicate_of is not None:
+                        self.conn.execute("INSERT OR REPLACE INTO skipped (kb_name, id, duplicate_of) VALUES (?, ?, ?)",
+                                          (kb_name, str(row['id']), duplicate_of))
+                if duplicate_of is None:
+                    yield row
+                elif on_skip:
+                    on_skip(row, duplicate_of, kind)
+        finally:
+            with self._lock:
+                self.conn.commit()
+
+    def _release(self, kb_name: str, ids: List[str]) -> List[str]:
+        orphaned = []
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            marks = ', '.join('?' * len(chunk))
+            for table in ('passages', 'buckets', 'skipped'):
+                self.conn.execute(f"DELETE FROM {table} WHERE kb_name = ? AND id IN ({marks})", [kb_name, *chunk])
+            orphaned.extend(i for (i,) in self.conn.execute(
+                f"SELECT id FROM skipped WHERE kb_name = ? AND duplicate_of IN ({marks})", [kb_name, *chunk]))
+            self.conn.execute(f"DELETE FROM skipped WHERE kb_name = ? AND duplicate_of IN ({marks})", [kb_name, *chunk])
+        return orphaned
+
+    def release(self, kb_name: str, ids: Iterable[str]) -> List[str]:
+        """
+        Forget passages deleted from (or about to be replaced in) the knowledge base.
+
+        Args:
+            kb_name (str): Knowledge base name
+            ids (Iterable[str]): Row ids
+
+        Returns:
+            List[str]: Ids of skipped rows that duplicated a released passage;
+                their content is no longer in the knowledge base
+        """
+        with self._lock:
+            orphaned = self._release(kb_name, [str(i) for i in ids])
+            self.conn.commit()
+        return orphaned
+
+    def stats(self, kb_name: str) -> Dict[str, int]:
+        with self._lock:
+            kept = self.conn.execute("SELECT COUNT(*) FROM passages WHERE kb_name = ?", (kb_name,)).fetchone()[0]
+            skipped = self.conn.execute("SELECT COUNT(*) FROM skipped WHERE kb_name = ?", (kb_name,)).fetchone()[0]
+        return {'kept': kept, 'skipped': skipped}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,201 @@
+"""
+Search fan-out across several knowledge bases
+
+When documents are sharded over knowledge bases (one per department, say),
+a query names several of them, as a comma separated list and/or globs over
+the knowledge bases that exist. Each shard is searched concurrently with
+its own timeout, the results are merged by score into one top-k, and
+shards that fail or time out are reported next to the partial results
+instead of failing the whole query.
+"""
+import asyncio
+import fnmatch
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from texttrove.async_utils import AsyncExecutor, run_async_safely
+
+# Rank constant for merging shards by reciprocal rank
+RRF_K = 60
+
+
+def is_pattern(name: str) -> bool:
+    return any(c in name for c in '*?[')
+
+
+def split_kb_names(spec: Union[str, Sequence[str]]) -> List[str]:
+    """Split ``a,b`` (or a list of such strings) into names, dropping blanks."""
+    parts = [spec] if isinstance(spec, str) else list(spec)
+    return [name.strip() for part in parts for name in part.split(',') if name.strip()]
+
+
+def is_multi_kb(spec: Union[str, Sequence[str]]) -> bool:
+    """True when a knowledge base spec names more than one KB or contains a glob."""
+    names = split_kb_names(spec)
+    return len(names) > 1 or any(is_pattern(name) for name in names)
+
+
+class KBNameResolver:
+    """
+    Expand knowledge base specs, listing the existing KBs at most once per ``ttl``.
+
+    Args:
+        list_kbs (Callable[[], List[str]]): Returns the names of existing knowledge bases
+        ttl (float): Seconds a listing is reused for
+    """
+
+    def __init__(self, list_kbs: Callable[[], List[str]], ttl: float = 30.0):
+        self.list_kbs = list_kbs
+        self.ttl = ttl
+        self._names: Optional[List[str]] = None
+        self._listed = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> List[str]:
+        with self._lock:
+            if self._names is None or time.monotonic() - self._listed > self.ttl:
+                self._names = sorted(self.list_kbs())
+                self._listed = time.monotonic()
+            return self._names
+
+    def resolve(self, spec: Union[str, Sequence[str]]) -> List[str]:
+        """
+        Expand a spec such as ``sales,hr`` or ``dept_*`` into KB names.
+
+        Plain names are kept as given (searching a missing KB fails its
+        shard); globs are matched against the existing knowledge bases.
+
+        Args:
+            spec (Union[str, Sequence[str]]): Names and globs, comma separated
+
+        Returns:
+            List[str]: Knowledge base names in spec order, without repeats
+
+        Raises:
+            ValueError: If the spec is empty or its globs match nothing
+        """
+        names = []
+        for name in split_kb_names(spec):
+            matches = fnmatch.filter(self.available(), name) if is_pattern(name) else [name]
+            names.extend(m for m in matches if m not in names)
+        if not names:
+            raise ValueError(f"No knowledge base matches '{spec if isinstance(spec, str) else ','.join(spec)}'")
+        return names
+
+
+def merge_results(shards: Dict[str, List[Dict[str, Any]]], limit: int,
+                  score_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Merge per-KB results into one top-k, labelling each row with its ``kb_name``.
+
+    Scores are only compared across shards when they mean the same thing in
+    each: with ``score_key`` set (the backend's ``relevance`` for semantic
+    search) and present on every row, rows are ordered by it. Otherwise, e.g.
+    for BM25 scores that depend on each KB's statistics or fused hybrid
+    results mixing scales, rows are ranked by reciprocal rank within their
+    shard, interleaving the shards.
+
+    Args:
+        shards (Dict[str, List[Dict[str, Any]]]): Results per knowledge base, best first
+        limit (int): Results to keep
+        score_key (Optional[str]): Row field comparable across knowledge bases, if any
+
+    Returns:
+        List[Dict[str, Any]]: Merged results, best first
+    """
+    rows = [(kb_name, rank, dict(row, kb_name=kb_name))
+            for kb_name, results in shards.items() for rank, row in enumerate(_rows(results))]
+    if score_key and all(row.get(score_key) is not None for _, _, row in rows):
+        scores = [float(row[score_key]) for _, _, row in rows]
+    else:
+        scores = [1 / (RRF_K + rank + 1) for _, rank, _ in rows]
+    order = sorted(range(len(rows)), key=lambda i: (-scores[i], rows[i][1], rows[i][0]))
+    return [rows[i][2] for i in order[:limit]]
+
+
+def _rows(results: Any) -> List[Dict[str, Any]]:
+    if results is None:
+        return []
+    if hasattr(results, 'to_dict'):
+        return results.to_dict('records')
+    return list(results)
+
+
+class FanOutResult:
+    """
+    Merged results of a fan-out search plus the state of each shard.
+
+    Attributes:
+        results (List[Dict[str, Any]]): Merged top-k, each row with its kb_name
+        errors (Dict[str, str]): Message per failed or timed-out knowledge base
+        timeouts (List[str]): Knowledge bases that timed out
+        latency_ms (Dict[str, float]): Search time per knowledge base
+    """
+
+    def __init__(self, kb_names: List[str]):
+        self.kb_names = kb_names
+        self.results: List[Dict[str, Any]] = []
+        self.errors: Dict[str, str] = {}
+        self.timeouts: List[str] = []
+        self.latency_ms: Dict[str, float] = {}
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.errors)
+
+    @property
+    def failed(self) -> bool:
+        """True when no shard answered."""
+        return len(self.errors) == len(self.kb_names)
+
+
+async def afan_out(search: Callable[[str], Any], kb_names: List[str], limit: int,
+                   executor: AsyncExecutor, timeout: Optional[float] = None,
+                   score_key: Optional[str] = 'relevance') -> FanOutResult:
+    """
+    Search several knowledge bases concurrently and merge the results.
+
+    Args:
+        search (Callable[[str], Any]): Blocking search of one KB, called with its name
+        kb_names (List[str]): Knowledge bases to search
+        limit (int): Merged results to keep
+        executor (AsyncExecutor): Runs the blocking searches
+        timeout (Optional[float]): Seconds allowed per knowledge base
+        score_key (Optional[str]): Row field comparable across knowledge bases;
+            None merges by rank (see merge_results)
+
+    Returns:
+        FanOutResult: Merged results and per-shard errors
+    """
+    outcome = FanOutResult(kb_names)
+
+    async def shard(kb_name: str):
+        start = time.perf_counter()
+        try:
+            return await executor.call(search, kb_name, timeout=timeout)
+        finally:
+            outcome.latency_ms[kb_name] = round((time.perf_counter() - start) * 1000, 3)
+
+    answers = await executor.gather(*(shard(kb_name) for kb_name in kb_names), return_exceptions=True)
+    shards = {}
+    for kb_name, answer in zip(kb_names, answers):
+        if isinstance(answer, asyncio.TimeoutError):
+            outcome.timeouts.append(kb_name)
+            # The timeout may come from the executor or from inside the search rather than ``timeout``
+            limit_s = timeout or executor.timeout
+            outcome.errors[kb_name] = f"timed out after {limit_s:g}s" if limit_s else str(answer) or "timed out"
+        elif isinstance(answer, BaseException):
+            outcome.errors[kb_name] = str(answer) or type(answer).__name__
+        else:
+            shards[kb_name] = answer
+    outcome.results = merge_results(shards, limit, score_key)
+    return outcome
+
+
+def fan_out(search: Callable[[str], Any], kb_names: List[str], limit: int,
+            executor: Optional[AsyncExecutor] = None, timeout: Optional[float] = None,
+            score_key: Optional[str] = 'relevance') -> FanOutResult:
+    """Synchronous afan_out for CLI commands and Flask routes."""
+    executor = executor or AsyncExecutor(max_concurrency=max(1, len(kb_names)))
+    return run_async_safely(afan_out(search, kb_names, limit, executor, timeout, score_key))
@@ -0,0 +1,161 @@
+"""
+Background ingestion jobs for TextSpark
+
+Uploads are handed to a bounded pool of worker threads so that a request
+returns as soon as the file is on disk. Each job reports its state
+(queued, extracting, inserting, done, failed) and progress details, and
+finished jobs are kept for a while so clients can poll their outcome.
+"""
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+JOB_STATES = ('queued', 'extracting', 'inserting', 'done', 'failed')
+
+
+class QueueFull(RuntimeError):
+    """Raised when too many jobs are already waiting"""
+
+
+class Job:
+    """One unit of background work and its reported progress"""
+
+    def __init__(self, name: str, fn: Callable[['Job'], Any]):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.fn = fn
+        self.state = 'queued'
+        self.detail: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def update(self, state: Optional[str] = None, **detail):
+        """
+        Report progress from inside the job.
+
+        Args:
+            state (Optional[str]): New state, one of JOB_STATES
+            **detail: Progress details (pages, rows inserted...)
+        """
+        if state is not None:
+            if state not in JOB_STATES:
+                raise ValueError(f"unknown job state {state!r}")
+            self.state = state
+        self.detail.update(detail)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished or time.time()
+        return {
+            'id': self.id,
+            'name': self.name,
+            'state': self.state,
+            'detail': dict(self.detail),
+            'error': self.error,
+            'created': self.created,
+            'queued_seconds': round((self.started or end) - self.created, 3),
+            'run_seconds': round(end - self.started, 3) if self.started else None,
+        }
+
+
+class JobQueue:
+    """
+    Bounded queue of jobs run by a fixed pool of worker threads.
+
+    Args:
+        workers (int): Jobs running at once
+        max_queued (int): Jobs allowed to wait; submit() raises QueueFull beyond it
+        keep (int): Finished jobs remembered for status queries
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 100, keep: int = 1000):
+        self.workers = max(1, workers)
+        self.keep = keep
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._sequence = itertools.count(1)
+
+    def _start_workers(self):
+        # Threads start with the first job, not at import time
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"texttrove-job-{next(self._sequence)}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.started = time.time()
+            try:
+                job.fn(job)
+                job.update('done')
+            except Exception as e:
+                job.error = str(e)
+                job.update('failed')
+            finally:
+                job.finished = time.time()
+                job.fn = None
+                self._queue.task_done()
+
+    def submit(self, name: str, fn: Callable[[Job], Any]) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            name (str): Label shown in status (e.g. the file name)
+            fn (Callable[[Job], Any]): Work to run; receives the job to report progress
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            QueueFull: If max_queued jobs are already waiting
+        """
+        job = Job(name, fn)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFull(f"{self._queue.maxsize} jobs already waiting; try again later") from None
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._start_workers()
+        return job
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished is not None]
+        for job_id in finished[:max(0, len(self._jobs) - self.keep)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Count jobs by state.
+
+        Returns:
+            Dict[str, int]: One entry per state plus workers
+        """
+        with self._lock:
+            counts = {state: 0 for state in JOB_STATES}
+            for job in self._jobs.values():
+                counts[job.state] += 1
+        counts['workers'] = self.workers
+        return counts
+
+    def join(self):
+        """Wait until every queued job has finished."""
+        self._queue.join()
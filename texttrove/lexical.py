@@ -0,0 +1,289 @@
+"""
+Local BM25 inverted index for lexical search
+
+Ingest feeds every passage through the index as it is inserted into the
+knowledge base. Terms keep identifiers such as ticket numbers and error
+codes intact (``jira-1234``, ``err_conn_reset``) while also indexing
+their parts, so exact lookups that embeddings blur still match.
+"""
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+LEXICAL_FILE = "texttrove_lexical.db"
+
+_TOKEN = re.compile(r"[^\W_]+(?:[-_./:#][^\W_]+)*")
+_PART = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms.
+
+    Compound identifiers are kept whole and also split into their parts:
+    ``"ERR-404 in v2.1"`` gives ``err-404, err, 404, in, v2.1, v2, 1``.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        List[str]: Terms in order, with repeats
+    """
+    terms = []
+    for match in _TOKEN.finditer(text.lower()):
+        token = match.group()
+        terms.append(token)
+        parts = _PART.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class LexicalIndex:
+    """
+    BM25 index stored in SQLite, partitioned by knowledge base.
+
+    Args:
+        path (Union[str, Path]): Index database file
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 length normalization
+        common (float): Terms in more than this share of passages are skipped
+            when the query has rarer ones; their idf is close to zero but their
+            postings are the longest to scan
+    """
+
+    def __init__(self, path: Union[str, Path] = LEXICAL_FILE, k1: float = 1.2, b: float = 0.75, common: float = 0.5):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.common = common
+        self._term_cache: Dict[tuple, int] = {}
+        # Document frequency changes are summed up and written once per commit
+        self._df_pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Each passage adds postings all over the (term, doc) B-tree; a larger page cache keeps it in memory
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " doc INTEGER PRIMARY KEY,"
+            " kb_name TEXT NOT NULL,"
+            " id TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " metadata TEXT NOT NULL,"
+            " length INTEGER NOT NULL,"
+            " UNIQUE (kb_name, id));"
+            "CREATE TABLE IF NOT EXISTS terms ("
+            " term_id INTEGER PRIMARY KEY,"
+            " kb_name TEXT NOT NULL,"
+            " term TEXT NOT NULL,"
+            " df INTEGER NOT NULL DEFAULT 0,"
+            " UNIQUE (kb_name, term));"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term_id INTEGER NOT NULL,"
+            " doc INTEGER NOT NULL,"
+            " tf INTEGER NOT NULL,"
+            " PRIMARY KEY (term_id, doc)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc);"
+            "CREATE TABLE IF NOT EXISTS kb_stats ("
+            " kb_name TEXT PRIMARY KEY,"
+            " docs INTEGER NOT NULL,"
+            " total_length INTEGER NOT NULL);"
+        )
+        self.conn.commit()
+
+    def _term_ids(self, kb_name: str, terms: Iterable[str]) -> Dict[str, int]:
+        ids = {}
+        missing = []
+        for term in terms:
+            term_id = self._term_cache.get((kb_name, term))
+            if term_id is None:
+                missing.append(term)
+            else:
+                ids[term] = term_id
+        if missing:
+            self.conn.executemany("INSERT OR IGNORE INTO terms (kb_name, term) VALUES (?, ?)",
+                                  [(kb_name, t) for t in missing])
+            for offset in range(0, len(missing), 500):
+                chunk = missing[offset:offset + 500]
+                for term, term_id in self.conn.execute(
+                        f"SELECT term, term_id FROM terms WHERE kb_name = ? AND term IN ({', '.join('?' * len(chunk))})",
+                        [kb_name, *chunk]):
+                    ids[term] = self._term_cache[(kb_name, term)] = term_id
+        return ids
+
+    def _remove(self, kb_name: str, ids: List[str]):
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            docs = self.conn.execute(
+                f"SELECT doc, length FROM docs WHERE kb_name = ? AND id IN ({', '.join('?' * len(chunk))})",
+                [kb_name, *chunk]).fetchall()
+            for doc, length in docs:
+                for (term_id,) in self.conn.execute("SELECT term_id FROM postings WHERE doc = ?", (doc,)):
+                    self._df_pending[term_id] -= 1
+                self.conn.execute("DELETE FROM postings WHERE doc = ?", (doc,))
+                self.conn.execute("DELETE FROM docs WHERE doc = ?", (doc,))
+                self.conn.execute("UPDATE kb_stats SET docs = docs - 1, total_length = total_length - ? "
+                                  "WHERE kb_name = ?", (length, kb_name))
+
+    def _add(self, kb_name: str, row: Dict[str, Any]):
+        row_id = str(row['id'])
+        self._remove(kb_name, [row_id])
+        counts = Counter(tokenize(row['content']))
+        length = sum(counts.values())
+        doc = self.conn.execute(
+            "INSERT INTO docs (kb_name, id, content, metadata, length) VALUES (?, ?, ?, ?, ?)",
+            (kb_name, row_id, row['content'], json.dumps(row.get('metadata') or {}, default=str), length)
+        ).lastrowid
+        term_ids = self._term_ids(kb_name, counts)
+        self.conn.executemany("INSERT INTO postings (term_id, doc, tf) VALUES (?, ?, ?)",
+                              [(term_ids[t], doc, tf) for t, tf in counts.items()])
+        self._df_pending.update(term_ids[t] for t in counts)
+        self.conn.execute("INSERT OR IGNORE INTO kb_stats (kb_name, docs, total_length) VALUES (?, 0, 0)", (kb_name,))
+        self.conn.execute("UPDATE kb_stats SET docs = docs + 1, total_length = total_length + ? WHERE kb_name = ?",
+                          (length, kb_name))
+
+    def _commit(self):
+        if self._df_pending:
+            self.conn.executemany("UPDATE terms SET df = df + ? WHERE term_id = ?",
+                                  [(delta, term_id) for term_id, delta in self._df_pending.items() if delta])
+            self._df_pending.clear()
+        self.conn.commit()
+
+    def add(self, kb_name: str, rows: Iterable[Dict[str, Any]]):
+        """
+        Index rows of ``{'id', 'content', 'metadata'}``; a known id replaces the old passage.
+
+        Args:
+            kb_name (str): Knowledge base the rows belong to
+            rows (Iterable[Dict[str, Any]]): Rows as produced by chunk_rows with an id prefix
+        """
+        with self._lock:
+            for row in rows:
+                self._add(kb_name, row)
+            self._commit()
+
+    def tee(self, kb_name: str, rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Index rows as they stream past, e.g. on their way to a BatchInserter.
+
+        Args:
+            kb_name (str): Knowledge base the rows belong to
+            rows (Iterable[Dict[str, Any]]): Rows to index and pass on
+
+        Yields:
+            Dict[str, Any]: The same rows, unchanged
+        """
+        try:
+            for row in rows:
+                with self._lock:
+                    self._add(kb_name, row)
+                yield row
+        finally:
+            with self._lock:
+                self._commit()
+
+    def delete(self, kb_name: str, ids: List[str]):
+        """
+        Remove passages by id.
+
+        Args:
+            kb_name (str): Knowledge base name
+            ids (List[str]): Row ids to remove
+        """
+        with self._lock:
+            self._remove(kb_name, [str(i) for i in ids])
+            self._commit()
+
+    def search(self, kb_name: str, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank passages by BM25.
+
+        Args:
+            kb_name (str): Knowledge base to search
+            query (str): Search text
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Dict[str, Any]]: Rows with id, content, metadata and score, best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            stats = self.conn.execute("SELECT docs, total_length FROM kb_stats WHERE kb_name = ?", (kb_name,)).fetchone()
+            if not stats or not stats[0] or not terms:
+                return []
+            n_docs, avg_length = stats[0], stats[1] / stats[0]
+            found = self.conn.execute(
+                f"SELECT term_id, df FROM terms WHERE kb_name = ? AND df > 0 AND term IN ({', '.join('?' * len(terms))})",
+                [kb_name, *terms]).fetchall()
+            if not found:
+                return []
+            rare = [(term_id, df) for term_id, df in found if df <= n_docs * self.common]
+            weights = [(term_id, math.log(1 + (n_docs - df + 0.5) / (df + 0.5))) for term_id, df in rare or found]
+            top = self.conn.execute(
+                f"WITH q(term_id, idf) AS (VALUES {', '.join(['(?, ?)'] * len(weights))}) "
+                "SELECT p.doc, SUM(q.idf * p.tf * ? / (p.tf + ? * (1 - ? + ? * d.length / ?))) AS score "
+                "FROM q JOIN postings p ON p.term_id = q.term_id JOIN docs d ON d.doc = p.doc "
+                "GROUP BY p.doc ORDER BY score DESC LIMIT ?",
+                [v for pair in weights for v in pair] + [self.k1 + 1, self.k1, self.b, self.b, avg_length, limit]
+            ).fetchall()
+            if not top:
+                return []
+            rows = {
+                r[0]: r[1:]
+                for r in self.conn.execute(
+                    f"SELECT doc, id, content, metadata FROM docs WHERE doc IN ({', '.join('?' * len(top))})",
+                    [doc for doc, _ in top])
+            }
+        return [{'id': rows[doc][0], 'content': rows[doc][1], 'metadata': json.loads(rows[doc][2]), 'score': score}
+                for doc, score in top]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Identify a passage across result lists: its row id, else source and chunk, else content."""
+    if result.get('id') is not None:
+        return str(result['id'])
+    metadata = result.get('metadata') or {}
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            metadata = {}
+    if metadata.get('source') is not None and metadata.get('chunk_index') is not None:
+        return f"{metadata['source']}#{metadata['chunk_index']}"
+    return result.get('content', '')
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], limit: int = 5, k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Merge ranked lists by reciprocal rank fusion: score = sum of 1 / (k + rank).
+
+    Args:
+        result_lists (List[List[Dict[str, Any]]]): Ranked results, best first
+        limit (int): Maximum number of merged results
+        k (int): Damping constant; 60 is the usual choice
+
+    Returns:
+        List[Dict[str, Any]]: Merged results with an added rrf_score, best first
+    """
+    fused: Dict[str, float] = {}
+    first: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results or [], 1):
+            key = result_key(result)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+            first.setdefault(key, result)
+    ranked = sorted(fused, key=lambda key: -fused[key])[:limit]
+    return [{**first[key], 'rrf_score': fused[key]} for key in ranked]
+
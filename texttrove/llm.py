@@ -0,0 +1,93 @@
+"""
+LLM providers for summarization
+
+One provider object per process owns the (lazily built, reused) client and
+offers a blocking completion and a token stream, so the CLI, the daemon
+and TextSpark talk to Groq and Ollama the same way.
+"""
+import threading
+from typing import Any, Dict, Iterator
+
+from texttrove.metrics import LLM_CALLS, LLM_SECONDS, observe
+
+GROQ_MODEL = "llama3-8b-8192"
+
+
+class LLMProvider:
+    """
+    Groq or Ollama completion client.
+
+    Args:
+        name (str): 'groq' or 'ollama'
+        config (Dict[str, Any]): TextTrove configuration (API key, URL, model)
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = 'groq' if name == 'groq' else 'ollama'
+        self.config = config
+        self.model = GROQ_MODEL if self.name == 'groq' else config.get('ollama_model', 'llama3')
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        """Provider and model, e.g. ``ollama:llama3``; answers differ per model."""
+        return f"{self.name}:{self.model}"
+
+    def client(self):
+        """Build the client once (imports, TLS setup) and reuse it; both clients are thread-safe."""
+        with self._lock:
+            if self._client is None:
+                if self.name == 'groq':
+                    if not self.config.get('groq_api_key'):
+                        raise ValueError("Groq API key not configured in config.yaml")
+                    from groq import Groq
+                    self._client = Groq(api_key=self.config.get('groq_api_key'))
+                else:
+                    import ollama
+                    self._client = ollama.Client(host=self.config.get('ollama_url'))
+            return self._client
+
+    def complete(self, prompt: str) -> str:
+        """
+        Generate a full answer.
+
+        Args:
+            prompt (str): Prompt text
+
+        Returns:
+            str: The answer; errors are raised, never returned
+        """
+        with observe(LLM_CALLS, LLM_SECONDS, provider=self.name, mode='complete'):
+            if self.name == 'groq':
+                response = self.client().chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                return response.choices[0].message.content
+            return self.client().generate(model=self.model, prompt=prompt)['response']
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generate an answer token by token.
+
+        Args:
+            prompt (str): Prompt text
+
+        Yields:
+            str: Text fragments as the provider produces them
+        """
+        with observe(LLM_CALLS, LLM_SECONDS, provider=self.name, mode='stream'):
+            if self.name == 'groq':
+                chunks = self.client().chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=True
+                )
+                for chunk in chunks:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            else:
+                for chunk in self.client().generate(model=self.model, prompt=prompt, stream=True):
+                    if chunk['response']:
+                        yield chunk['response']
@@ -0,0 +1,395 @@
+"""
+Load testing for TextSpark
+
+Drives the search (/), upload and status routes with a weighted request
+mix, either closed-loop (a fixed number of users, each sending its next
+request when the previous one has answered) or open-loop (requests arrive
+at a fixed average rate whether or not earlier ones have finished, so a
+saturated server shows up as queueing in the latencies instead of quietly
+lowering the offered load). Latencies are recorded in HDR-style histograms.
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ROUTES = ('search', 'status', 'upload')
+DEFAULT_MIX = "search=80,status=15,upload=5"
+DEFAULT_FAKE_URL = "fake://loadtest?search_ms=20&insert_ms=30&row_ms=0.5&jitter=0.2"
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with bounded relative error (HdrHistogram layout).
+
+    Values are kept in microseconds. Each power-of-two range is split into
+    ``2 ** (precision_bits - 1)`` equal buckets, so a percentile is reported
+    within ``1 / 2 ** (precision_bits - 1)`` of the true value (under 1% by
+    default) while memory stays proportional to the number of distinct
+    buckets hit, whatever the number of samples.
+
+    Args:
+        precision_bits (int): Sub-bucket bits; 8 gives under 0.8% error
+    """
+
+    def __init__(self, precision_bits: int = 8):
+        self.bits = precision_bits
+        self.counts: Dict[Tuple[int, int], int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _key(self, micros: int) -> Tuple[int, int]:
+        shift = max(0, micros.bit_length() - self.bits)
+        return shift, micros >> shift
+
+    def record(self, ms: float):
+        """Record one latency in milliseconds."""
+        micros = max(0, int(round(ms * 1000)))
+        key = self._key(micros)
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.count += 1
+            self.total += micros
+            self.min = micros if self.min is None else min(self.min, micros)
+            self.max = max(self.max, micros)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's samples (same precision) to this one."""
+        with self._lock:
+            for key, count in other.counts.items():
+                self.counts[key] = self.counts.get(key, 0) + count
+            self.count += other.count
+            self.total += other.total
+            if other.min is not None:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """
+        Latency at a percentile.
+
+        Args:
+            p (float): Percentile between 0 and 100
+
+        Returns:
+            float: Milliseconds; the highest value of the bucket holding the
+                percentile, capped at the largest sample (0.0 when empty)
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, int(-(-p * self.count // 100)))
+            seen = 0
+            for (shift, sub), count in sorted(self.counts.items()):
+                seen += count
+                if seen >= rank:
+                    return min(((sub + 1) << shift) - 1, self.max) / 1000
+            return self.max / 1000
+
+    def summary(self) -> Dict[str, float]:
+        """Count, min, mean, max and PERCENTILES in milliseconds."""
+        result = {'count': self.count,
+                  'min': (self.min or 0) / 1000,
+                  'mean': round(self.total / self.count / 1000, 3) if self.count else 0.0,
+                  'max': self.max / 1000}
+        for p in PERCENTILES:
+            result[f"p{p:g}"] = self.percentile(p)
+        return result
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parse a request mix such as ``search=80,status=15,upload=5``.
+
+    Raises:
+        ValueError: On an unknown route or a weight that is not a positive number
+    """
+    weights = {}
+    for part in mix.split(','):
+        if not part.strip():
+            continue
+        route, _, weight = part.partition('=')
+        route = route.strip()
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route '{route}' (expected one of {', '.join(ROUTES)})")
+        try:
+            weights[route] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight for {route}: {weight}") from None
+        if weights[route] < 0:
+            raise ValueError(f"Invalid weight for {route}: {weight}")
+    if not weights or not any(weights.values()):
+        raise ValueError("The request mix is empty")
+    return weights
+
+
+class Workload:
+    """
+    Request payloads: search strings and upload documents from the synthetic corpus.
+
+    Args:
+        seed (int): Random seed
+        queries (int): Distinct search strings
+        upload_kb (float): Approximate size of each uploaded document
+    """
+
+    def __init__(self, seed: int = 0, queries: int = 500, upload_kb: float = 8):
+        from texttrove.testing import TOPICS, CorpusGenerator
+        generator = CorpusGenerator(seed)
+        self.queries = generator.queries(queries)
+        self.uploads = [generator.text(topic, int(upload_kb * 1024)).encode('utf-8') for topic in TOPICS]
+
+
+class FlaskTarget:
+    """Send requests to a Flask app in this process through per-thread test clients."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    def search(self, text: str) -> int:
+        return self._client().post('/', data={'search': text}).status_code
+
+    def status(self) -> int:
+        return self._client().get('/status').status_code
+
+    def upload(self, name: str, content: bytes) -> int:
+        return self._client().post('/upload?format=json', data={
+            'file': (io.BytesIO(content), name), 'category': 'loadtest'},
+            content_type='multipart/form-data').status_code
+
+
+class HttpTarget:
+    """Send requests to a running TextSpark server over HTTP, one session per thread."""
+
+    def __init__(self, url: str, timeout: float = 30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            import requests
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def search(self, text: str) -> int:
+        return self._session().post(f"{self.url}/", data={'search': text}, timeout=self.timeout).status_code
+
+    def status(self) -> int:
+        return self._session().get(f"{self.url}/status", timeout=self.timeout).status_code
+
+    def upload(self, name: str, content: bytes) -> int:
+        return self._session().post(f"{self.url}/upload?format=json", files={'file': (name, content)},
+                                    data={'category': 'loadtest'}, timeout=self.timeout).status_code
+
+
+class LoadResult:
+    """Per-route histograms, status counts and errors of one load test."""
+
+    def __init__(self):
+        self.histograms = {route: LatencyHistogram() for route in ROUTES}
+        self.statuses: Dict[str, Dict[str, int]] = {route: {} for route in ROUTES}
+        self.errors = {route: 0 for route in ROUTES}
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, route: str, ms: float, outcome: str, failed: bool):
+        self.histograms[route].record(ms)
+        with self._lock:
+            counts = self.statuses[route]
+            counts[outcome] = counts.get(outcome, 0) + 1
+            if failed:
+                self.errors[route] += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Throughput, error rate and latency percentiles per route and overall."""
+        total = LatencyHistogram()
+        routes = {}
+        for route, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            total.merge(histogram)
+            routes[route] = {
+                'requests': histogram.count,
+                'errors': self.errors[route],
+                'error_rate': round(self.errors[route] / histogram.count, 4),
+                'throughput_per_s': round(histogram.count / self.elapsed, 2) if self.elapsed else 0.0,
+                'statuses': dict(sorted(self.statuses[route].items())),
+                'latency_ms': histogram.summary(),
+            }
+        errors = sum(self.errors.values())
+        return {
+            'elapsed_s': round(self.elapsed, 3),
+            'requests': total.count,
+            'errors': errors,
+            'error_rate': round(errors / total.count, 4) if total.count else 0.0,
+            'throughput_per_s': round(total.count / self.elapsed, 2) if self.elapsed else 0.0,
+            'latency_ms': total.summary(),
+            'routes': routes,
+        }
+
+
+class LoadTest:
+    """
+    Drive a target with a weighted request mix.
+
+    Args:
+        target: FlaskTarget or HttpTarget
+        mix (Dict[str, float]): Route weights (see parse_mix)
+        workload (Workload): Search strings and upload documents
+        seed (int): Random seed for route choice and arrivals
+    """
+
+    def __init__(self, target, mix: Dict[str, float], workload: Workload, seed: int = 0):
+        self.target = target
+        self.routes = list(mix)
+        self.weights = [mix[route] for route in self.routes]
+        self.workload = workload
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def _next(self) -> Tuple[str, Callable[[], int]]:
+        with self._lock:
+            route = self.random.choices(self.routes, self.weights)[0]
+            self._sequence += 1
+            number = self._sequence
+            text = self.random.choice(self.workload.queries)
+            content = self.random.choice(self.workload.uploads)
+        if route == 'search':
+            return route, lambda: self.target.search(text)
+        if route == 'status':
+            return route, self.target.status
+        return route, lambda: self.target.upload(f"loadtest-{number}.txt", content)
+
+    @staticmethod
+    def _send(result: LoadResult, route: str, send: Callable[[], int], start: float):
+        try:
+            status = send()
+            outcome, failed = str(status), status >= 400
+        except Exception as e:
+            outcome, failed = type(e).__name__, True
+        result.record(route, (time.perf_counter() - start) * 1000, outcome, failed)
+
+    def closed_loop(self, concurrency: int, duration: float) -> LoadResult:
+        """
+        Run ``concurrency`` users back to back for ``duration`` seconds.
+
+        Latency is measured per request; throughput is whatever the target
+        sustains at that concurrency.
+        """
+        result = LoadResult()
+        started = time.perf_counter()
+        deadline = started + duration
+
+        def user():
+            while time.perf_counter() < deadline:
+                route, send = self._next()
+                self._send(result, route, send, time.perf_counter())
+
+        threads = [threading.Thread(target=user, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def open_loop(self, rate: float, duration: float, concurrency: int) -> LoadResult:
+        """
+        Send requests with Poisson arrivals at ``rate`` per second for ``duration`` seconds.
+
+        At most ``concurrency`` requests are in flight; arrivals beyond that
+        wait for a free slot. Latency is measured from each request's
+        scheduled arrival, not from when a slot freed up, so time spent
+        queueing behind a slow target counts (no coordinated omission).
+        """
+        result = LoadResult()
+        started = time.perf_counter()
+        arrival = started
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='loadtest') as pool:
+            while True:
+                with self._lock:
+                    arrival += self.random.expovariate(rate)
+                if arrival >= started + duration:
+                    break
+                delay = arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                route, send = self._next()
+                pool.submit(self._send, result, route, send, arrival)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+
+@contextlib.contextmanager
+def local_textspark(config: Dict[str, Any], fake_url: str = DEFAULT_FAKE_URL,
+                    overrides: Optional[Dict[str, Any]] = None, documents: int = 20,
+                    seed: int = 0) -> Iterator[FlaskTarget]:
+    """
+    Run TextSpark in this process against the fake MindsDB server.
+
+    The app is imported in a temporary directory holding a copy of the
+    configuration (with ``overrides`` applied, e.g. ``pool_size`` or
+    ``upload_workers``) pointed at ``fake_url``; the knowledge base is
+    seeded with ``documents`` synthetic documents first.
+
+    Args:
+        config (Dict[str, Any]): TextTrove configuration to start from
+        fake_url (str): fake:// URL; its query string sets the simulated latency
+        overrides (Optional[Dict[str, Any]]): Configuration changes
+        documents (int): Documents to seed the knowledge base with
+        seed (int): Random seed for the seeded documents
+
+    Yields:
+        FlaskTarget: Target bound to the app
+    """
+    import sys
+    import yaml
+    from texttrove.chunking import chunk_options, chunk_rows
+    from texttrove.testing import TOPICS, CorpusGenerator, connect_fake
+
+    if 'textspark.app' in sys.modules:
+        raise RuntimeError("TextSpark is already loaded in this process; run the load test in a fresh process")
+    settings = {key: value for key, value in config.items() if not key.endswith('_path')}
+    settings.update(overrides or {})
+    settings.update({'mindsdb_url': fake_url, 'backend': 'mindsdb'})
+    kb_name = settings.setdefault('kb_name', 'texttrove_kb')
+
+    server = connect_fake(fake_url)
+    try:
+        kb = server.knowledge_bases.get(kb_name)
+    except LookupError:
+        kb = server.knowledge_bases.create(name=kb_name)
+    generator = CorpusGenerator(seed)
+    topics = list(TOPICS)
+    for number in range(documents):
+        text = generator.text(topics[number % len(topics)], 8 * 1024)
+        kb.insert(list(chunk_rows(text, {'source': f"seed-{number}.txt"}, id_prefix=f"seed-{number}",
+                                  **chunk_options(settings))))
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='texttrove-loadtest-') as workdir:
+        Path(workdir, 'config.yaml').write_text(yaml.safe_dump(settings))
+        os.chdir(workdir)
+        try:
+            from textspark.app import app
+            yield FlaskTarget(app)
+        finally:
+            os.chdir(previous)
@@ -0,0 +1,224 @@
+"""
+Persistent ingestion manifest for incremental re-ingest
+"""
+import datetime
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Union
+
+MANIFEST_FILE = "texttrove_manifest.db"
+
+
+class FileState(NamedTuple):
+    """Size, modification time and content hash of a file on disk"""
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+
+
+class IngestPlan(NamedTuple):
+    """What an ingest run has to do for each file under a folder"""
+    new: List[Path]
+    modified: List[Path]
+    unchanged: List[Path]
+    removed: List[str]
+    states: Dict[str, FileState]
+    chunks: Dict[str, int]
+
+
+def file_hash(file_path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 of a file without reading it into memory at once.
+
+    Args:
+        file_path (Union[str, Path]): Path to the file
+        block_size (int): Bytes read per step
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def document_id(file_path: Union[str, Path]) -> str:
+    """
+    Return a stable row id prefix for a file, so re-inserts replace old rows.
+
+    Args:
+        file_path (Union[str, Path]): Path to the file
+
+    Returns:
+        str: Short hex id derived from the absolute path
+    """
+    return hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()[:16]
+
+
+def row_ids(file_path: Union[str, Path], start: int, stop: int) -> List[str]:
+    """Return the row ids of chunks start..stop-1 of a file."""
+    prefix = document_id(file_path)
+    return [f"{prefix}-{i}" for i in range(start, stop)]
+
+
+class Manifest:
+    """
+    SQLite record of what has been ingested into each knowledge base.
+
+    Files are keyed by knowledge base name and absolute path. A file whose
+    size and mtime are unchanged is trusted without reading it; otherwise its
+    content hash decides whether it really changed.
+    """
+
+    def __init__(self, path: Union[str, Path] = MANIFEST_FILE):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " kb_name TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " sha256 TEXT NOT NULL,"
+            " chunks INTEGER NOT NULL DEFAULT 1,"
+            " ingested_at TEXT NOT NULL,"
+            " PRIMARY KEY (kb_name, path))"
+        )
+        self.conn.commit()
+
+    def plan(self, kb_name: str, files: Iterable[Path], root: Union[str, Path], force: bool = False) -> IngestPlan:
+        """
+        Compare files on disk against the manifest.
+
+        Args:
+            kb_name (str): Knowledge base the files are ingested into
+            files (Iterable[Path]): Files currently under root
+            root (Union[str, Path]): Folder being ingested; only manifest
+                entries below it can be reported as removed
+            force (bool): Treat every file as modified
+
+        Returns:
+            IngestPlan: New, modified, unchanged and removed files
+        """
+        root = str(Path(root).resolve())
+        known = {
+            row[0]: row[1:]
+            for row in self.conn.execute(
+                "SELECT path, size, mtime, sha256, chunks FROM files WHERE kb_name = ? AND (path = ? OR path LIKE ?)",
+                (kb_name, root, root.rstrip('/') + '/%')
+            )
+            if row[0] == root or row[0].startswith(root.rstrip('/') + '/')
+        }
+        return self._classify(kb_name, files, known, force)
+
+    def plan_paths(self, kb_name: str, paths: Iterable[Union[str, Path]], force: bool = False) -> IngestPlan:
+        """
+        Compare only the given paths against the manifest.
+
+        Used when a watcher already knows which files changed: paths that
+        still exist are classified as usual, missing ones that were ingested
+        are reported as removed, and nothing else in the folder is touched.
+
+        Args:
+            kb_name (str): Knowledge base the files are ingested into
+            paths (Iterable[Union[str, Path]]): Changed (possibly deleted) files
+            force (bool): Treat every existing file as modified
+
+        Returns:
+            IngestPlan: New, modified, unchanged and removed files among paths
+        """
+        keys = {str(Path(p).resolve()): Path(p) for p in paths}
+        known = {}
+        for key in keys:
+            row = self.conn.execute(
+                "SELECT size, mtime, sha256, chunks FROM files WHERE kb_name = ? AND path = ?", (kb_name, key)
+            ).fetchone()
+            if row:
+                known[key] = row
+        return self._classify(kb_name, [p for p in keys.values() if p.is_file()], known, force)
+
+    def _classify(self, kb_name: str, files: Iterable[Path], known: Dict[str, tuple], force: bool) -> IngestPlan:
+        plan = IngestPlan([], [], [], [], {}, {path: entry[3] for path, entry in known.items()})
+        seen = set()
+        for file_path in files:
+            key = str(Path(file_path).resolve())
+            seen.add(key)
+            stat = Path(file_path).stat()
+            previous = known.get(key)
+
+            if previous and not force and previous[0] == stat.st_size and previous[1] == stat.st_mtime:
+                plan.unchanged.append(file_path)
+                continue
+
+            state = FileState(key, stat.st_size, stat.st_mtime, file_hash(file_path))
+            plan.states[key] = state
+            if previous is None:
+                plan.new.append(file_path)
+            elif not force and previous[2] == state.sha256:
+                # Touched but identical: remember the new mtime and move on
+                self.conn.execute(
+                    "UPDATE files SET size = ?, mtime = ? WHERE kb_name = ? AND path = ?",
+                    (state.size, state.mtime, kb_name, key)
+                )
+                plan.unchanged.append(file_path)
+            else:
+                plan.modified.append(file_path)
+
+        self.conn.commit()
+        plan.removed.extend(sorted(set(known) - seen))
+        return plan
+
+    def record(self, kb_name: str, states: Iterable[FileState], chunks: Dict[str, int]):
+        """
+        Store files that were ingested successfully.
+
+        Args:
+            kb_name (str): Knowledge base name
+            states (Iterable[FileState]): Files to record
+            chunks (Dict[str, int]): Rows inserted per file path
+        """
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files (kb_name, path, size, mtime, sha256, chunks, ingested_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(kb_name, s.path, s.size, s.mtime, s.sha256, chunks.get(s.path, 1), now) for s in states]
+        )
+        self.conn.commit()
+
+    def forget(self, kb_name: str, paths: Iterable[str]):
+        """
+        Drop files from the manifest.
+
+        Args:
+            kb_name (str): Knowledge base name
+            paths (Iterable[str]): Absolute paths to remove
+        """
+        self.conn.executemany(
+            "DELETE FROM files WHERE kb_name = ? AND path = ?",
+            [(kb_name, path) for path in paths]
+        )
+        self.conn.commit()
+
+    def forget_documents(self, kb_name: str, doc_ids: Iterable[str]) -> List[str]:
+        """
+        Drop files by their row id prefix, so the next ingest inserts them again.
+
+        Args:
+            kb_name (str): Knowledge base name
+            doc_ids (Iterable[str]): document_id values
+
+        Returns:
+            List[str]: Paths of the files dropped
+        """
+        doc_ids = set(doc_ids)
+        paths = [path for (path,) in self.conn.execute("SELECT path FROM files WHERE kb_name = ?", (kb_name,))
+                 if document_id(path) in doc_ids]
+        self.forget(kb_name, paths)
+        return paths
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,249 @@
+"""
+Process-wide metrics in the Prometheus text format
+
+A small registry of labeled counters, gauges and latency histograms shared
+by the CLI and TextSpark. The search, upload, knowledge base, extraction
+and LLM paths record into the metrics defined at the bottom of this module;
+TextSpark serves ``REGISTRY.render()`` at /metrics and the CLI can write it
+to a file (``--metrics``) for a node exporter's textfile collector.
+"""
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Seconds; spans a cache hit (sub-millisecond) to a slow LLM call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"{self.name} has no label(s) {', '.join(sorted(unknown))}")
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + ([extra] if extra else [])
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Current value per label set."""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Cumulative latency histogram per label set.
+
+    Args:
+        name (str): Metric name, conventionally ending in ``_seconds``
+        help (str): Description
+        labelnames (Sequence[str]): Label names
+        buckets (Sequence[float]): Upper bounds in seconds
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, seconds: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # Per bucket counts, then +Inf count and sum
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += seconds
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(sum(series[:-1])) if series else 0
+
+    def _samples(self) -> Iterator[str]:
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket{self._labels(key, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {repr(series[-1])}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+class Registry:
+    """Named metrics, rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+    def write(self, path: Union[str, Path]):
+        """Write render() to a file atomically, so a collector never reads half of it."""
+        path = Path(path)
+        fd, temp = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+
+@contextlib.contextmanager
+def observe(counter: Counter, histogram: Histogram, **labels) -> Iterator[Dict[str, str]]:
+    """
+    Count and time the body of a with-block.
+
+    The yielded dict holds the labels; the body may set ``outcome`` (it
+    defaults to ``ok``, to ``error`` when the body raises and to
+    ``cancelled`` when a generator is closed early). The counter and the
+    histogram each get the labels they declare.
+
+    Args:
+        counter (Counter): Counter incremented once
+        histogram (Histogram): Histogram observing the duration in seconds
+        **labels: Label values
+    """
+    labels.setdefault('outcome', 'ok')
+    start = time.perf_counter()
+    try:
+        yield labels
+    except GeneratorExit:
+        labels['outcome'] = 'cancelled'
+        raise
+    except BaseException:
+        labels['outcome'] = 'error'
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        counter.inc(**{k: v for k, v in labels.items() if k in counter.labelnames})
+        histogram.observe(elapsed, **{k: v for k, v in labels.items() if k in histogram.labelnames})
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'texttrove_http_requests_total', "TextSpark HTTP requests", ('route', 'method', 'status'))
+HTTP_SECONDS = REGISTRY.histogram(
+    'texttrove_http_request_duration_seconds', "TextSpark request latency", ('route', 'method'))
+SEARCHES = REGISTRY.counter(
+    'texttrove_searches_total', "Searches by outcome (hit, miss, uncached, error)", ('kb', 'outcome'))
+SEARCH_SECONDS = REGISTRY.histogram(
+    'texttrove_search_duration_seconds', "Search latency including the result cache", ('kb', 'outcome'))
+KB_CALLS = REGISTRY.counter(
+    'texttrove_kb_calls_total', "Knowledge base calls (MindsDB or the local index)", ('operation', 'kb', 'outcome'))
+KB_SECONDS = REGISTRY.histogram(
+    'texttrove_kb_call_duration_seconds', "Knowledge base call latency", ('operation', 'kb'))
+KB_ROWS = REGISTRY.counter(
+    'texttrove_kb_rows_inserted_total', "Rows inserted into knowledge bases", ('kb',))
+EXTRACTIONS = REGISTRY.counter(
+    'texttrove_extractions_total', "Documents extracted", ('format', 'outcome'))
+EXTRACTION_SECONDS = REGISTRY.histogram(
+    'texttrove_extraction_duration_seconds', "Text extraction latency per document", ('format',))
+LLM_CALLS = REGISTRY.counter(
+    'texttrove_llm_calls_total', "LLM calls", ('provider', 'mode', 'outcome'))
+LLM_SECONDS = REGISTRY.histogram(
+    'texttrove_llm_call_duration_seconds', "LLM call latency (to the last token when streaming)",
+    ('provider', 'mode'))
+UPLOADS = REGISTRY.counter(
+    'texttrove_uploads_total', "TextSpark uploads by outcome (queued, rejected)", ('kb', 'outcome'))
+UPLOAD_JOBS = REGISTRY.counter(
+    'texttrove_upload_jobs_total', "Finished upload ingestion jobs", ('kb', 'outcome'))
+UPLOAD_SECONDS = REGISTRY.histogram(
+    'texttrove_upload_job_duration_seconds', "Upload ingestion job run time", ('kb', 'outcome'))
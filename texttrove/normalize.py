@@ -0,0 +1,288 @@
+"""
+Text normalization before chunking
+
+Extracted text carries noise that would otherwise be embedded with every
+passage: ligatures and compatibility characters, zero-width and control
+characters, ragged whitespace, and in PDFs words hyphenated across line ends
+and the running headers, footers and page numbers repeated on every page.
+Leading indentation is kept, since Markdown and reStructuredText give it
+meaning (code blocks, nested lists, directives).
+normalize_text cleans a whole document in a few linear passes (pages are
+separated by PAGE_BREAK); stream_normalized cleans text read block by block,
+without the per-page pass. TextNormalizer applies either and counts the
+bytes removed from each document.
+"""
+import math
+import re
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+from texttrove.utils import PAGE_BREAK
+
+# Invisible characters (soft hyphen, zero-width space, word joiner, byte order
+# mark) and C0 controls other than tab, newline, carriage return and form feed
+_INVISIBLE = re.compile('[\x00-\x08\x0b\x0e-\x1f\x7f\xad\u200b\u2060\ufeff]+')
+_CARRIAGE_RETURNS = re.compile(r'\r\n?')
+_BLANK_LINES = re.compile(r'\n{3,}')
+# A hyphen at the end of a line and the word after it; the callback checks the letter before it
+_HYPHENATED = re.compile(r'[-\u2010]\n(?=([^\W\d_]\S*))')
+_DIGITS = re.compile(r'\d+')
+# Text held back between streamed blocks cannot grow past this without a safe cut
+_MAX_CARRY = 4 * 1024 * 1024
+
+
+def _clean_characters(text: str) -> str:
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    return _CARRIAGE_RETURNS.sub('\n', _INVISIBLE.sub('', text))
+
+
+def _clean_line(line: str) -> str:
+    # str.split() collapses and trims whitespace in C, far faster than a regex per space
+    words = line.split()
+    if not words:
+        return ''
+    body = ' '.join(words)
+    indent = len(line) - len(line.lstrip())
+    return line[:indent] + body if indent else body
+
+
+def _clean_lines(text: str) -> List[str]:
+    return [_clean_line(line) for line in text.split('\n')]
+
+
+def clean_text(text: str) -> str:
+    """
+    Unicode and whitespace cleanup of a piece of text.
+
+    Applies NFKC (ligatures, full-width and non-breaking characters), drops
+    invisible and control characters, turns CR/CRLF and page breaks into
+    newlines, collapses runs of spaces and tabs within lines and trims line
+    ends; leading indentation is kept. Blank lines and hyphenation are left
+    to the callers, which see whole documents.
+
+    Args:
+        text (str): Text to clean
+
+    Returns:
+        str: Cleaned text
+    """
+    return '\n'.join(_clean_lines(_clean_characters(text).replace(PAGE_BREAK, '\n')))
+
+
+def dehyphenate(text: str) -> str:
+    """
+    Join words split by a hyphen at a line end when the next line continues in lower case.
+
+    A compound continuing with more hyphens ("state-" / "of-the-art") keeps
+    its hyphen; only the line break goes. Meant for PDF text, where line ends
+    come from the layout: in authored text "well-" / "known" is a real hyphen.
+    """
+    def join(match):
+        start = match.start()
+        following = match.group(1)
+        if not (start and text[start - 1].isalpha() and following[0].islower()):
+            return match.group()
+        return match.group()[0] if '-' in following else ''
+    return _HYPHENATED.sub(join, text)
+
+
+def _line_key(line: str) -> str:
+    # Page numbers and dates vary between pages: "Page 3 of 40" and "Page 4 of 40" match
+    return _DIGITS.sub('#', line.strip().casefold())
+
+
+def _edges(lines: List[str], edge_lines: int) -> List[int]:
+    """Indexes of the first and last ``edge_lines`` non-empty lines of a page."""
+    top = []
+    for index, line in enumerate(lines):
+        if line:
+            top.append(index)
+            if len(top) == edge_lines:
+                break
+    bottom = []
+    for index in range(len(lines) - 1, top[-1] if top else -1, -1):
+        if lines[index]:
+            bottom.append(index)
+            if len(bottom) == edge_lines:
+                break
+    return top + bottom[::-1]
+
+
+def strip_repeated_lines(pages: List[List[str]], min_share: float = 0.4, min_pages: int = 3,
+                         edge_lines: int = 2) -> List[List[str]]:
+    """
+    Remove running headers, footers and page numbers from a document's pages.
+
+    A line counts as boilerplate when, with digits ignored, it is among the
+    first or last ``edge_lines`` lines of at least ``min_share`` of the pages
+    (and of at least ``min_pages`` pages). Only those edge lines are removed;
+    the same text in the body of a page is kept.
+
+    Args:
+        pages (List[List[str]]): Cleaned lines of each page
+        min_share (float): Share of pages a line must repeat on; 0.4 also catches
+            headers that alternate between odd and even pages
+        min_pages (int): Documents with fewer pages are returned unchanged
+        edge_lines (int): Lines at the top and bottom of a page that are checked
+
+    Returns:
+        List[List[str]]: Pages without their boilerplate lines
+    """
+    if len(pages) < min_pages:
+        return pages
+    edges = [_edges(lines, edge_lines) for lines in pages]
+    seen = Counter()
+    for lines, indexes in zip(pages, edges):
+        seen.update({_line_key(lines[index]) for index in indexes})
+    needed = max(min_pages, math.ceil(min_share * len(pages)))
+    boilerplate = {key for key, count in seen.items() if count >= needed}
+    if not boilerplate:
+        return pages
+    cleaned = []
+    for lines, indexes in zip(pages, edges):
+        drop = {index for index in indexes if _line_key(lines[index]) in boilerplate}
+        cleaned.append([line for index, line in enumerate(lines) if index not in drop] if drop else lines)
+    return cleaned
+
+
+def normalize_text(text: str, repeated_lines: bool = True, min_share: float = 0.4,
+                   join_hyphens: bool = False) -> str:
+    """
+    Normalize a document: clean it, drop page boilerplate and, for PDFs, join hyphenated words.
+
+    Args:
+        text (str): Document text, PDF pages separated by PAGE_BREAK
+        repeated_lines (bool): Remove lines repeated at the edges of pages
+        min_share (float): Share of pages a header or footer must repeat on
+        join_hyphens (bool): Join words hyphenated across line ends (PDF text)
+
+    Returns:
+        str: Normalized text, pages joined by newlines
+    """
+    pages = [_clean_lines(page) for page in _clean_characters(text).split(PAGE_BREAK)]
+    if repeated_lines:
+        pages = strip_repeated_lines(pages, min_share=min_share)
+    text = '\n'.join(line for lines in pages for line in lines)
+    if join_hyphens:
+        text = dehyphenate(text)
+    # Lines are already trimmed at the end; keep the first line's indentation
+    return _BLANK_LINES.sub('\n\n', text).strip('\n')
+
+
+def _safe_cut(text: str) -> int:
+    """Last line end no cleanup pass can reach across: after a character that is neither space nor hyphen."""
+    cut = len(text)
+    while True:
+        cut = max(text.rfind('\n', 0, cut), text.rfind('\r', 0, cut))
+        if cut <= 0:
+            return -1
+        if not text[cut - 1].isspace() and text[cut - 1] not in '-\u2010':
+            return cut
+
+
+def _finish(text: str, join_hyphens: bool) -> str:
+    # Streamed text has no pages to compare; clean_text makes a form feed a line break
+    text = clean_text(text)
+    return _BLANK_LINES.sub('\n\n', dehyphenate(text) if join_hyphens else text)
+
+
+def stream_normalized(blocks: Iterable[str], join_hyphens: bool = False) -> Iterator[str]:
+    """
+    Normalize text arriving in blocks, e.g. from iter_text_blocks.
+
+    Each block is cleaned up to its last line end that no pattern spans; the
+    rest is carried into the next block, so the output matches
+    normalize_text without the per-page pass, in bounded memory.
+
+    Args:
+        blocks (Iterable[str]): Consecutive pieces of one document
+        join_hyphens (bool): Join words hyphenated across line ends (PDF text)
+
+    Yields:
+        str: Normalized pieces
+    """
+    carry = ''
+    started = False
+    for block in blocks:
+        text = carry + block
+        cut = _safe_cut(text)
+        if cut < 0 and len(text) < _MAX_CARRY:
+            carry = text
+            continue
+        if cut < 0:
+            cut = len(text)
+        piece, carry = _finish(text[:cut], join_hyphens), text[cut:]
+        if not started:
+            piece = piece.lstrip('\n')
+            started = bool(piece)
+        if piece:
+            yield piece
+    piece = _finish(carry, join_hyphens).rstrip('\n')
+    if not started:
+        piece = piece.lstrip('\n')
+    if piece:
+        yield piece
+
+
+class TextNormalizer:
+    """
+    Normalize documents and count the bytes removed from each.
+
+    Args:
+        repeated_lines (bool): Remove headers, footers and page numbers repeated across pages
+        min_share (float): Share of pages a header or footer must repeat on
+
+    Attributes:
+        removed (Dict[Hashable, int]): UTF-8 bytes removed per document key
+        seconds (float): Time spent normalizing
+    """
+
+    def __init__(self, repeated_lines: bool = True, min_share: float = 0.4):
+        self.repeated_lines = repeated_lines
+        self.min_share = min_share
+        self.removed: Dict[Hashable, int] = {}
+        self.seconds = 0.0
+
+    @property
+    def total_removed(self) -> int:
+        return sum(self.removed.values())
+
+    def normalize(self, key: Hashable, text: str, join_hyphens: bool = False) -> str:
+        """Normalize a whole document, recording the bytes removed under ``key``; join hyphens for PDF text."""
+        start = time.perf_counter()
+        normalized = normalize_text(text, self.repeated_lines, self.min_share, join_hyphens)
+        self.removed[key] = len(text.encode('utf-8')) - len(normalized.encode('utf-8'))
+        self.seconds += time.perf_counter() - start
+        return normalized
+
+    def stream(self, key: Hashable, blocks: Iterable[str], join_hyphens: bool = False) -> Iterator[str]:
+        """Normalize a streamed document; the bytes removed are recorded once it is consumed."""
+        before = after = 0
+        seconds = reading = 0.0
+
+        def counted() -> Iterator[str]:
+            nonlocal before, reading
+            source = iter(blocks)
+            while True:
+                start = time.perf_counter()
+                block = next(source, None)
+                reading += time.perf_counter() - start
+                if block is None:
+                    return
+                before += len(block.encode('utf-8'))
+                yield block
+
+        pieces = stream_normalized(counted(), join_hyphens)
+        while True:
+            start = time.perf_counter()
+            piece: Optional[str] = next(pieces, None)
+            seconds += time.perf_counter() - start
+            if piece is None:
+                break
+            after += len(piece.encode('utf-8'))
+            yield piece
+        self.removed[key] = before - after
+        self.seconds += seconds - reading
@@ -0,0 +1,236 @@
+"""
+Ingestion pipeline for TextTrove CLI
+"""
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from texttrove.metrics import EXTRACTION_SECONDS, EXTRACTIONS, KB_CALLS, KB_ROWS, KB_SECONDS, observe
+from texttrove.utils import extract_pdf_pages, extract_text_from_file, extraction_format, pdf_page_count
+
+ExtractResult = Tuple[Path, Optional[str], Optional[BaseException]]
+
+
+def extract_files(files: Iterable[Path], workers: int = 1, max_pages: Optional[int] = None,
+                  time_budget: Optional[float] = None, split_pages: int = 0,
+                  split_bytes: int = 10 * 1024 * 1024, page_break: str = '\n') -> Iterator[ExtractResult]:
+    """
+    Extract text from many files, in a process pool when workers > 1.
+
+    At most ``workers * 2`` tasks are in flight at once, so a slow consumer
+    never has more than a handful of extracted documents waiting in memory.
+    With ``split_pages`` set, PDFs of at least ``split_bytes`` bytes are cut
+    into page ranges that run on different workers and are reassembled in
+    page order.
+
+    Args:
+        files (Iterable[Path]): Files to extract
+        workers (int): Number of worker processes
+        max_pages (Optional[int]): Per-file page budget for PDFs
+        time_budget (Optional[float]): Per-file (per-range when split) time budget in seconds
+        split_pages (int): Pages per task for large PDFs; 0 disables splitting
+        split_bytes (int): Only PDFs at least this large are split
+        page_break (str): Separator between PDF pages, also between split ranges
+
+    Yields:
+        ExtractResult: (file_path, content, error) in completion order
+    """
+    if workers <= 1:
+        for file_path in files:
+            try:
+                yield file_path, extract_text_from_file(file_path, max_pages=max_pages, time_budget=time_budget,
+                                                         page_break=page_break), None
+            except Exception as e:
+                yield file_path, None, e
+        return
+
+    tasks = _extract_tasks(files, max_pages, split_pages, split_bytes)
+    parts: Dict[Path, List[Optional[str]]] = {}
+    # Worker processes have their own metrics registry, so extractions are timed there and recorded here
+    seconds: Dict[Path, float] = {}
+    failed = set()
+
+    def record(file_path: Path, outcome: str):
+        EXTRACTIONS.inc(format=extraction_format(file_path), outcome=outcome)
+        EXTRACTION_SECONDS.observe(seconds.pop(file_path, 0.0), format=extraction_format(file_path))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def submit_next() -> bool:
+            for file_path, index, count, page_range in tasks:
+                if file_path not in failed:
+                    break
+            else:
+                return False
+            if page_range is None:
+                future = executor.submit(_timed, extract_text_from_file, str(file_path), max_pages, time_budget,
+                                         page_break)
+            else:
+                future = executor.submit(_timed, extract_pdf_pages, str(file_path), page_range[0], page_range[1],
+                                         time_budget, page_break)
+            parts.setdefault(file_path, [None] * count)
+            pending[future] = (file_path, index)
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path, index = pending.pop(future)
+                submit_next()
+                if file_path in failed:
+                    continue
+                error = future.exception()
+                if error is not None:
+                    failed.add(file_path)
+                    del parts[file_path]
+                    record(file_path, 'error')
+                    yield file_path, None, error
+                    continue
+                text, elapsed = future.result()
+                seconds[file_path] = seconds.get(file_path, 0.0) + elapsed
+                file_parts = parts[file_path]
+                file_parts[index] = text or ''
+                if all(part is not None for part in file_parts):
+                    del parts[file_path]
+                    record(file_path, 'error' if len(file_parts) == 1 and text is None else 'ok')
+                    yield file_path, page_break.join(part for part in file_parts if part), None
+
+
+def _timed(func: Callable, *args) -> Tuple[Any, float]:
+    """Run func in a worker process and return its result with the seconds it took."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _extract_tasks(files: Iterable[Path], max_pages: Optional[int], split_pages: int,
+                   split_bytes: int) -> Iterator[Tuple[Path, int, int, Optional[Tuple[int, int]]]]:
+    """Yield (file, part index, part count, page range) extraction tasks."""
+    for file_path in files:
+        file_path = Path(file_path)
+        if split_pages > 0 and file_path.suffix.lower() == '.pdf' and file_path.stat().st_size >= split_bytes:
+            try:
+                pages = pdf_page_count(str(file_path))
+            except Exception:
+                pages = 0
+            if max_pages is not None:
+                pages = min(pages, max_pages)
+            if pages > split_pages:
+                ranges = [(start, min(start + split_pages, pages)) for start in range(0, pages, split_pages)]
+                for index, page_range in enumerate(ranges):
+                    yield file_path, index, len(ranges), page_range
+                continue
+        yield file_path, 0, 1, None
+
+
+class BatchInserter:
+    """
+    Buffer knowledge base rows and insert them in multi-row batches.
+
+    Full batches are handed to a background thread through a bounded queue,
+    so extraction keeps running while MindsDB is busy inserting. Rows are
+    grouped by a caller-supplied key (usually the source file) and
+    ``on_done(key, error)`` fires once per key when all of its rows have been
+    inserted, or on the first batch containing one of its rows that fails.
+    A key only completes once ``add`` has returned, so the rows of one key may
+    safely span several batches.
+    """
+
+    def __init__(self, kb, batch_size: int = 100, max_pending: int = 4,
+                 on_done: Optional[Callable[[Hashable, Optional[BaseException]], None]] = None):
+        self.kb = kb
+        self.batch_size = max(1, batch_size)
+        self.on_done = on_done or (lambda key, error: None)
+        self.batches_inserted = 0
+        self.insert_seconds = 0.0
+        self.row_counts: Dict[Hashable, int] = {}
+        self._batch: List[Tuple[Hashable, Dict[str, Any]]] = []
+        self._remaining: Dict[Hashable, int] = {}
+        self._failed = set()
+        self._sealed = set()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[List[Tuple[Hashable, Dict[str, Any]]]]]" = queue.Queue(maxsize=max(1, max_pending))
+        # Run in a copy of the caller's context so callbacks print to the same console
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._run,),
+                                        name="texttrove-inserter", daemon=True)
+        self._thread.start()
+
+    def add(self, key: Hashable, rows: Iterable[Dict[str, Any]]):
+        """
+        Queue rows belonging to ``key`` for insertion.
+
+        Args:
+            key (Hashable): Identifier reported back through ``on_done``
+            rows (Iterable[Dict[str, Any]]): Knowledge base rows
+        """
+        for row in rows:
+            with self._lock:
+                self._remaining[key] = self._remaining.get(key, 0) + 1
+            self.row_counts[key] = self.row_counts.get(key, 0) + 1
+            self._batch.append((key, row))
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+        with self._lock:
+            self._sealed.add(key)
+            finished = self._remaining.get(key, 0) == 0 and key not in self._failed
+        if finished:
+            self.on_done(key, None)
+
+    def flush(self):
+        """Hand the current partial batch to the insert thread."""
+        if self._batch:
+            self._queue.put(self._batch)
+            self._batch = []
+
+    def close(self):
+        """Flush remaining rows and wait for all inserts to finish."""
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            kb_name = getattr(self.kb, 'name', '')
+            try:
+                with observe(KB_CALLS, KB_SECONDS, operation='insert', kb=kb_name):
+                    self.kb.insert([row for _, row in batch])
+                error = None
+                self.batches_inserted += 1
+                KB_ROWS.inc(len(batch), kb=kb_name)
+            except Exception as e:
+                error = e
+            self.insert_seconds += time.perf_counter() - start
+            for key, _ in batch:
+                self._row_done(key, error)
+
+    def _row_done(self, key: Hashable, error: Optional[BaseException]):
+        with self._lock:
+            if key in self._failed:
+                return
+            if error is not None:
+                self._failed.add(key)
+                finished = True
+            else:
+                self._remaining[key] -= 1
+                finished = self._remaining[key] == 0 and key in self._sealed
+        if finished:
+            self.on_done(key, error)
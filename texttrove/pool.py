@@ -0,0 +1,222 @@
+"""
+Thread-safe MindsDB connection pool
+
+Each checkout gets a connection for its exclusive use, so concurrent
+requests no longer serialize on (or interleave over) one shared client.
+Connections are opened lazily, probed when they have been idle for a
+while or after a failed call, and reopened with exponential backoff when
+MindsDB is unreachable. Knowledge base handles are cached per connection.
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class PoolUnavailable(ConnectionError):
+    """Raised when no healthy connection can be checked out"""
+
+
+def default_probe(server) -> None:
+    """Cheap liveness check: a trivial query against the server."""
+    server.query('SELECT 1').fetch()
+
+
+class _Slot:
+    def __init__(self, index: int):
+        self.index = index
+        self.server = None
+        self.kb_handles: Dict[str, Any] = {}
+        self.last_ok = 0.0
+        self.suspect = False
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def reset(self):
+        self.server = None
+        self.kb_handles.clear()
+
+
+class ConnectionPool:
+    """
+    Pool of MindsDB connections.
+
+    Args:
+        connect (Callable[[], Any]): Opens a new connection (e.g. mindsdb_sdk.connect)
+        size (int): Number of connections
+        probe (Callable[[Any], None]): Raises if a connection is dead
+        probe_interval (float): Probe connections idle for longer than this (seconds)
+        checkout_timeout (float): Seconds to wait for a free connection
+        backoff (float): First reconnect delay after a failure (seconds)
+        max_backoff (float): Upper bound of the reconnect delay (seconds)
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int = 4, probe: Callable[[Any], None] = default_probe,
+                 probe_interval: float = 30.0, checkout_timeout: float = 10.0, backoff: float = 0.5,
+                 max_backoff: float = 30.0):
+        self.connect = connect
+        self.size = max(1, size)
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.checkout_timeout = checkout_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._slots = [_Slot(i) for i in range(self.size)]
+        # LIFO keeps recently used (warm, recently probed) connections busy
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        for slot in reversed(self._slots):
+            self._idle.put(slot)
+        self._lock = threading.Lock()
+        self._counters = {'checkouts': 0, 'waits': 0, 'timeouts': 0, 'connects': 0,
+                          'reconnects': 0, 'connect_failures': 0, 'probe_failures': 0}
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._wait_seconds = 0.0
+        self.last_error: Optional[str] = None
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _ensure(self, slot: _Slot):
+        """Make sure the slot holds a live connection, reconnecting if needed."""
+        now = time.monotonic()
+        if slot.server is not None and (slot.suspect or now - slot.last_ok > self.probe_interval):
+            try:
+                self.probe(slot.server)
+                slot.last_ok = now
+                slot.suspect = False
+            except Exception as e:
+                self._count('probe_failures')
+                self.last_error = f"probe failed: {e}"
+                slot.reset()
+
+        if slot.server is not None:
+            return
+
+        if now < slot.retry_at:
+            raise PoolUnavailable(f"MindsDB unavailable, retrying in {slot.retry_at - now:.1f}s ({self.last_error})")
+        try:
+            # Clients may connect lazily; only a connection that answers counts
+            server = self.connect()
+            self.probe(server)
+            slot.server = server
+        except Exception as e:
+            slot.failures += 1
+            slot.retry_at = now + min(self.max_backoff, self.backoff * 2 ** (slot.failures - 1))
+            self._count('connect_failures')
+            self.last_error = str(e)
+            raise PoolUnavailable(f"Failed to connect to MindsDB: {e}") from e
+        self._count('reconnects' if slot.failures or slot.last_ok else 'connects')
+        slot.failures = 0
+        slot.retry_at = 0.0
+        slot.last_ok = time.monotonic()
+        slot.suspect = False
+
+    @contextmanager
+    def _checkout(self) -> Iterator[_Slot]:
+        start = time.perf_counter()
+        try:
+            slot = self._idle.get_nowait()
+        except queue.Empty:
+            self._count('waits')
+            try:
+                slot = self._idle.get(timeout=self.checkout_timeout)
+            except queue.Empty:
+                self._count('timeouts')
+                raise PoolUnavailable(f"No MindsDB connection free after {self.checkout_timeout}s") from None
+        with self._lock:
+            self._counters['checkouts'] += 1
+            self._wait_seconds += time.perf_counter() - start
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        try:
+            self._ensure(slot)
+            try:
+                yield slot
+            except Exception:
+                # The call may have failed because the server went away
+                slot.suspect = True
+                raise
+            slot.last_ok = time.monotonic()
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(slot)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Check out a connection for exclusive use.
+
+        Yields:
+            The MindsDB server object
+
+        Raises:
+            PoolUnavailable: If MindsDB cannot be reached or the pool is exhausted
+        """
+        with self._checkout() as slot:
+            yield slot.server
+
+    @contextmanager
+    def knowledge_base(self, kb_name: str, create: Optional[Callable[[Any], Any]] = None) -> Iterator[Any]:
+        """
+        Check out a connection and yield its cached handle for a knowledge base.
+
+        Args:
+            kb_name (str): Knowledge base name
+            create (Optional[Callable[[Any], Any]]): Called with the server to
+                create the knowledge base when the lookup fails
+
+        Yields:
+            The knowledge base handle, valid until the with-block ends
+        """
+        with self._checkout() as slot:
+            if kb_name not in slot.kb_handles:
+                try:
+                    slot.kb_handles[kb_name] = slot.server.knowledge_bases.get(kb_name)
+                except Exception:
+                    if create is None:
+                        raise
+                    slot.kb_handles[kb_name] = create(slot.server)
+            try:
+                yield slot.kb_handles[kb_name]
+            except Exception:
+                # The KB may have been dropped or recreated; look it up again next time
+                slot.kb_handles.pop(kb_name, None)
+                raise
+
+    def warm(self) -> bool:
+        """
+        Open one connection ahead of the first request.
+
+        Returns:
+            bool: Whether MindsDB was reachable
+        """
+        try:
+            with self.connection():
+                return True
+        except PoolUnavailable:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report pool utilization.
+
+        Returns:
+            Dict[str, Any]: Size, connections open/in use, counters and last error
+        """
+        with self._lock:
+            checkouts = self._counters['checkouts']
+            return {
+                'size': self.size,
+                'open': sum(1 for s in self._slots if s.server is not None),
+                'in_use': self._in_use,
+                'peak_in_use': self._peak_in_use,
+                'utilization': self._in_use / self.size,
+                'avg_wait_ms': self._wait_seconds / checkouts * 1000 if checkouts else 0.0,
+                **self._counters,
+                'last_error': self.last_error,
+            }
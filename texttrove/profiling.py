@@ -0,0 +1,115 @@
+"""
+Stage timing for TextTrove commands
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List
+
+
+class Tracer:
+    """
+    Record the wall time of named stages (config load, connect, search, ...).
+
+    Stages can be timed with the ``stage`` context manager or added after the
+    fact with ``add`` when the time was measured elsewhere, for example the
+    cumulative insert time of a background thread.
+    """
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **attrs) -> Iterator[Dict[str, Any]]:
+        """
+        Time the body of a with-block as one stage.
+
+        Args:
+            name (str): Stage name
+            **attrs: Extra details stored with the stage (KB name, counts...)
+
+        Yields:
+            Dict[str, Any]: The stage attributes, which the body may update
+        """
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.add(name, time.perf_counter() - start, offset=start - self.started, **attrs)
+
+    def add(self, name: str, seconds: float, offset: float = None, **attrs):
+        """
+        Record a stage measured elsewhere.
+
+        Args:
+            name (str): Stage name
+            seconds (float): Wall time of the stage
+            offset (float): Start time relative to the tracer, if known
+            **attrs: Extra details stored with the stage
+        """
+        with self._lock:
+            self.stages.append({'stage': name, 'seconds': seconds, 'offset': offset, **attrs})
+
+    def total(self) -> float:
+        """Seconds since the tracer was created."""
+        return time.perf_counter() - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'total_seconds': self.total(), 'stages': list(self.stages)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, default=str)
+
+    def table(self):
+        """
+        Build a rich table of the recorded stages.
+
+        Returns:
+            Table: One row per stage plus the total
+        """
+        from rich.table import Table
+
+        table = Table(title="Profile")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Time (ms)", justify="right", style="green")
+        table.add_column("Details", style="dim")
+        for stage in self.stages:
+            details = ', '.join(f"{k}={v}" for k, v in stage.items() if k not in ('stage', 'seconds', 'offset'))
+            table.add_row(stage['stage'], f"{stage['seconds'] * 1000:.1f}", details)
+        table.add_row("total", f"{self.total() * 1000:.1f}", "", style="bold")
+        return table
+
+
+class CurrentTracer:
+    """
+    Proxy for the tracer of the current context.
+
+    Commands record into ``tracer`` without knowing whether they run as a
+    one-shot CLI process or as one of many requests inside the daemon.
+    """
+
+    def __init__(self):
+        self._default = Tracer()
+        self._current = ContextVar('texttrove_tracer', default=None)
+
+    def get(self) -> Tracer:
+        return self._current.get() or self._default
+
+    @contextmanager
+    def use(self, target: Tracer) -> Iterator[Tracer]:
+        """Record into another tracer for the current context."""
+        token = self._current.set(target)
+        try:
+            yield target
+        finally:
+            self._current.reset(token)
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+tracer = CurrentTracer()
@@ -0,0 +1,95 @@
+"""
+Coalescing of identical in-flight calls
+
+Concurrent callers asking for the same key share one execution of the
+underlying call: the first caller runs it, the others wait for its result
+(or its exception). Nothing is kept once the call finishes; pair it with
+the result cache for reuse over time.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Share one in-flight execution among concurrent identical calls.
+
+    Args:
+        timeout (Optional[float]): Default seconds a coalesced caller waits
+            for the shared result before giving up
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """
+        Run ``fn`` unless an identical call is already in flight, then share its outcome.
+
+        Args:
+            key (Hashable): Identity of the call, e.g. a cache_key of KB, query and limit
+            fn (Callable[[], T]): The call to make
+            timeout (Optional[float]): Seconds to wait on a shared call; defaults to self.timeout
+
+        Returns:
+            T: The result of the (possibly shared) call
+
+        Raises:
+            TimeoutError: If a coalesced caller waited longer than the timeout
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        wait = timeout if timeout is not None else self.timeout
+        if not call.done.wait(wait):
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"Timed out after {wait}s waiting for an identical in-flight search")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report coalescing counters.
+
+        Returns:
+            Dict[str, int]: executions, coalesced, timeouts and calls in flight
+        """
+        with self._lock:
+            return {'executions': self.executions, 'coalesced': self.coalesced,
+                    'timeouts': self.timeouts, 'in_flight': len(self._calls)}
@@ -0,0 +1,212 @@
+"""
+Map-reduce summarization over search results
+
+Passages are split into chunks that are summarized concurrently (map),
+then the partial summaries are combined (reduce), recursively when they do
+not fit in one prompt. Every LLM answer is cached on disk under a hash of
+the model and the full prompt, so repeated or overlapping summaries only
+pay for the chunks that are new. The final answer can be streamed token by
+token while it is generated.
+"""
+import asyncio
+import datetime
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from texttrove.async_utils import AsyncExecutor, run_async_safely
+from texttrove.chunking import iter_chunks
+
+SUMMARY_CACHE_FILE = "texttrove_summaries.db"
+
+MAP_PROMPT = ("Summarize the following passage{focus}. Keep names, numbers and identifiers exact.\n\n"
+              "{text}")
+REDUCE_PROMPT = ("Combine these partial summaries of related passages into one concise summary{focus}. "
+                 "Merge repeated points and keep names, numbers and identifiers exact.\n\n{text}")
+
+
+class SummaryCache:
+    """
+    SQLite store of LLM answers keyed by model and prompt.
+
+    Args:
+        path (Union[str, Path]): Database file
+    """
+
+    def __init__(self, path: Union[str, Path] = SUMMARY_CACHE_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " summary TEXT NOT NULL,"
+            " created_at TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute("SELECT summary FROM summaries WHERE key = ?", (self.key(model, prompt),)).fetchone()
+        return row[0] if row else None
+
+    def set(self, model: str, prompt: str, summary: str):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, model, summary, created_at) VALUES (?, ?, ?, ?)",
+                (self.key(model, prompt), model, summary, datetime.datetime.now().isoformat(timespec='seconds'))
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class Summarizer:
+    """
+    Summarize many passages with concurrent chunk summaries and a reduce step.
+
+    Args:
+        complete (Callable[[str], str]): Sends a prompt to the LLM and returns its
+            answer; must raise on failure so errors are never cached
+        model (str): Model identity, part of every cache key
+        cache (Optional[SummaryCache]): Answer cache; None disables caching
+        executor (Optional[AsyncExecutor]): Bounds concurrent LLM calls
+        stream (Optional[Callable[[str], Iterator[str]]]): Streams the answer to a
+            prompt; used for the final step of summarize_stream
+        chunk_chars (int): Size of the chunks summarized in the map step
+        reduce_chars (int): Most text combined by one reduce prompt
+    """
+
+    def __init__(self, complete: Callable[[str], str], model: str, cache: Optional[SummaryCache] = None,
+                 executor: Optional[AsyncExecutor] = None, stream: Optional[Callable[[str], Iterator[str]]] = None,
+                 chunk_chars: int = 4000, reduce_chars: int = 8000):
+        self.complete = complete
+        self.stream = stream
+        self.model = model
+        self.cache = cache
+        self.executor = executor or AsyncExecutor(max_concurrency=4)
+        self.chunk_chars = chunk_chars
+        self.reduce_chars = reduce_chars
+        self.stats: Dict[str, float] = {'chunks': 0, 'llm_calls': 0, 'cache_hits': 0}
+
+    async def _ask(self, prompt: str) -> str:
+        if self.cache is not None:
+            cached = await self.executor.call(self.cache.get, self.model, prompt)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+        self.stats['llm_calls'] += 1
+        answer = await self.executor.call(self.complete, prompt)
+        if self.cache is not None:
+            await self.executor.call(self.cache.set, self.model, prompt, answer)
+        return answer
+
+    def _chunks(self, texts: List[str]) -> List[str]:
+        chunks = []
+        for text in texts:
+            if text and text.strip():
+                chunks.extend(c.text for c in iter_chunks(text, chunk_size=self.chunk_chars, overlap=0))
+        return chunks
+
+    def _groups(self, summaries: List[str]) -> List[List[str]]:
+        groups, current, size = [], [], 0
+        for summary in summaries:
+            if current and size + len(summary) > self.reduce_chars:
+                groups.append(current)
+                current, size = [], 0
+            current.append(summary)
+            size += len(summary)
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _final_prompt(self, texts: List[str], focus: Optional[str]) -> Optional[str]:
+        """Run the map step and all but the last reduce; return the prompt whose answer is the summary."""
+        focus_text = f', focusing on "{focus}"' if focus else ''
+        chunks = self._chunks(texts)
+        self.stats['chunks'] += len(chunks)
+        if not chunks:
+            return None
+        if len(chunks) == 1:
+            return MAP_PROMPT.format(focus=focus_text, text=chunks[0])
+
+        summaries = await asyncio.gather(*(self._ask(MAP_PROMPT.format(focus=focus_text, text=c)) for c in chunks))
+        while True:
+            groups = self._groups(list(summaries))
+            if len(groups) == len(summaries) > 1:
+                # Every summary alone exceeds reduce_chars; pair them so each round still halves the count
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            prompts = [REDUCE_PROMPT.format(focus=focus_text, text='\n\n'.join(f"- {s}" for s in group))
+                       for group in groups]
+            if len(prompts) == 1:
+                return prompts[0]
+            summaries = await asyncio.gather(*(self._ask(prompt) for prompt in prompts))
+
+    async def asummarize(self, texts: List[str], focus: Optional[str] = None) -> str:
+        """
+        Summarize passages.
+
+        Args:
+            texts (List[str]): Passages, e.g. the content of search results
+            focus (Optional[str]): Query the summary should concentrate on
+
+        Returns:
+            str: The summary
+        """
+        prompt = await self._final_prompt(texts, focus)
+        return await self._ask(prompt) if prompt else ''
+
+    def summarize(self, texts: List[str], focus: Optional[str] = None) -> str:
+        """Synchronous wrapper around asummarize."""
+        return run_async_safely(self.asummarize(texts, focus))
+
+    def summarize_stream(self, texts: List[str], focus: Optional[str] = None) -> Iterator[str]:
+        """
+        Summarize passages, yielding the final answer as it is generated.
+
+        Chunk summaries are still computed (concurrently) up front; only the
+        last LLM call is streamed. ``stats`` gains ``first_token_ms`` and
+        ``total_ms``, measured from the call.
+
+        Args:
+            texts (List[str]): Passages, e.g. the content of search results
+            focus (Optional[str]): Query the summary should concentrate on
+
+        Yields:
+            str: Text fragments of the summary; a cached summary comes in one piece
+        """
+        start = time.perf_counter()
+        prompt = run_async_safely(self._final_prompt(texts, focus))
+        for fragment in (self._stream_answer(prompt) if prompt else ()):
+            if 'first_token_ms' not in self.stats:
+                self.stats['first_token_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            yield fragment
+        self.stats['total_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    def _stream_answer(self, prompt: str) -> Iterator[str]:
+        cached = self.cache.get(self.model, prompt) if self.cache is not None else None
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            yield cached
+            return
+        if self.stream is None:
+            yield run_async_safely(self._ask(prompt))
+            return
+        self.stats['llm_calls'] += 1
+        parts = []
+        for fragment in self.stream(prompt):
+            parts.append(fragment)
+            yield fragment
+        # Only complete answers are cached; a closed or failed stream never gets here
+        if self.cache is not None:
+            self.cache.set(self.model, prompt, ''.join(parts))
@@ -0,0 +1,365 @@
+"""
+In-process MindsDB stand-in and synthetic corpora for tests and benchmarks
+
+Set ``mindsdb_url`` to a ``fake://`` URL and the CLI and TextSpark talk to
+a FakeServer instead of MindsDB. Knowledge bases live in memory, shared by
+every connection to the same URL name, and each call sleeps for a
+configurable latency, so benchmarks are reproducible without a server:
+
+    fake://bench?search_ms=20&insert_ms=40&row_ms=0.5&jitter=0.1&workers=8
+"""
+import math
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import parse_qs, urlparse
+
+_WORD = re.compile(r"\w+")
+
+
+class Latency:
+    """
+    Simulated server latency.
+
+    Args:
+        search_ms (float): Time per search
+        insert_ms (float): Time per insert call
+        row_ms (float): Extra time per inserted row (embedding cost)
+        query_ms (float): Time per SQL query (probes, deletes)
+        jitter (float): Each delay is scaled by a random factor in 1 ± jitter
+        workers (int): Calls served at once; further calls queue (0 = unlimited)
+        seed (Optional[int]): Seed for the jitter
+    """
+
+    def __init__(self, search_ms: float = 0.0, insert_ms: float = 0.0, row_ms: float = 0.0, query_ms: float = 0.0,
+                 jitter: float = 0.0, workers: int = 0, seed: Optional[int] = None):
+        self.search_ms = search_ms
+        self.insert_ms = insert_ms
+        self.row_ms = row_ms
+        self.query_ms = query_ms
+        self.jitter = jitter
+        self.workers = workers
+        self._random = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(workers) if workers > 0 else None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str) -> "Latency":
+        params = {key: values[-1] for key, values in parse_qs(urlparse(url).query).items()}
+        return cls(search_ms=float(params.get('search_ms', 0)), insert_ms=float(params.get('insert_ms', 0)),
+                   row_ms=float(params.get('row_ms', 0)), query_ms=float(params.get('query_ms', 0)),
+                   jitter=float(params.get('jitter', 0)), workers=int(params.get('workers', 0)),
+                   seed=int(params['seed']) if 'seed' in params else None)
+
+    def wait(self, ms: float):
+        """Sleep for ``ms`` (with jitter), holding one of the server's worker slots."""
+        if ms <= 0 and self._slots is None:
+            return
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter) if self.jitter else 1
+        if self._slots is None:
+            time.sleep(max(0.0, ms * factor) / 1000)
+            return
+        with self._slots:
+            time.sleep(max(0.0, ms * factor) / 1000)
+
+
+class CallStats:
+    """Count calls and their server-side durations per operation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[str, List[float]] = {}
+
+    def record(self, operation: str, seconds: float):
+        with self._lock:
+            self.calls.setdefault(operation, []).append(seconds * 1000)
+
+    def snapshot(self) -> Dict[str, List[float]]:
+        with self._lock:
+            return {operation: list(durations) for operation, durations in self.calls.items()}
+
+
+class FakeKnowledgeBase:
+    """
+    Knowledge base kept in memory; search ranks rows by shared words.
+
+    Args:
+        name (str): Knowledge base name
+        latency (Latency): Simulated latency
+        stats (CallStats): Where calls are recorded
+    """
+
+    def __init__(self, name: str, latency: Latency, stats: CallStats):
+        self.name = name
+        self.latency = latency
+        self.stats = stats
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._terms: Dict[str, set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def insert(self, rows: List[Dict[str, Any]]):
+        start = time.perf_counter()
+        self.latency.wait(self.latency.insert_ms + self.latency.row_ms * len(rows))
+        with self._lock:
+            for row in rows:
+                row_id = row.get('id')
+                if row_id is None:
+                    row_id = f"auto-{self._next_id}"
+                    self._next_id += 1
+                self._rows[str(row_id)] = {'id': str(row_id), 'content': row['content'],
+                                           'metadata': dict(row.get('metadata') or {})}
+                self._terms[str(row_id)] = set(_WORD.findall(row['content'].lower()))
+        self.stats.record('insert', time.perf_counter() - start)
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        self.latency.wait(self.latency.search_ms)
+        words = set(_WORD.findall(query.lower()))
+        with self._lock:
+            scored = []
+            for row_id, terms in self._terms.items():
+                shared = len(words & terms)
+                if shared:
+                    scored.append((shared / math.sqrt(len(terms)), row_id))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            results = [{**self._rows[row_id], 'relevance': score} for score, row_id in scored[:limit]]
+        self.stats.record('search', time.perf_counter() - start)
+        return results
+
+    def delete(self, ids: Iterable[str]):
+        with self._lock:
+            for row_id in ids:
+                self._rows.pop(str(row_id), None)
+                self._terms.pop(str(row_id), None)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+
+class FakeKnowledgeBases:
+    """The ``server.knowledge_bases`` collection of a FakeServer."""
+
+    def __init__(self, server: "FakeServer"):
+        self._server = server
+
+    def get(self, name: str) -> FakeKnowledgeBase:
+        with self._server.lock:
+            kb = self._server.kbs.get(name)
+        if kb is None:
+            raise LookupError(f"Knowledge base not found: {name}")
+        return kb
+
+    def create(self, name: str, **options) -> FakeKnowledgeBase:
+        with self._server.lock:
+            if name in self._server.kbs:
+                raise ValueError(f"Knowledge base already exists: {name}")
+            kb = self._server.kbs[name] = FakeKnowledgeBase(name, self._server.latency, self._server.stats)
+        return kb
+
+    def list(self) -> List[FakeKnowledgeBase]:
+        with self._server.lock:
+            return list(self._server.kbs.values())
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetch(self):
+        return self.rows
+
+
+class FakeServer:
+    """
+    MindsDB server stand-in with knowledge_bases and the SQL the CLI uses.
+
+    Args:
+        latency (Optional[Latency]): Simulated latency; none by default
+    """
+
+    def __init__(self, latency: Optional[Latency] = None):
+        self.latency = latency or Latency()
+        self.stats = CallStats()
+        self.kbs: Dict[str, FakeKnowledgeBase] = {}
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.knowledge_bases = FakeKnowledgeBases(self)
+
+    def query(self, sql: str) -> _Result:
+        """Run ``SELECT 1`` (pool probes) or ``DELETE FROM kb WHERE id IN (...)``."""
+        start = time.perf_counter()
+        self.latency.wait(self.latency.query_ms)
+        delete = re.match(r"\s*DELETE\s+FROM\s+(\w+)\s+WHERE\s+id\s+IN\s*\((.*)\)\s*$", sql, re.IGNORECASE | re.DOTALL)
+        if delete:
+            self.knowledge_bases.get(delete.group(1)).delete(re.findall(r"'([^']*)'", delete.group(2)))
+            rows = []
+        elif re.match(r"\s*SELECT\s+1\s*$", sql, re.IGNORECASE):
+            rows = [{'1': 1}]
+        else:
+            raise NotImplementedError(f"FakeServer does not support: {sql}")
+        self.stats.record('query', time.perf_counter() - start)
+        return _Result(rows)
+
+
+_servers: Dict[str, FakeServer] = {}
+_servers_lock = threading.Lock()
+
+
+def connect_fake(url: str) -> FakeServer:
+    """
+    Connect to the fake server named by a ``fake://name?options`` URL.
+
+    Connections to the same name share knowledge bases; latency options
+    given with the first connection apply.
+
+    Args:
+        url (str): fake:// URL
+
+    Returns:
+        FakeServer: The shared server
+    """
+    parsed = urlparse(url)
+    name = parsed.netloc + parsed.path
+    with _servers_lock:
+        server = _servers.get(name)
+        if server is None:
+            server = _servers[name] = FakeServer(Latency.from_url(url))
+        server.connections += 1
+    return server
+
+
+def reset_fake_servers():
+    """Forget all fake servers and their knowledge bases."""
+    with _servers_lock:
+        _servers.clear()
+
+
+def make_pdf(path: Union[str, Path], pages: Sequence[str]):
+    """
+    Write a minimal PDF with Helvetica text, one entry of ``pages`` per page.
+
+    Args:
+        path (Union[str, Path]): Output file
+        pages (Sequence[str]): Page texts; newlines start new lines
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in text.split('\n')]
+        body = ' T* '.join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 12 Tf 14 TL 72 720 Td {body} ET".encode('latin-1', 'replace')
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream.decode('latin-1')}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('latin-1')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+TOPICS = {
+    'cloud': "cloud cluster container deployment kubernetes latency region scaling service storage uptime",
+    'security': "access audit breach certificate credential encryption firewall incident patch vulnerability",
+    'finance': "budget cost forecast invoice margin quarter revenue spending tax variance",
+    'research': "analysis dataset experiment finding hypothesis measurement method result sample study",
+    'people': "career feedback hiring interview mentor onboarding review salary team training",
+}
+_FILLER = ("the a our this each every new current annual shared internal and with for across during after "
+           "improved reduced reviewed planned reported tracked expected required").split()
+
+
+class CorpusGenerator:
+    """
+    Deterministic synthetic documents about a handful of topics.
+
+    Args:
+        seed (int): Random seed; the same seed gives the same corpus
+    """
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+
+    def sentence(self, topic: str) -> str:
+        words = TOPICS[topic].split()
+        picked = [self.random.choice(words if self.random.random() < 0.45 else _FILLER)
+                  for _ in range(self.random.randint(8, 18))]
+        return ' '.join(picked).capitalize() + '.'
+
+    def text(self, topic: str, size: int) -> str:
+        """Paragraphs of about ``size`` characters."""
+        paragraphs, length = [], 0
+        while length < size:
+            paragraph = ' '.join(self.sentence(topic) for _ in range(self.random.randint(3, 7)))
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+        return '\n\n'.join(paragraphs)
+
+    def document(self, path: Path, topic: str, size: int):
+        """Write one document; the format follows the suffix (.txt, .md or .pdf)."""
+        suffix = path.suffix.lower()
+        if suffix == '.pdf':
+            pages = []
+            for page in range(max(1, size // 2000)):
+                lines = []
+                for paragraph in self.text(topic, 2000).split('\n\n'):
+                    lines.extend(re.findall(r".{1,80}(?:\s|$)", paragraph))
+                pages.append('\n'.join(line.strip() for line in lines[:48]))
+            make_pdf(path, pages)
+        elif suffix == '.md':
+            sections = [f"# {topic.title()} notes"]
+            for number, paragraph in enumerate(self.text(topic, size).split('\n\n'), 1):
+                if number % 3 == 1:
+                    sections.append(f"## Section {number // 3 + 1}")
+                sections.append(paragraph)
+            path.write_text('\n\n'.join(sections), encoding='utf-8')
+        else:
+            path.write_text(self.text(topic, size), encoding='utf-8')
+
+    def queries(self, count: int) -> List[str]:
+        """Search strings of two to four topic words."""
+        topics = list(TOPICS)
+        return [' '.join(self.random.sample(TOPICS[self.random.choice(topics)].split(), self.random.randint(2, 4)))
+                for _ in range(count)]
+
+
+def make_corpus(folder: Union[str, Path], files: int = 20, size_kb: float = 8,
+                formats: Sequence[str] = ('txt', 'md', 'pdf'), seed: int = 0) -> List[Path]:
+    """
+    Write a synthetic corpus.
+
+    Args:
+        folder (Union[str, Path]): Output folder (created if missing)
+        files (int): Number of documents
+        size_kb (float): Approximate text size per document
+        formats (Sequence[str]): Formats to rotate through
+        seed (int): Random seed
+
+    Returns:
+        List[Path]: Files written
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    generator = CorpusGenerator(seed)
+    topics = list(TOPICS)
+    paths = []
+    for number in range(files):
+        topic = topics[number % len(topics)]
+        path = folder / f"{topic}-{number:04d}.{formats[number % len(formats)]}"
+        generator.document(path, topic, int(size_kb * 1024))
+        paths.append(path)
+    return paths
@@ -1,90 +1,324 @@
 """
 Utility functions for TextTrove CLI
 """
+import codecs
+import io
+import mmap
 import os
+import sys
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional, Tuple
 
-try:
-    from pypdf import PdfReader
-except ImportError:
+from texttrove.metrics import EXTRACTION_SECONDS, EXTRACTIONS, observe
+
+_pdf_reader = False
+
+def get_pdf_reader():
+    """
+    Import the PDF reader class on first use.
+
+    Returns:
+        The pypdf (or PyPDF2) PdfReader class, or None if neither is installed
+    """
+    global _pdf_reader
+    if _pdf_reader is False:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            try:
+                from PyPDF2 import PdfReader
+            except ImportError:
+                PdfReader = None
+        _pdf_reader = PdfReader
+    return _pdf_reader
+
+class LazyConsole:
+    """
+    Stand-in for a rich Console that creates the real one on first use.
+
+    Importing rich costs tens of milliseconds, which commands that never
+    print (or only print --help) should not pay. ``redirect`` swaps in another
+    console for the current context, which the daemon uses to send each
+    request's output back to its client.
+    """
+
+    def __init__(self):
+        self._console = None
+        self._override = ContextVar('texttrove_console', default=None)
+
+    def get(self):
+        override = self._override.get()
+        if override is not None:
+            return override
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+
+    @contextmanager
+    def redirect(self, target):
+        """Send output in the current context to another rich Console."""
+        token = self._override.set(target)
+        try:
+            yield target
+        finally:
+            self._override.reset(token)
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+console = LazyConsole()
+
+_working_dir = ContextVar('texttrove_working_dir', default=None)
+
+@contextmanager
+def working_dir(path: str):
+    """
+    Resolve relative paths against another directory in the current context.
+
+    Args:
+        path (str): Directory the caller was started in
+    """
+    token = _working_dir.set(path)
     try:
-        from PyPDF2 import PdfReader
-    except ImportError:
-        PdfReader = None
+        yield
+    finally:
+        _working_dir.reset(token)
+
+def resolve_path(path: str) -> Path:
+    """
+    Resolve a user-supplied path against the caller's working directory.
+
+    Args:
+        path (str): Absolute or relative path
 
-from rich.console import Console
-from rich.progress import Progress
-from rich.spinner import Spinner
+    Returns:
+        Path: Absolute path
+    """
+    return Path(_working_dir.get() or os.getcwd()) / path
 
-console = Console()
+SUPPORTED_EXTENSIONS = ['.txt', '.pdf', '.md', '.rst']
+TEXT_EXTENSIONS = ['.txt', '.md', '.rst']
+# Separates PDF pages (form feed, as pdftotext does) when page boundaries are kept
+PAGE_BREAK = '\f'
+# Bytes decoded per step when streaming text files; a multiple of the page size
+TEXT_BLOCK_SIZE = 1024 * 1024
 
-def extract_text_from_file(file_path: str) -> Optional[str]:
+def extract_text_from_file(file_path: str, max_pages: Optional[int] = None,
+                           time_budget: Optional[float] = None, page_break: str = '\n') -> Optional[str]:
     """
     Extract text from PDF or text file.
     
     Args:
         file_path (str): Path to the file
+        max_pages (Optional[int]): Stop after this many PDF pages
+        time_budget (Optional[float]): Stop reading PDF pages after this many seconds
+        page_break (str): Separator between PDF pages (PAGE_BREAK keeps them apart for normalization)
         
     Returns:
         Optional[str]: Extracted text or None if extraction fails
     """
+    with observe(EXTRACTIONS, EXTRACTION_SECONDS, format=extraction_format(file_path)) as labels:
+        text = _extract_text(file_path, max_pages, time_budget, page_break)
+        if text is None:
+            labels['outcome'] = 'error'
+        return text
+
+def extraction_format(file_path) -> str:
+    """Metric label for a file's format: its supported extension, or 'other'"""
+    suffix = Path(file_path).suffix.lower()
+    return suffix[1:] if suffix in SUPPORTED_EXTENSIONS else 'other'
+
+def _extract_text(file_path: str, max_pages: Optional[int], time_budget: Optional[float],
+                  page_break: str = '\n') -> Optional[str]:
     try:
         file_path = Path(file_path)
-        
-        if file_path.suffix.lower() == '.pdf':
-            if PdfReader is None:
-                console.print("[yellow]Warning: PDF support not available. Install pypdf: pip install pypdf[/yellow]")
-                return None
-                
-            with open(file_path, 'rb') as f:
-                reader = PdfReader(f)
-                text_parts = []
-                for page in reader.pages:
-                    text = page.extract_text()
-                    if text.strip():
-                        text_parts.append(text)
-                return '\n'.join(text_parts)
-                
-        elif file_path.suffix.lower() in ['.txt', '.md', '.rst']:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        else:
+        suffix = file_path.suffix.lower()
+
+        if suffix == '.pdf' and get_pdf_reader() is None:
+            console.print("[yellow]Warning: PDF support not available. Install pypdf: pip install pypdf[/yellow]")
+            return None
+        if suffix not in SUPPORTED_EXTENSIONS:
             console.print(f"[yellow]Warning: Unsupported file type: {file_path.suffix}[/yellow]")
             return None
+
+        return ''.join(iter_text_from_file(file_path, max_pages=max_pages, time_budget=time_budget,
+                                           page_break=page_break))
             
     except Exception as e:
         console.print(f"[red]Error processing {file_path}: {str(e)}[/red]")
         return None
 
-def loading_spinner(task_description: str, duration: float = 2.0):
+def iter_text_from_file(file_path: str, max_pages: Optional[int] = None, time_budget: Optional[float] = None,
+                        page_range: Optional[Tuple[int, int]] = None, page_break: str = '\n') -> Iterator[str]:
+    """
+    Stream the text of a PDF or text file.
+
+    PDFs are yielded page by page with ``page_break`` between non-empty
+    pages, so joining the pieces gives the same string as
+    extract_text_from_file.
+    Budgets are checked between pages; a single slow page still runs to
+    completion.
+    
+    Args:
+        file_path (str): Path to the file
+        max_pages (Optional[int]): Stop after this many PDF pages
+        time_budget (Optional[float]): Stop reading PDF pages after this many seconds
+        page_range (Optional[Tuple[int, int]]): Only read PDF pages [start, stop)
+        page_break (str): Separator between PDF pages
+        
+    Yields:
+        str: Pieces of the extracted text
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    file_path = Path(file_path)
+    suffix = file_path.suffix.lower()
+
+    if suffix == '.pdf':
+        PdfReader = get_pdf_reader()
+        if PdfReader is None:
+            raise ValueError("PDF support not available. Install pypdf: pip install pypdf")
+        deadline = time.monotonic() + time_budget if time_budget else None
+        with open(file_path, 'rb') as f:
+            reader = PdfReader(f)
+            start, stop = page_range or (0, len(reader.pages))
+            if max_pages is not None:
+                stop = min(stop, start + max_pages)
+            first = True
+            for number in range(start, min(stop, len(reader.pages))):
+                if deadline is not None and time.monotonic() > deadline:
+                    console.print(f"[yellow]Warning: {file_path.name} exceeded its {time_budget}s budget; stopped at page {number}[/yellow]")
+                    return
+                text = reader.pages[number].extract_text()
+                if text.strip():
+                    yield text if first else page_break + text
+                    first = False
+
+    elif suffix in TEXT_EXTENSIONS:
+        yield from iter_text_blocks(file_path)
+    else:
+        raise ValueError(f"Unsupported file type: {file_path.suffix}")
+
+def iter_text_blocks(file_path: str, block_size: int = TEXT_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Stream a UTF-8 text file in bounded segments.
+
+    The file is memory-mapped and decoded incrementally one block at a time,
+    so memory use does not grow with the file: characters split across
+    blocks are completed by the decoder, and pages already decoded are
+    released from the mapping. As when reading in text mode, invalid bytes
+    are dropped and line endings become '\n'.
+
+    Args:
+        file_path (str): Path to the file
+        block_size (int): Bytes per block; rounded up to whole pages
+
+    Yields:
+        str: Decoded text, about ``block_size`` characters at most per piece
+    """
+    block_size = max(mmap.PAGESIZE, -(-block_size // mmap.PAGESIZE) * mmap.PAGESIZE)
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(errors='ignore'), translate=True)
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            release = hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, size, block_size):
+                text = decoder.decode(mapped[offset:offset + block_size])
+                if release:
+                    # Clean file pages: dropping them keeps RSS flat; they are re-read if touched again
+                    mapped.madvise(mmap.MADV_DONTNEED, offset, min(block_size, size - offset))
+                if text:
+                    yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """
+    Peak resident memory of this process (or of its largest finished child).
+
+    Args:
+        children (bool): Report worker processes instead of this one
+
+    Returns:
+        Optional[int]: Bytes, or None where the resource module is unavailable (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+def pdf_page_count(file_path: str) -> int:
+    """
+    Count the pages of a PDF without extracting any text.
+
+    Args:
+        file_path (str): Path to the PDF
+
+    Returns:
+        int: Number of pages
+    """
+    with open(file_path, 'rb') as f:
+        return len(get_pdf_reader()(f).pages)
+
+def extract_pdf_pages(file_path: str, start: int, stop: int, time_budget: Optional[float] = None,
+                      page_break: str = '\n') -> str:
     """
-    Show a loading spinner for a given duration.
+    Extract PDF pages [start, stop); runs inside worker processes.
+
+    Args:
+        file_path (str): Path to the PDF
+        start (int): First page
+        stop (int): Page after the last one
+        time_budget (Optional[float]): Stop reading pages after this many seconds
+        page_break (str): Separator between pages
+
+    Returns:
+        str: Text of the non-empty pages joined with page_break
+    """
+    return ''.join(iter_text_from_file(file_path, time_budget=time_budget, page_range=(start, stop),
+                                       page_break=page_break))
+
+@contextmanager
+def loading_spinner(task_description: str):
+    """
+    Show a loading spinner while the body of a with-block runs.
     
     Args:
         task_description (str): Description of the task
-        duration (float): Duration in seconds
     """
     with console.status(f"[cyan]{task_description}...", spinner="dots"):
-        time.sleep(duration)
+        yield
 
-def loading_progress(task_description: str, total: int = 100, duration: float = 2.0):
+@contextmanager
+def loading_progress(task_description: str, total: int = 100) -> Iterator[Callable[[int], None]]:
     """
-    Show a progress bar for a given duration.
+    Show a progress bar advanced by the work itself.
     
     Args:
         task_description (str): Description of the task
         total (int): Total progress steps
-        duration (float): Duration in seconds
+
+    Yields:
+        Callable[[int], None]: Call with the number of completed steps
     """
-    with Progress() as progress:
+    from rich.progress import Progress
+
+    with Progress(console=console.get(), transient=True) as progress:
         task_id = progress.add_task(f"[cyan]{task_description}...", total=total)
-        step_duration = duration / total
-        
-        for _ in range(total):
-            progress.update(task_id, advance=1)
-            time.sleep(step_duration)
+        yield lambda steps=1: progress.update(task_id, advance=steps)
 
 def get_banner() -> str:
     """
@@ -129,7 +363,7 @@ def validate_folder(folder_path: str) -> bool:
         return False
     
     # Check for supported files
-    supported_extensions = ['.txt', '.pdf', '.md', '.rst']
+    supported_extensions = SUPPORTED_EXTENSIONS
     files = [f for f in path.iterdir() if f.suffix.lower() in supported_extensions]
     
     if not files:
@@ -0,0 +1,176 @@
+"""
+Folder change detection for `texttrove watch`
+
+Native file system events (inotify, FSEvents, ReadDirectoryChangesW) are
+used through the optional ``watchdog`` package; without it the folder is
+polled with one os.scandir pass per interval. Either way bursts of
+changes are debounced into batches of affected paths.
+"""
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def _supported(path: str, extensions: Iterable[str]) -> bool:
+    return os.path.splitext(path)[1].lower() in extensions
+
+
+class PollingWatcher:
+    """
+    Detect changes by comparing (size, mtime) snapshots of a folder.
+
+    Args:
+        folder (str): Folder to watch (top level only, like ingest)
+        extensions (Iterable[str]): File extensions to report
+        interval (float): Seconds between scans
+    """
+
+    native = False
+
+    def __init__(self, folder: str, extensions: Iterable[str], interval: float = 1.0):
+        self.folder = folder
+        self.extensions = tuple(extensions)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not _supported(entry.name, self.extensions):
+                    continue
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    continue
+        return snapshot
+
+    def changes(self, timeout: float) -> Set[str]:
+        """
+        Wait up to ``timeout`` seconds for changes.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            Set[str]: Paths created, modified or deleted since the last call
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            previous, self._snapshot = self._snapshot, current
+            changed = {path for path in current.keys() | previous.keys() if current.get(path) != previous.get(path)}
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class NativeWatcher:
+    """
+    Collect changes from native file system events via watchdog.
+
+    Args:
+        folder (str): Folder to watch (top level only, like ingest)
+        extensions (Iterable[str]): File extensions to report
+    """
+
+    native = True
+
+    def __init__(self, folder: str, extensions: Iterable[str]):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        self.extensions = tuple(extensions)
+        self._events: queue.Queue = queue.Queue()
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, 'dest_path', None)):
+                    if path and _supported(path, watcher.extensions):
+                        watcher._events.put(os.fsdecode(path))
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), folder, recursive=False)
+        self._observer.start()
+
+    def changes(self, timeout: float) -> Set[str]:
+        changed = set()
+        try:
+            changed.add(self._events.get(timeout=timeout))
+            while True:
+                changed.add(self._events.get_nowait())
+        except queue.Empty:
+            return changed
+
+    def close(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+def open_watcher(folder: str, extensions: Iterable[str], interval: float = 1.0, polling: bool = False):
+    """
+    Watch a folder with native events when watchdog is installed, else by polling.
+
+    Args:
+        folder (str): Folder to watch
+        extensions (Iterable[str]): File extensions to report
+        interval (float): Polling interval in seconds
+        polling (bool): Poll even if native events are available
+
+    Returns:
+        NativeWatcher or PollingWatcher
+    """
+    if not polling:
+        try:
+            return NativeWatcher(folder, extensions)
+        except ImportError:
+            pass
+    return PollingWatcher(folder, extensions, interval)
+
+
+def debounced(watcher, debounce: float = 2.0, max_delay: float = 30.0,
+              stop: Optional[threading.Event] = None, idle: float = 1.0,
+              clock: Callable[[], float] = time.monotonic) -> Iterator[List[str]]:
+    """
+    Group changes into batches once the folder has been quiet for a while.
+
+    A file being copied or saved in several writes shows up once per batch,
+    and a long burst is still flushed every ``max_delay`` seconds.
+
+    Args:
+        watcher: Object with changes(timeout) -> Set[str]
+        debounce (float): Quiet seconds that end a batch
+        max_delay (float): Longest a change may wait before its batch is flushed
+        stop (Optional[threading.Event]): Ends the iteration when set
+        idle (float): Seconds between checks for stop while nothing happens
+        clock (Callable[[], float]): Time source
+
+    Yields:
+        List[str]: Sorted paths changed in the batch
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        pending = watcher.changes(timeout=idle)
+        if not pending:
+            continue
+        first = clock()
+        while not stop.is_set():
+            wait = min(debounce, max_delay - (clock() - first))
+            if wait <= 0:
+                break
+            more = watcher.changes(timeout=wait)
+            if not more:
+                break
+            pending |= more
+        yield sorted(pending)